@@ -0,0 +1,57 @@
+"""Gera o atlas de dificuldade das sílabas a partir do dicionário compilado (.bin).
+
+Rode com:  python atlas_silabas.py [acento.txt] [--reserva Zignore.txt ...] [--mostrar 20]
+
+Para cada fragmento de 2 e 3 letras grava em atlas.tsv quantas candidatas livres
+(fora da blacklist/rejeitadas) ele tem e a mais curta e a mais longa. O bot lê esse
+arquivo ao carregar e deixa no cache o ranking das sílabas jogáveis mais difíceis.
+Sem argumentos usa o dicionário e as reservas do config.json.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from codigov4 import (ATLAS_FILE, BLACKLIST_FILE, REJEITADAS_FILE, SILABA_MIN_PALAVRAS,
+                      ConfigManager, Dicionario)
+
+
+def main():
+    cfg = ConfigManager()
+    cfg.load()
+    cfg = cfg.config
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dicionario", nargs="?", default=cfg.caminho_dicionario)
+    parser.add_argument("--reserva", action="append", default=None,
+                        help="dicionário de reserva (repita para vários; padrão: os do config.json)")
+    parser.add_argument("--sem-reserva", action="store_true", help="usa só o dicionário principal")
+    parser.add_argument("--saida", default=ATLAS_FILE)
+    parser.add_argument("--mostrar", type=int, default=20,
+                        help="quantas sílabas jogáveis mais difíceis listar no terminal")
+    args = parser.parse_args()
+
+    reservas = [] if args.sem_reserva else (args.reserva if args.reserva is not None else cfg.dicionarios_reserva)
+    d = Dicionario()
+    if not d.carregar(args.dicionario, reservas=reservas):
+        sys.exit(f"Dicionário não encontrado: {args.dicionario}")
+    d.carregar_blacklist(BLACKLIST_FILE)
+    d.carregar_rejeitadas(REJEITADAS_FILE)
+
+    inicio = time.perf_counter()
+    linhas = d.atlas()
+    Dicionario.gravar_atlas(linhas, args.saida)
+    print(f"{len(linhas)} fragmentos em {time.perf_counter() - inicio:.2f}s -> {args.saida}")
+
+    jogaveis = [l for l in linhas if l[1] >= SILABA_MIN_PALAVRAS][:args.mostrar]
+    if jogaveis:
+        print(f"Sílabas jogáveis (>= {SILABA_MIN_PALAVRAS} candidatas) mais difíceis:")
+    for frag, n, curta, longa in jogaveis:
+        print(f"  {frag:<5} {n:>7}  curta: {curta:<16} longa: {longa}")
+
+
+if __name__ == "__main__":
+    main()
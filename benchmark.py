@@ -0,0 +1,160 @@
+"""Medições da lógica do bot sobre o dicionário real (não abre janela nem toca no jogo).
+
+Rode com:  python benchmark.py alfabeto [--turnos 5000] [--seed 1]
+           python benchmark.py busca [--consultas 300] [--seed 1]
+           python benchmark.py memoria
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from codigov4 import AppConfig, Dicionario, Selecionador, Modo, MotorBusca
+
+
+def carregar_dicionario(caminho):
+    d = Dicionario()
+    inicio = time.perf_counter()
+    if not d.carregar(caminho):
+        sys.exit(f"Dicionário não encontrado: {caminho}")
+    origem = "cache binário" if d.do_cache else "texto"
+    print(f"{len(d.palavras)} palavras carregadas do {origem} em {time.perf_counter() - inicio:.2f}s")
+    return d
+
+
+def simular_alfabeto(d, silabas, planejar):
+    """Joga a sequência de sílabas no modo alfabeto; devolve (vidas extras, turnos jogados)."""
+    cfg = AppConfig()
+    cfg.mostrar_top_n = 1           # sempre a melhor: compara a pontuação, não o sorteio
+    cfg.penaliza_repetidas = False
+    cfg.planejar_alfabeto = planejar
+    sel = Selecionador(cfg, d)
+    sel.nova_partida()
+    turnos = 0
+    for silaba in silabas:
+        palavra = sel.escolher_para(silaba, Modo.ALFABETO.value)
+        if palavra is None:
+            continue
+        turnos += 1
+        sel.registrar_uso(palavra, Modo.ALFABETO.value)
+    sel.nova_partida()
+    return sel.alfabeto_completado, turnos
+
+
+def bench_alfabeto(args):
+    d = carregar_dicionario(args.dicionario)
+    silabas = d.silabas()
+    rng = random.Random(args.seed)
+    sequencia = [rng.choice(silabas) for _ in range(args.turnos)]
+    print(f"{args.turnos} turnos sorteados entre {len(silabas)} sílabas jogáveis (seed {args.seed})")
+    for nome, planejar in (("guloso (letras novas)", False), ("planejador (raridade)", True)):
+        inicio = time.perf_counter()
+        vidas, turnos = simular_alfabeto(d, sequencia, planejar)
+        gasto = time.perf_counter() - inicio
+        media = f"{turnos / vidas:.2f} turnos/vida" if vidas else "nenhuma vida"
+        print(f"  {nome:<24} {vidas:>4} vidas extras  {media:<20} ({gasto:.2f}s)")
+
+
+def cronometrar(fn, consultas):
+    """Tempo médio por consulta (ms) e os resultados, na ordem das consultas."""
+    inicio = time.perf_counter()
+    resultados = [fn(frag) for frag in consultas]
+    return (time.perf_counter() - inicio) / len(consultas) * 1000.0, resultados
+
+
+def bench_busca(args):
+    d = carregar_dicionario(args.dicionario)
+    formas = d._formas.todas()
+
+    inicio = time.perf_counter()
+    d.definir_motor(MotorBusca.SUFIXOS.value)
+    print(f"Array de sufixos montado em {time.perf_counter() - inicio:.2f}s "
+          f"({len(d._sufixos.sufixos)} sufixos)")
+    d.definir_motor(MotorBusca.INDICE.value)
+
+    rng = random.Random(args.seed)
+    longas = [f for f in formas if len(f) >= 6]
+    for tamanho in (1, 2, 3, 4, 6):
+        consultas = []
+        for _ in range(args.consultas):
+            f = rng.choice(longas)
+            j = rng.randrange(len(f) - tamanho + 1)
+            consultas.append(f[j:j + tamanho])
+
+        def varredura(frag):
+            return [i for i, f in enumerate(formas) if frag in f]
+
+        # o motor 'sufixos' só delega ao array acima de 3 letras; aqui medimos o array puro
+        motores = {MotorBusca.INDICE.value: cronometrar(d._ids_com, consultas),
+                   MotorBusca.SUFIXOS.value: cronometrar(d._sufixos.ids_com, consultas)}
+        linear = cronometrar(varredura, consultas[:max(1, args.consultas // 20)])
+        referencia = motores[MotorBusca.INDICE.value][1]
+        iguais = all(np.array_equal(a, b) for a, b in zip(motores[MotorBusca.SUFIXOS.value][1], referencia))
+        iguais = iguais and all(np.array_equal(a, b) for a, b in zip(linear[1], referencia))
+        print(f"  {tamanho} letra(s): varredura {linear[0]:8.2f} ms | índice "
+              f"{motores[MotorBusca.INDICE.value][0]:7.3f} ms | sufixos "
+              f"{motores[MotorBusca.SUFIXOS.value][0]:7.3f} ms | {'iguais' if iguais else 'DIFERENTES'}")
+
+
+def medir(fn):
+    """(resultado, MB alocados que continuam vivos, tempo de um gc.collect completo em ms)."""
+    gc.collect()
+    tracemalloc.start()
+    resultado = fn()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    inicio = time.perf_counter()
+    gc.collect()
+    return resultado, atual / 2**20, (time.perf_counter() - inicio) * 1000.0
+
+
+def bench_memoria(args):
+    carregar_dicionario(args.dicionario)            # garante o .bin pronto
+    d, mb, ms_gc = medir(lambda: carregar_dicionario(args.dicionario))
+    print(f"  compacto (blob + offsets)   {mb:7.1f} MB em objetos Python | gc.collect {ms_gc:6.1f} ms")
+
+    # Como era antes: uma str por palavra e por forma, mais o dicionário palavra -> id
+    def layout_antigo():
+        palavras = d.palavras.todas()
+        formas = [w if w == f else f for w, f in zip(palavras, d._formas.todas())]
+        id_de = {}
+        for i, w in enumerate(palavras):
+            id_de.setdefault(w, i)
+        return palavras, formas, id_de
+
+    _, mb, ms_gc = medir(layout_antigo)
+    print(f"  + listas de str e dict      {mb:7.1f} MB a mais           | gc.collect {ms_gc:6.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dicionario", default="acento.txt")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("alfabeto", help="turnos por vida extra: guloso x planejador")
+    p.add_argument("--turnos", type=int, default=5000)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(fn=bench_alfabeto)
+
+    p = sub.add_parser("busca", help="filtrar: varredura linear x índice x array de sufixos")
+    p.add_argument("--consultas", type=int, default=300)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(fn=bench_busca)
+
+    p = sub.add_parser("memoria", help="memória residente: armazenamento compacto x listas de str")
+    p.set_defaults(fn=bench_memoria)
+
+    args = parser.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
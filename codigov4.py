@@ -2,11 +2,18 @@ import os
 import re
 import cv2
 import json
+import mmap
 import time
+import queue
+import atexit
 import random
+import bisect
 import string
+import hashlib
+import heapq
 import datetime
 import threading
+import unicodedata
 import numpy as np
 import pyperclip
 import pyautogui
@@ -15,7 +22,9 @@ import keyboard
 from PIL import ImageGrab
 from enum import Enum
 from dataclasses import dataclass, asdict, field, fields
-from collections import deque
+from collections import deque, OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 
 # UI
 import tkinter as tk
@@ -32,6 +41,9 @@ CONFIG_FILE = "config.json"
 POSICOES_FILE = "posicoes.json"
 BLACKLIST_FILE = "blacklist.txt"
 REJEITADAS_FILE = "rejeitadas.txt"
+ACEITAS_FILE = "aceitas.txt"        # palavras que o jogo já aceitou: entram primeiro na carga em lotes
+ATLAS_FILE = "atlas.tsv"            # dificuldade de cada sílaba (gerado por atlas_silabas.py)
+SUFIXO_COMPILADO = ".bin"            # acento.txt -> acento.txt.bin (cache do dicionário)
 LOG_FILE = "log.txt"
 
 # Valor gravado no clipboard antes do Ctrl+C: se continuar lá, a cópia falhou
@@ -39,7 +51,33 @@ SENTINELA_CLIPBOARD = "\x00__jklm_captura__\x00"
 
 IGNORADAS_ALFABETO = set("ykw")  # Ignorar Y,K,W para completar 23 letras
 LETRAS_ALFABETO = [c for c in string.ascii_lowercase if c not in IGNORADAS_ALFABETO]
+BIT_LETRA = {c: 1 << i for i, c in enumerate(LETRAS_ALFABETO)}  # letra -> bit na máscara de 23 bits
+MASCARA_ALFABETO = (1 << len(LETRAS_ALFABETO)) - 1
 APENAS_LETRAS_RE = re.compile(r'[^A-Za-zÀ-ÖØ-öø-ÿ]')  # mantém acentos PT-BR
+TAM_MAX_FRAGMENTO = 3  # sílabas do Bomb Party têm de 1 a 3 letras (tamanho do índice)
+EMERGENCIA_POR_FRAGMENTO = 6  # respostas curtas guardadas por fragmento para quando o tempo acaba
+SILABA_MIN_PALAVRAS = 100  # fragmento com menos palavras que isso quase nunca é sorteado
+PRE_AQUECER_N = 64         # sílabas mais difíceis do atlas com ranking já pronto no cache
+ATLAS_FINO = 10            # menos candidatas que isso: o dicionário está fraco na sílaba
+LOTE_INICIAL, LOTE_MAX = 4096, 65536  # carga em lotes: o primeiro é pequeno para jogar logo
+CHATBOX_MARGEM_PX = 96    # folga em volta do último acerto (ou de pos_chatbox) na busca do template
+CHATBOX_VARREDURA_CADA = 5  # a cada tantas faltas seguidas na janela, procura na tela inteira
+# Escalas do template da chatbox (tela / calibração): 100% primeiro, depois as escalas comuns do Windows
+ESCALAS_CHATBOX = (1.0, 1.25, 1.5, 1.75, 2.0, 0.8, 2 / 3, 0.5)
+CHATBOX_PIRAMIDE_CADA = 3   # a cada tantas varreduras completas erradas, a escala lembrada não basta
+VIGIA_INTERVALO_S = 0.025   # a vigia de turno amostra barra e sílaba nesse ritmo
+VIGIA_CONFIRMAR_CADA_S = 0.5  # sem mudança na tela, ainda confirma o turno nesse intervalo
+VIGIA_LIMIAR = 2.0          # diferença média (tons de cinza) que conta como mudança
+VIGIA_CAIXA_SILABA = (80, 40)  # l x a em volta de pos_letras quando não há letras_rect (do OCR)
+# Conferência do envio: olha a barra a cada ACEITE_INTERVALO_S até ela mudar; a espera máxima
+# sai dos tempos de resposta já vistos (percentil com folga) depois de ACEITE_MIN_AMOSTRAS aceites
+ACEITE_INTERVALO_S = 0.02
+ACEITE_MIN_AMOSTRAS = 5
+ACEITE_PERCENTIL, ACEITE_FOLGA = 0.95, 1.5
+ACEITE_MIN_S, ACEITE_MAX_S = 0.1, 1.5
+QUADRO_MAX_IDADE_S = 1.0  # rede de segurança: quadro mais velho que isso é recapturado mesmo sem novo_quadro()
+INTERVALO_GRAVACAO_S = 1.0  # o gravador de listas junta o que chegar nesse intervalo num só fsync
+COMPACTAR_REJEITADAS_CADA = 50  # recusas novas entre uma compactação de rejeitadas.txt e outra
 
 FRASES_ENGRACADAS_DEFAULT = [
     "pera ai 🤔",
@@ -64,11 +102,21 @@ class MetodoCaptura(Enum):
     OCR = 'ocr'               # leitura da imagem da sílaba (exige pytesseract + tesseract)
 
 
+class MotorBusca(Enum):
+    INDICE = 'indice'         # n-gramas de 1 a 3 letras (padrão; mais rápido para sílabas)
+    SUFIXOS = 'sufixos'       # array de sufixos: qualquer tamanho de fragmento
+
+
 class MetodoTurno(Enum):
     PIXEL = 'pixel'           # diferença absoluta em tons de cinza (comportamento original)
     COR = 'cor'               # correlação de histograma HSV
     HIBRIDO = 'hibrido'       # média dos dois
 
+class EventoTurno(Enum):
+    INICIOU = 'turno_iniciou'
+    ACABOU = 'turno_acabou'
+    SILABA = 'silaba_mudou'   # sílaba nova com o turno ainda meu
+
 class VelocidadePerfil(Enum):
     NENHUM = 'nenhum'
     RAPIDA = 'rapida'
@@ -80,6 +128,38 @@ def clamp(v, lo, hi):
     return max(lo, min(hi, v))
 
 
+def sem_acentos(texto):
+    """'ação' -> 'acao'. Forma usada na busca e na digitação (o jogo mostra a sílaba sem acento)."""
+    if texto.isascii():
+        return texto
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+def so_letras(palavra):
+    """True se a palavra só tem letras: sem ponto, hífen, apóstrofo, número ou símbolo como 'ª'."""
+    forma = sem_acentos(palavra)
+    return forma.isascii() and forma.isalpha() and not APENAS_LETRAS_RE.search(palavra)
+
+
+def mascara_letras(letras):
+    """Máscara de 23 bits das letras úteis (as fora do alfabeto do jogo são ignoradas)."""
+    m = 0
+    for c in letras:
+        m |= BIT_LETRA.get(c, 0)
+    return m
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(arr):
+        return np.bitwise_count(arr)
+else:  # NumPy < 2.0
+    _BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(arr):
+        arr = np.ascontiguousarray(arr, dtype=np.uint32)
+        return _BITS_POR_BYTE[arr.view(np.uint8)].reshape(arr.shape + (4,)).sum(axis=-1, dtype=np.uint8)
+
+
 def aplicar_dpi_awareness(ativar: bool):
     """Alinha as coordenadas do pyautogui com os pixels reais da tela.
 
@@ -147,11 +227,15 @@ class HumanizarConfig:
 class AppConfig:
     # Delays gerais (ms)
     delay_ciclo_ms: int = 200
+    vigia_turno: bool = True    # thread que acorda o ciclo assim que a barra/sílaba muda
     delay_pos_copiar_ms: int = 300
     delay_antes_digitar_ms: int = 200
 
     # Dicionário
     caminho_dicionario: str = "acento.txt"
+    # Consultados em ordem, só quando o principal não tem palavra para a sílaba
+    dicionarios_reserva: list = field(default_factory=lambda: ["Zignore.txt"])
+    motor_busca: str = MotorBusca.INDICE.value
 
     # Chatbox (template para detecção opcional)
     template_chatbox: str = "chatbox.png"
@@ -179,6 +263,8 @@ class AppConfig:
     verificar_envio: bool = True
     delay_verificacao_ms: int = 350
     max_tentativas_rodada: int = 3
+    # Abaixo desta folga (0 = sem tempo) a palavra sai da tabela de emergência, sem pontuar
+    folga_emergencia: float = 0.1
     # Grava em rejeitadas.txt palavras recusadas 2x (o jogo não as conhece)
     aprender_rejeitadas: bool = True
 
@@ -194,6 +280,8 @@ class AppConfig:
     # Mistura a caça ao alfabeto nos modos normais quando sobra tempo
     alfabeto_hibrido: bool = True
     peso_letras_novas: float = 0.6
+    # Modo alfabeto: letras raras valem mais (menos turnos até a vida extra)
+    planejar_alfabeto: bool = True
 
     # ===== Partida =====
     # Zera o estado por partida após um período sem turnos
@@ -281,32 +369,1102 @@ class PosicoesManager:
             }, f, ensure_ascii=False, indent=2)
 
 
+# ==============================
+# Dicionário compilado (binário + mmap)
+# ==============================
+
+class DicionarioCompilado:
+    """Cache binário de um dicionário .txt, aberto via mmap sem reprocessar o texto.
+
+    Layout: MAGIC | u32 tamanho do cabeçalho | cabeçalho JSON | seções alinhadas em 8 bytes.
+    O cabeçalho guarda a assinatura do .txt de origem (tamanho, mtime e sha1) e, para
+    cada seção, offset, dtype e quantidade de itens. Se a origem mudar, o cache é refeito.
+    Com dicionários de reserva, as assinaturas deles também vão no cabeçalho e o arquivo
+    ganha o nome da pilha ('acento.txt+Zignore.txt.bin'), sem brigar com o cache só do principal.
+    """
+    MAGIC = b"JKLMDIC\x00"
+    VERSAO = 9                # 9: reservas sem abreviações/hífens/símbolos
+    ALINHAMENTO = 8
+
+    def __init__(self, caminho_txt, caminho_bin=None, reservas=()):
+        self.caminho_txt = caminho_txt
+        self.reservas = list(reservas)
+        self.caminho = caminho_bin or "+".join([caminho_txt, *map(os.path.basename, self.reservas)]) \
+            + SUFIXO_COMPILADO
+        self.cabecalho = None
+        self._mmap = None
+
+    @staticmethod
+    def _sha1(caminho):
+        h = hashlib.sha1()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        return h.hexdigest()
+
+    @classmethod
+    def assinatura(cls, caminho):
+        st = os.stat(caminho)
+        return {"tamanho": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": cls._sha1(caminho)}
+
+    def _ler_cabecalho(self, f):
+        if f.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("arquivo compilado inválido")
+        tam = int.from_bytes(f.read(4), "little")
+        return json.loads(f.read(tam).decode("utf-8"))
+
+    @classmethod
+    def _confere(cls, origem, caminho):
+        """True se a assinatura gravada ainda corresponde ao arquivo."""
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return False
+        origem = origem or {}
+        if origem.get("tamanho") != st.st_size or origem.get("mtime_ns") != st.st_mtime_ns:
+            return False
+        # mtime e tamanho batem; o hash pega edições que preservaram o mtime
+        return origem.get("sha1") == cls._sha1(caminho)
+
+    def atualizado(self, exigir=()):
+        """True se o .bin existe, é desta versão, tem as seções exigidas e corresponde aos .txt atuais."""
+        try:
+            with open(self.caminho, "rb") as f:
+                cab = self._ler_cabecalho(f)
+        except (OSError, ValueError):
+            return False
+        if cab.get("versao") != self.VERSAO:
+            return False
+        if any(nome not in (cab.get("secoes") or {}) for nome in exigir):
+            return False
+        reservas = cab.get("reservas") or []
+        if len(reservas) != len(self.reservas):
+            return False
+        return all(self._confere(origem, caminho) for origem, caminho in
+                   zip([cab.get("origem"), *reservas], [self.caminho_txt, *self.reservas]))
+
+    def gravar(self, secoes, extra=None):
+        """Grava as seções (nome -> np.ndarray) num arquivo temporário e troca de uma vez."""
+        descr, pos = {}, 0
+        for nome, arr in secoes.items():
+            arr = np.ascontiguousarray(arr)
+            descr[nome] = {"offset": pos, "dtype": arr.dtype.str, "n": int(arr.size)}
+            pos += -(-arr.nbytes // self.ALINHAMENTO) * self.ALINHAMENTO
+        cab = {"versao": self.VERSAO, "origem": self.assinatura(self.caminho_txt),
+               "reservas": [self.assinatura(r) for r in self.reservas],
+               "secoes": descr, **(extra or {})}
+        cab_bytes = json.dumps(cab, ensure_ascii=False).encode("utf-8")
+        inicio = len(self.MAGIC) + 4 + len(cab_bytes)
+        padding_cab = -inicio % self.ALINHAMENTO
+
+        tmp = self.caminho + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.MAGIC)
+            f.write((len(cab_bytes) + padding_cab).to_bytes(4, "little"))
+            f.write(cab_bytes + b" " * padding_cab)
+            for nome, arr in secoes.items():
+                dados = np.ascontiguousarray(arr).tobytes()
+                f.write(dados)
+                f.write(b"\x00" * (-len(dados) % self.ALINHAMENTO))
+        os.replace(tmp, self.caminho)
+
+    def abrir(self):
+        """Mapeia o arquivo e devolve as seções como arrays NumPy (views, sem cópia)."""
+        with open(self.caminho, "rb") as f:
+            self.cabecalho = self._ler_cabecalho(f)
+            base = f.tell()
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        secoes = {}
+        for nome, d in self.cabecalho["secoes"].items():
+            dtype = np.dtype(d["dtype"])
+            if d["n"] == 0:
+                secoes[nome] = np.empty(0, dtype=dtype)
+            else:
+                secoes[nome] = np.frombuffer(self._mmap, dtype=dtype, count=d["n"],
+                                             offset=base + d["offset"])
+        return secoes
+
+
+class GravadorLista:
+    """Acrescenta palavras a um arquivo de lista (rejeitadas.txt, aceitas.txt) numa thread.
+
+    Quem joga só enfileira: adicionar() não toca no disco. A thread junta o que chegar em
+    'intervalo', grava tudo de uma vez e faz fsync; compactar() reescreve o arquivo num
+    temporário e troca com os.replace, então uma queda no meio nunca deixa o arquivo
+    pela metade. Um gravador por arquivo (GravadorLista.de); no atexit, fechar_todos()
+    grava o que ainda estiver na fila.
+    """
+    _abertos = {}
+    _lock_abertos = threading.Lock()
+
+    @classmethod
+    def de(cls, path):
+        """O gravador do arquivo, criado (com a thread) no primeiro uso."""
+        chave = os.path.abspath(path)
+        with cls._lock_abertos:
+            gravador = cls._abertos.get(chave)
+            if gravador is None or gravador._fechado:
+                if not cls._abertos:
+                    atexit.register(cls.fechar_todos)
+                gravador = cls._abertos[chave] = cls(path)
+            return gravador
+
+    @classmethod
+    def pendentes_de(cls, path):
+        """Palavras enfileiradas para o arquivo e ainda não gravadas."""
+        with cls._lock_abertos:
+            gravador = cls._abertos.get(os.path.abspath(path))
+        return gravador.pendentes() if gravador is not None else set()
+
+    @classmethod
+    def fechar_todos(cls):
+        with cls._lock_abertos:
+            abertos = list(cls._abertos.values())
+            cls._abertos.clear()
+        for gravador in abertos:
+            gravador.fechar()
+
+    def __init__(self, path, intervalo=INTERVALO_GRAVACAO_S):
+        self.path = path
+        self.intervalo = intervalo
+        self.ao_gravar = []         # fn(path) depois de cada escrita (ex.: atualizar o carimbo)
+        self.gravacoes = 0          # escritas feitas (cada uma com um fsync)
+        self.erro = None            # última falha de escrita (a fila segue para o próximo lote)
+        self.desde_compactar = 0    # linhas enfileiradas depois do último compactar()
+        self._fila = []             # ('linha', palavra) | ('compactar', palavras a manter)
+        self._cond = threading.Condition()
+        self._fechado = False
+        self._thread = threading.Thread(target=self._rodar, daemon=True)
+        self._thread.start()
+
+    def adicionar(self, palavra):
+        self._enfileirar(("linha", palavra))
+
+    def compactar(self, manter):
+        """Reescreve o arquivo só com as palavras de 'manter', sem repetidas e na ordem atual."""
+        self._enfileirar(("compactar", frozenset(manter)))
+
+    def _enfileirar(self, item):
+        with self._cond:
+            self._fila.append(item)
+            self.desde_compactar = self.desde_compactar + 1 if item[0] == "linha" else 0
+            self._cond.notify_all()
+
+    def pendentes(self):
+        with self._cond:
+            return {valor for tipo, valor in self._fila if tipo == "linha"}
+
+    def descarregar(self, timeout=None):
+        """Espera a fila esvaziar (tudo gravado); True se esvaziou dentro do timeout."""
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._fila, timeout)
+
+    def fechar(self, timeout=10.0):
+        with self._cond:
+            self._fechado = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _rodar(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._fila or self._fechado)
+                if not self._fila:
+                    return
+                # junta o que chegar no intervalo (a recusa seguinte costuma vir logo)
+                self._cond.wait_for(lambda: self._fechado, self.intervalo)
+                lote = list(self._fila)
+            try:
+                self._gravar(lote)
+                self.erro = None
+            except OSError as e:
+                self.erro = e
+            for fn in self.ao_gravar:
+                fn(self.path)
+            with self._cond:
+                # só sai da fila depois de gravado: pendentes() continua vendo o lote até aqui
+                del self._fila[:len(lote)]
+                self._cond.notify_all()
+
+    def _gravar(self, lote):
+        linhas = []
+        for tipo, valor in lote + [("fim", None)]:
+            if tipo == "linha":
+                linhas.append(valor)
+                continue
+            if linhas:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(w + "\n" for w in linhas))
+                    self._sincronizar(f)
+                linhas = []
+            if tipo == "compactar":
+                self._reescrever(valor)
+        self.gravacoes += 1
+
+    def _reescrever(self, manter):
+        vistas, linhas = set(), []
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    w = line.strip().lower()
+                    if w.startswith("#"):
+                        linhas.append(line.rstrip("\n"))
+                    elif w in manter and w not in vistas:
+                        vistas.add(w)
+                        linhas.append(w)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(l + "\n" for l in linhas))
+            self._sincronizar(f)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _sincronizar(f):
+        f.flush()
+        try:
+            os.fsync(f.fileno())
+        except OSError:
+            pass  # ex.: os.devnull, que não aceita fsync
+
+
+class ListaCompacta(Sequence):
+    """Lista de strings guardada num único blob UTF-8 ('\n' entre itens) + offsets uint32.
+
+    Em vez de um objeto str por palavra (~50 bytes cada, todos vigiados pelo GC), só o
+    blob e os offsets ficam na memória, ou nem isso quando são views do .bin mapeado.
+    Cada item é decodificado na hora em que é acessado.
+    """
+    __slots__ = ("blob", "offsets", "_bytes")
+
+    def __init__(self, blob, offsets):
+        self.blob = blob            # np.uint8
+        self.offsets = offsets      # início de cada item no blob (n + 1 itens)
+        self._bytes = memoryview(blob)
+
+    @classmethod
+    def de(cls, itens):
+        """Empacota uma lista de str no formato gravado pelo DicionarioCompilado."""
+        itens = list(itens)
+        offsets = np.zeros(len(itens) + 1, dtype=np.uint32)
+        np.cumsum([len(w.encode("utf-8")) + 1 for w in itens], out=offsets[1:])
+        return cls(np.frombuffer("\n".join(itens).encode("utf-8"), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return bytes(self._bytes[int(self.offsets[i]):int(self.offsets[i + 1]) - 1]).decode("utf-8")
+
+    def __iter__(self):
+        return iter(self.todas())
+
+    def juntar(self, outra):
+        """Nova lista com os itens desta seguidos dos da outra (nenhuma das duas muda)."""
+        if not len(self):
+            return outra
+        if not len(outra):
+            return self
+        blob = np.concatenate((self.blob, np.frombuffer(b"\n", dtype=np.uint8), outra.blob))
+        return ListaCompacta(blob, np.concatenate((self.offsets, outra.offsets[1:] + self.offsets[-1])))
+
+    def todas(self):
+        """Decodifica tudo de uma vez (bem mais rápido que item a item para listas grandes)."""
+        return self.blob.tobytes().decode("utf-8").split("\n") if len(self) else []
+
+    def varios(self, ids):
+        """Itens dos ids, na ordem pedida: item a item se forem poucos, senão tudo de uma vez."""
+        ids = list(ids)
+        if len(ids) > len(self) // 16:
+            todas = self.todas()
+            return [todas[i] for i in ids]
+        return [self[i] for i in ids]
+
+    def __eq__(self, outra):
+        if isinstance(outra, ListaCompacta):
+            return np.array_equal(self.offsets, outra.offsets) and np.array_equal(self.blob, outra.blob)
+        if isinstance(outra, list):
+            return self.todas() == outra
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ListaCompacta({len(self)} itens)"
+
+
+class ArraySufixos:
+    """Array de sufixos sobre as formas concatenadas (UTF-8, '\n' entre as palavras).
+
+    Os sufixos que começam com um fragmento formam uma faixa contígua do array, achada
+    com duas buscas binárias em O(|frag| log n); cada ocorrência vira id da palavra
+    pelos offsets. Serve para fragmentos de qualquer tamanho, não só até 3 letras.
+    """
+
+    def __init__(self, texto, offsets, sufixos):
+        self.texto = texto          # bytes das formas, como em ListaCompacta.de
+        self.offsets = offsets      # início de cada palavra no texto (n + 1 itens)
+        self.sufixos = sufixos      # posições do texto em ordem lexicográfica do sufixo
+
+    @classmethod
+    def construir(cls, blob, offsets):
+        return cls(blob.tobytes(), offsets, cls._ordenar(blob))
+
+    @staticmethod
+    def _ordenar(blob):
+        """Prefix doubling com NumPy: O(n log n) por rodada, uma rodada por potência de 2.
+
+        Só importa a ordem até o primeiro '\n' (nenhum fragmento o contém), então para
+        quando o prefixo comparado passa da maior palavra.
+        """
+        n = len(blob)
+        if n == 0:
+            return np.empty(0, dtype=np.uint32)
+        maior = int(np.diff(np.flatnonzero(np.append(blob == 10, True)), prepend=-1).max())
+        rank, base, k = blob.astype(np.int64), 257, 1     # 1ª rodada: o próprio byte é o posto
+        while True:
+            depois = np.zeros(n, dtype=np.int64)
+            depois[:n - k] = rank[k:] + 1                  # 0 = passou do fim do texto
+            chave = rank * base + depois
+            sa = np.argsort(chave)
+            ordenada = chave[sa]
+            rank = np.empty(n, dtype=np.int64)
+            rank[sa] = np.concatenate(([0], np.cumsum(ordenada[1:] != ordenada[:-1])))
+            # ordenado pelos primeiros 2k bytes: basta quando cobre a maior palavra
+            if 2 * k >= maior or rank[sa[-1]] == n - 1:
+                break
+            k, base = 2 * k, n + 1
+        return sa.astype(np.uint32)
+
+    def _faixa(self, alvo):
+        texto, sa, m = self.texto, self.sufixos, len(alvo)
+        lo, hi = 0, len(sa)
+        while lo < hi:                                      # primeiro sufixo >= alvo
+            meio = (lo + hi) // 2
+            p = int(sa[meio])
+            if texto[p:p + m] < alvo:
+                lo = meio + 1
+            else:
+                hi = meio
+        inicio, hi = lo, len(sa)
+        while lo < hi:                                      # primeiro sufixo > alvo (no prefixo)
+            meio = (lo + hi) // 2
+            p = int(sa[meio])
+            if texto[p:p + m] <= alvo:
+                lo = meio + 1
+            else:
+                hi = meio
+        return inicio, lo
+
+    def ids_com(self, frag):
+        """Ids (ordem crescente, sem repetição) das palavras cuja forma contém o fragmento."""
+        inicio, fim = self._faixa(frag.encode("utf-8"))
+        if inicio == fim:
+            return np.empty(0, dtype=np.uint32)
+        ids = np.searchsorted(self.offsets, self.sufixos[inicio:fim], side="right") - 1
+        return np.unique(ids).astype(np.uint32)
+
+
 # ==============================
 # Núcleo: Dicionário / Seleção
 # ==============================
 
 class Dicionario:
+    # Bits de exclusão por id de palavra (array uint8 '_bloqueio')
+    BLOQ_BLACKLIST = 1
+    BLOQ_REJEITADA = 2
+    BLOQ_USADA = 4              # usada nesta partida (zerado em nova partida)
+    DELTA_MAX = 500             # acima disso, mudança em blacklist/rejeitadas recarrega tudo
+
     def __init__(self):
-        self.palavras = []
-        self.blacklist = set()      # blacklist manual do usuário
-        self.rejeitadas = set()     # aprendidas: o JKLM não aceitou
+        self._palavras = ListaCompacta.de([])
+        self._formas = ListaCompacta.de([])  # gêmea sem acento de cada palavra: é nela que se busca e é ela que se digita
+        self._grupos = np.empty(0, dtype=np.uint32)  # id -> primeiro id com a mesma forma digitada
+        self._ordem = np.empty(0, dtype=np.uint32)   # ids em ordem alfabética da grafia (busca binária)
+        self._indice = {}           # fragmento (1 a 3 letras, sem acento) -> ids das palavras que o contêm
+        self._prefixos = {}         # início da grafia (1 a 3 letras) -> ids das palavras que começam assim
+        # Camada de cada id (0 = principal, 1.. = reservas); cada camada ocupa ids contíguos
+        self.camadas = np.zeros(0, dtype=np.uint8)
+        self._fim_camadas = np.zeros(1, dtype=np.int64)  # id seguinte ao último de cada camada
+        self.fontes = []            # arquivos carregados, na ordem das camadas
+        # Traços por id, para pontuar todas as candidatas numa passada NumPy
+        self.comprimentos = np.zeros(0, dtype=np.uint16)
+        self.mascaras = np.zeros(0, dtype=np.uint32)    # letras úteis da forma digitada (23 bits)
+        # Por letra do alfabeto: fração das sílabas jogáveis com alguma palavra que a tenha
+        self.cobertura_letras = np.zeros(len(LETRAS_ALFABETO))
+        self._bloqueio = np.zeros(0, dtype=np.uint8)
+        self._compilado = None      # DicionarioCompilado aberto (mantém o mmap vivo)
+        self.motor = MotorBusca.INDICE.value
+        self._sufixos = None        # ArraySufixos, montado só com o motor 'sufixos'
+        self.do_cache = False       # True se a última carga veio do .bin
+        self._blacklist = set()     # blacklist manual do usuário
+        self._rejeitadas = set()    # aprendidas: o JKLM não aceitou
+        self._usadas = set()        # já enviadas nesta partida
+        self.geracao = 0            # muda a cada troca em massa (lista, blacklist, rejeitadas)
+        self._ouvintes = []         # fn(palavra, bit) avisada a cada exclusão pontual
+        self._emergencia = {}       # fragmento -> ids das palavras mais curtas não recusadas
+        self.aceitas = set()        # já aceitas pelo jogo: primeiras na tabela de emergência
+        self._carimbos = {}         # arquivo de lista -> (mtime_ns, tamanho) da última leitura/escrita nossa
+
+    @property
+    def palavras(self):
+        return self._palavras
+
+    @palavras.setter
+    def palavras(self, palavras):
+        # Qualquer troca da lista (carregar, testes) reconstrói o índice junto
+        self.definir_camadas([palavras])
+
+    def definir_camadas(self, listas, processos=1):
+        """Empilha listas de palavras num só espaço de ids: a primeira é a principal.
+
+        Palavra já presente numa camada anterior fica só nela; as buscas só descem para a
+        camada seguinte quando a anterior não tem mais candidata livre. Com processos > 1
+        os índices são montados em fatias de ids num ProcessPoolExecutor (mesmo resultado).
+        """
+        palavras, contagens, vistas = [], [], set()
+        for camada, lista in enumerate(listas):
+            novas = [w for w in self._entradas_validas(lista, camada) if w not in vistas]
+            vistas.update(novas)
+            palavras.extend(novas)
+            contagens.append(len(novas))
+        camadas = np.repeat(np.arange(len(contagens), dtype=np.uint8), contagens)
+        if processos > 1 and len(palavras) > processos:
+            formas, indice, prefixos, tracos = self._montar_em_processos(palavras, processos)
+        else:
+            formas, indice, prefixos, tracos = self._montar_fatia(palavras, 0)
+        # As listas de str só vivem durante a montagem; guardado fica o formato compacto
+        self._definir(ListaCompacta.de(palavras), ListaCompacta.de(formas), self._ordenar_grafias(palavras),
+                      indice, self._agrupar(formas), prefixos,
+                      tracos, self._cobertura(indice, tracos[1]), camadas)
+        self._compilado = None
+        self._sufixos = None
+        if self.motor == MotorBusca.SUFIXOS.value:
+            self._sufixos = ArraySufixos.construir(self._formas.blob, self._formas.offsets)
+
+    @staticmethod
+    def _entradas_validas(lista, camada):
+        """A principal entra como está; da reserva só palavras de letras (o jogo recusa 'a.c.', 'ª')."""
+        return lista if camada == 0 else [w for w in lista if so_letras(w)]
+
+    @staticmethod
+    def _montar_fatia(palavras, base):
+        """Formas, índice, prefixos e traços de ids contíguos a partir de 'base'.
+
+        Roda no processo principal ou num processo do pool (tudo aqui é serializável).
+        """
+        # Dobra de acentos feita uma vez aqui, nunca por turno
+        formas = [sem_acentos(w) for w in palavras]
+
+        def deslocar(listas):
+            return {k: ids + np.uint32(base) for k, ids in listas.items()} if base else listas
+
+        return (formas, deslocar(Dicionario._montar_indice(formas)),
+                deslocar(Dicionario._montar_prefixos(palavras)), Dicionario._tracos(palavras, formas))
+
+    @classmethod
+    def _montar_em_processos(cls, palavras, processos):
+        """Divide os ids em fatias contíguas, uma por processo, e junta na ordem das fatias.
+
+        Como cada lista de ids é a concatenação das fatias em ordem, o resultado é idêntico
+        (byte a byte no .bin) ao da montagem num processo só.
+        """
+        tam = -(-len(palavras) // processos)
+        bases = list(range(0, len(palavras), tam))
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            fatias = list(pool.map(cls._montar_fatia, [palavras[b:b + tam] for b in bases], bases))
+        formas = [f for fatia in fatias for f in fatia[0]]
+        tracos = tuple(np.concatenate([fatia[3][j] for fatia in fatias]) for j in range(2))
+        return (formas, cls._fundir_listas([fatia[1] for fatia in fatias]),
+                cls._fundir_listas([fatia[2] for fatia in fatias]), tracos)
+
+    @staticmethod
+    def _fundir_listas(fatias):
+        """Junta dicionários chave -> ids de fatias consecutivas, mantendo os ids crescentes."""
+        partes = {}
+        for listas in fatias:
+            for k, ids in listas.items():
+                partes.setdefault(k, []).append(ids)
+        return {k: v[0] if len(v) == 1 else np.concatenate(v) for k, v in partes.items()}
+
+    def montar_em_lotes(self, listas, prioridade=frozenset(), n_camadas=None, lote=LOTE_INICIAL):
+        """Como definir_camadas, mas em lotes: ao fim de cada um, as palavras dele já são buscáveis.
+
+        Dentro de cada camada entram primeiro as palavras de 'prioridade' (já aceitas pelo
+        jogo) e depois as mais curtas, em lotes que dobram de LOTE_INICIAL até LOTE_MAX.
+        'listas' pode ser um gerador (n_camadas informa quantas virão): a reserva só é lida
+        quando a principal acabou. Gerador: rende a fração concluída após cada lote, e
+        estado() tira o retrato publicável. Os ids seguem essa ordem de carga, não a do
+        .txt (só muda o desempate entre palavras de mesma pontuação).
+        """
+        n_camadas = n_camadas or len(listas)
+        self.definir_camadas([])
+        vistas = set()
+        grafias = np.empty(0, dtype=object)     # grafias em ordem alfabética, paralelo a _ordem
+        primeiro = {}                           # forma -> primeiro id (grupos)
+        for camada, lista in enumerate(listas):
+            fila = [w for w in self._entradas_validas(lista, camada) if w not in vistas]
+            vistas.update(fila)
+            fila.sort(key=lambda w: (w not in prioridade, len(w)))  # estável: o resto segue o .txt
+            ini = 0
+            while ini < len(fila):
+                grafias = self._anexar(fila[ini:ini + lote], camada, grafias, primeiro)
+                ini += lote
+                lote = min(lote * 2, LOTE_MAX)
+                yield (camada + min(ini, len(fila)) / len(fila)) / n_camadas
+        if not len(self._palavras):
+            # nada para indexar: ainda assim rende uma vez, para quem espera o primeiro retrato
+            yield 1.0
+
+    def _anexar(self, palavras, camada, grafias, primeiro):
+        """Acrescenta um lote no fim dos ids; toda estrutura é trocada, nunca alterada no lugar."""
+        base = len(self._palavras)
+        formas = [sem_acentos(w) for w in palavras]
+        ids = np.arange(base, base + len(palavras), dtype=np.uint32)
+
+        def juntar(velho, novo):
+            junto = dict(velho)
+            for k, v in novo.items():
+                junto[k] = np.concatenate((velho[k], v + base)) if k in velho else v + base
+            return junto
+
+        # ordem alfabética: intercala o lote ordenado na já existente (iguais: menor id primeiro)
+        ordem_lote = np.array(sorted(range(len(palavras)), key=palavras.__getitem__), dtype=np.intp)
+        novas = np.array([palavras[i] for i in ordem_lote.tolist()], dtype=object)
+        pos = np.searchsorted(grafias, novas, side="right")
+        grupos = np.fromiter((primeiro.setdefault(f, base + i) for i, f in enumerate(formas)),
+                             dtype=np.uint32, count=len(formas))
+        indice = juntar(self._indice, self._montar_indice(formas))
+        comprimentos, mascaras = self._tracos(palavras, formas)
+        mascaras = np.concatenate((self.mascaras, mascaras))
+        self._definir(self._palavras.juntar(ListaCompacta.de(palavras)),
+                      self._formas.juntar(ListaCompacta.de(formas)),
+                      np.insert(self._ordem, pos, ids[ordem_lote]),
+                      indice, np.concatenate((self._grupos, grupos)),
+                      juntar(self._prefixos, self._montar_prefixos(palavras)),
+                      (np.concatenate((self.comprimentos, comprimentos)), mascaras),
+                      self._cobertura(indice, mascaras),
+                      np.concatenate((self.camadas, np.full(len(palavras), camada, dtype=np.uint8))))
+        return np.insert(grafias, pos, novas)
+
+    def estado(self):
+        """Retrato das estruturas de busca; como nada é alterado no lugar, pode ir para outra thread."""
+        return (self._palavras, self._formas, self._ordem, self._indice, self._grupos, self._prefixos,
+                (self.comprimentos, self.mascaras), self.cobertura_letras, self.camadas,
+                self._sufixos, list(self.fontes))
+
+    def adotar(self, estado):
+        """Passa a usar um retrato tirado por estado() (ex.: de uma CargaDicionario)."""
+        *estruturas, sufixos, fontes = estado
+        self._definir(*estruturas)
+        self._sufixos = sufixos
+        self.fontes = fontes
+        self._compilado = None
+        self.do_cache = False
+
+    def adotar_motor(self, estado, motor):
+        """Passa a usar o motor de um retrato das mesmas palavras (CargaDicionario com 'base').
+
+        False se o dicionário foi trocado no meio: o array de sufixos seria de outras formas.
+        """
+        if estado[1] is not self._formas:
+            return False
+        self._sufixos = estado[-2]   # antes do motor: quem já vê 'sufixos' acha o array pronto
+        self.motor = motor
+        return True
+
+    def definir_motor(self, motor):
+        """Troca o motor de busca; o array de sufixos é montado na hora se faltar."""
+        self.motor = motor
+        if motor == MotorBusca.SUFIXOS.value and self._sufixos is None and len(self._formas):
+            self._sufixos = ArraySufixos.construir(self._formas.blob, self._formas.offsets)
+
+    def _definir(self, palavras, formas, ordem, indice, grupos, prefixos, tracos, cobertura, camadas):
+        self.geracao += 1
+        self._palavras = palavras
+        self._formas = formas
+        self._ordem = ordem
+        self._indice = indice
+        self._grupos = grupos
+        self._prefixos = prefixos
+        self.comprimentos, self.mascaras = tracos
+        self.cobertura_letras = cobertura
+        self.camadas = camadas
+        self._fim_camadas = np.cumsum(np.bincount(camadas, minlength=1))
+        self._emergencia = {}       # ids antigos: refeita por montar_emergencia()
+        self._sincronizar_bloqueio()
+
+    @staticmethod
+    def _ordenar_grafias(palavras):
+        # sorted é estável: entre grafias repetidas, o menor id vem primeiro
+        return np.array(sorted(range(len(palavras)), key=palavras.__getitem__), dtype=np.uint32)
+
+    def _id(self, palavra):
+        """Primeiro id com esta grafia exata (busca binária, sem dicionário str -> id), ou None."""
+        pos = bisect.bisect_left(self._ordem, palavra, key=self._palavras.__getitem__)
+        if pos < len(self._ordem) and self._palavras[self._ordem[pos]] == palavra:
+            return int(self._ordem[pos])
+        return None
+
+    @staticmethod
+    def _agrupar(formas):
+        """Para cada id, o primeiro id com a mesma forma: 'ação' e 'acao' são a mesma jogada."""
+        primeiro = {}
+        return np.fromiter((primeiro.setdefault(f, i) for i, f in enumerate(formas)),
+                           dtype=np.uint32, count=len(formas))
+
+    @staticmethod
+    def _tracos(palavras, formas):
+        """Comprimento da grafia e máscara das letras úteis da forma digitada, por id."""
+        n = len(palavras)
+        comprimentos = np.fromiter(map(len, palavras), dtype=np.uint16, count=n)
+        mascaras = np.fromiter((mascara_letras(set(f.lower())) for f in formas), dtype=np.uint32, count=n)
+        return comprimentos, mascaras
 
-    def carregar(self, caminho):
+    @staticmethod
+    def _silabas(indice, minimo=SILABA_MIN_PALAVRAS):
+        return sorted(k for k, ids in indice.items() if len(k) >= 2 and len(ids) >= minimo)
+
+    def silabas(self, minimo=SILABA_MIN_PALAVRAS):
+        """Fragmentos de 2 e 3 letras com palavras suficientes para o jogo sortear."""
+        return self._silabas(self._indice, minimo)
+
+    def atlas(self, fragmentos=None):
+        """Dificuldade de cada fragmento: (fragmento, candidatas, mais curta, mais longa).
+
+        Conta só as livres (fora da blacklist/rejeitadas), somando todas as camadas; sem
+        'fragmentos', percorre os de 2 e 3 letras do índice. Da mais difícil (menos
+        candidatas) para a mais fácil; sem candidatas, as palavras vêm None.
+        """
+        livres = (self._bloqueio & (self.BLOQ_BLACKLIST | self.BLOQ_REJEITADA)) == 0
+        if fragmentos is None:
+            fragmentos = [k for k in self._indice if len(k) >= 2 and k.isalpha()]
+        linhas = []
+        for frag in {sem_acentos(f.lower()) for f in fragmentos}:
+            ids = self._ids_com(frag)
+            ids = ids[livres[ids]]
+            if not len(ids):
+                linhas.append((frag, 0, None, None))
+                continue
+            comp = self.comprimentos[ids]
+            linhas.append((frag, len(ids), self._palavras[int(ids[comp.argmin()])],
+                           self._palavras[int(ids[comp.argmax()])]))
+        linhas.sort(key=lambda l: (l[1], l[0]))
+        return linhas
+
+    @classmethod
+    def _cobertura(cls, indice, mascaras):
+        """Para cada letra, em que fração das sílabas jogáveis dá para marcá-la."""
+        silabas = cls._silabas(indice)
+        if not silabas:
+            return np.zeros(len(LETRAS_ALFABETO))
+        uniao = np.array([np.bitwise_or.reduce(mascaras[indice[k]]) for k in silabas], dtype=np.uint32)
+        bits = np.uint32(1) << np.arange(len(LETRAS_ALFABETO), dtype=np.uint32)
+        return ((uniao[:, None] & bits) != 0).mean(axis=0)
+
+    # ---------- Exclusões (bits por id) ----------
+    @property
+    def blacklist(self):
+        return self._blacklist
+
+    @blacklist.setter
+    def blacklist(self, palavras):
+        self._blacklist = set(palavras)
+        self._aplicar_bit(self.BLOQ_BLACKLIST, self._blacklist)
+        self.geracao += 1
+
+    @property
+    def rejeitadas(self):
+        return self._rejeitadas
+
+    @rejeitadas.setter
+    def rejeitadas(self, palavras):
+        self._rejeitadas = set(palavras)
+        self._aplicar_bit(self.BLOQ_REJEITADA, self._rejeitadas)
+        self.geracao += 1
+
+    def observar_bloqueios(self, fn):
+        """Registra fn(palavra, bit, bloqueou), chamada quando uma palavra é bloqueada
+        (ou liberada, bloqueou=False) sem recarga."""
+        self._ouvintes.append(fn)
+
+    def _avisar(self, palavra, bit, bloqueou=True):
+        for fn in self._ouvintes:
+            fn(palavra, bit, bloqueou)
+
+    def ids_de(self, palavras):
+        """Ids de todas as entradas com a mesma forma digitada das palavras dadas."""
+        grupos = {int(self._grupos[i]) for i in map(self._id, palavras) if i is not None}
+        if not grupos:
+            return np.empty(0, dtype=np.intp)
+        if len(grupos) == 1:
+            return np.flatnonzero(self._grupos == grupos.pop())
+        return np.flatnonzero(np.isin(self._grupos, list(grupos)))
+
+    def ids_iguais(self, palavras):
+        """Ids cuja grafia é exatamente uma das palavras (repetidas no .txt incluídas)."""
+        ids = self.ids_de(palavras)
+        return ids[[self._palavras[i] in palavras for i in ids.tolist()]] if len(ids) else ids
+
+    def _aplicar_bit(self, bit, palavras):
+        self._bloqueio &= np.uint8(0xFF ^ bit)
+        self._bloqueio[self.ids_de(palavras)] |= np.uint8(bit)
+
+    def _sincronizar_bloqueio(self):
+        self._bloqueio = np.zeros(len(self._palavras), dtype=np.uint8)
+        self._aplicar_bit(self.BLOQ_BLACKLIST, self._blacklist)
+        self._aplicar_bit(self.BLOQ_REJEITADA, self._rejeitadas)
+        self._aplicar_bit(self.BLOQ_USADA, self._usadas)
+
+    def marcar_usada(self, palavra):
+        """Chamado a cada palavra aceita: o JKLM recusa repetição na mesma partida."""
+        self._usadas.add(palavra)
+        self._bloqueio[self.ids_de((palavra,))] |= np.uint8(self.BLOQ_USADA)
+        self._avisar(palavra, self.BLOQ_USADA)
+
+    def limpar_usadas(self):
+        self._usadas.clear()
+        self._bloqueio &= np.uint8(0xFF ^ self.BLOQ_USADA)
+
+    def forma_digitada(self, palavra):
+        """Como enviar a palavra: sem acentos (o pyautogui não digita 'ç'/'ã' e o jogo aceita)."""
+        i = self._id(palavra)
+        return self._formas[i] if i is not None else sem_acentos(palavra)
+
+    def carregar(self, caminho, motor=None, reservas=(), processos=1):
+        """Carrega o dicionário principal e, atrás dele, os de reserva que existirem.
+
+        Sem .bin atualizado, monta tudo (em 'processos' processos) e grava o .bin.
+        """
+        if motor is not None:
+            self.motor = motor
         self.palavras = []
+        self.do_cache = False
+        self.fontes = []
         if not os.path.exists(caminho):
             return False
+        reservas = self._reservas_validas(caminho, reservas)
+        self.fontes = [caminho, *reservas]
+
+        compilado = DicionarioCompilado(caminho, reservas=reservas)
+        if compilado.atualizado(self._secoes_exigidas(self.motor)):
+            try:
+                self._carregar_secoes(compilado.abrir())
+                self._compilado = compilado
+                self.do_cache = True
+                return True
+            except (OSError, ValueError, KeyError):
+                pass  # cache corrompido: refaz a partir do texto
+
+        self.definir_camadas([self._ler_txt(c) for c in self.fontes], processos)
+        try:
+            compilado.gravar(self._secoes_compiladas())
+        except OSError:
+            pass  # sem permissão de escrita: segue com o índice em memória
+        return True
+
+    @staticmethod
+    def _reservas_validas(caminho, reservas):
+        """Reservas que existem, sem repetidas e sem o próprio principal."""
+        return [r for r in dict.fromkeys(reservas)
+                if os.path.exists(r) and os.path.abspath(r) != os.path.abspath(caminho)]
+
+    @staticmethod
+    def _secoes_exigidas(motor):
+        # Motor 'sufixos' com um .bin sem o array: refaz tudo uma vez, já gravando o array
+        return ("sufixos",) if motor == MotorBusca.SUFIXOS.value else ()
+
+    @classmethod
+    def em_cache(cls, caminho, motor=MotorBusca.INDICE.value, reservas=()):
+        """True se carregar() vai direto ao .bin (milissegundos), sem montar nada."""
+        compilado = DicionarioCompilado(caminho, reservas=cls._reservas_validas(caminho, reservas))
+        return compilado.atualizado(cls._secoes_exigidas(motor))
+
+    @staticmethod
+    def _ler_txt(caminho):
+        palavras = []
         with open(caminho, "r", encoding="utf-8") as f:
             for line in f:
                 w = line.strip().lower()
                 if w:
-                    self.palavras.append(w)
-        return True
+                    palavras.append(w)
+        return palavras
+
+    # ---------- Formato compilado ----------
+    def _secoes_compiladas(self):
+        """Palavras e índice em arrays planos, no formato gravado por DicionarioCompilado."""
+        texto, offsets = self._palavras.blob, self._palavras.offsets
+        formas, offsets_formas = self._formas.blob, self._formas.offsets
+
+        chaves, inicio, ocorrencias = self._empacotar_listas(self._indice)
+        p_chaves, p_inicio, p_ocorrencias = self._empacotar_listas(self._prefixos)
+        return {
+            "texto": texto,
+            "offsets": offsets,
+            "formas": formas,
+            "offsets_formas": offsets_formas,
+            "grupos": self._grupos,
+            "ordem": self._ordem,
+            "chaves": chaves,
+            "chaves_inicio": inicio,
+            "ocorrencias": ocorrencias,
+            "prefixos": p_chaves,
+            "prefixos_inicio": p_inicio,
+            "prefixos_ocorrencias": p_ocorrencias,
+            "comprimentos": self.comprimentos,
+            "mascaras": self.mascaras,
+            "cobertura_letras": self.cobertura_letras,
+            "camadas": self.camadas,
+            **({"sufixos": self._sufixos.sufixos} if self._sufixos is not None else {}),
+        }
+
+    @staticmethod
+    def _empacotar_listas(listas):
+        """Dicionário chave -> ids em três arrays: chaves ('\n'), início de cada lista e ids."""
+        chaves = sorted(listas)
+        inicio = np.zeros(len(chaves) + 1, dtype=np.uint32)
+        np.cumsum([len(listas[k]) for k in chaves], out=inicio[1:])
+        ocorrencias = (np.concatenate([listas[k] for k in chaves]).astype(np.uint32)
+                       if chaves else np.empty(0, dtype=np.uint32))
+        return np.frombuffer("\n".join(chaves).encode("utf-8"), dtype=np.uint8), inicio, ocorrencias
+
+    @staticmethod
+    def _desempacotar_listas(chaves, inicio, ocorrencias):
+        chaves = chaves.tobytes().decode("utf-8")
+        chaves = chaves.split("\n") if chaves else []
+        # Fatias de um único array mapeado: nada é copiado para a memória do processo
+        return {k: ocorrencias[inicio[i]:inicio[i + 1]] for i, k in enumerate(chaves)}
+
+    def _carregar_secoes(self, secoes):
+        # Views do arquivo mapeado: nenhuma palavra vira str até ser usada
+        palavras = ListaCompacta(secoes["texto"], secoes["offsets"])
+        formas = ListaCompacta(secoes["formas"], secoes["offsets_formas"])
+        indice = self._desempacotar_listas(secoes["chaves"], secoes["chaves_inicio"], secoes["ocorrencias"])
+        prefixos = self._desempacotar_listas(secoes["prefixos"], secoes["prefixos_inicio"],
+                                             secoes["prefixos_ocorrencias"])
+        tracos = (secoes["comprimentos"], secoes["mascaras"])
+        self._definir(palavras, formas, secoes["ordem"], indice, secoes["grupos"], prefixos, tracos,
+                      secoes["cobertura_letras"], secoes["camadas"])
+        self._sufixos = None
+        if "sufixos" in secoes:
+            self._sufixos = ArraySufixos(formas.blob.tobytes(), formas.offsets, secoes["sufixos"])
+
+    # ---------- Índice de fragmentos ----------
+    @staticmethod
+    def _montar_indice(formas):
+        """Índice invertido: cada fragmento de 1 a 3 letras -> ids em ordem crescente.
+
+        A sílaba do Bomb Party tem até 3 letras, então uma consulta vira um acesso
+        ao dicionário e percorre só as palavras que de fato contêm o fragmento.
+        """
+        listas = {}
+        for i, w in enumerate(formas):
+            n = len(w)
+            for frag in {w[j:j + k] for k in range(1, TAM_MAX_FRAGMENTO + 1) for j in range(n - k + 1)}:
+                ids = listas.get(frag)
+                if ids is None:
+                    listas[frag] = ids = []
+                ids.append(i)
+        return {frag: np.array(ids, dtype=np.uint32) for frag, ids in listas.items()}
+
+    @staticmethod
+    def _montar_prefixos(palavras):
+        """Grafia -> ids pelo início (1 a 3 letras): a flag de prefixo vira um np.isin."""
+        listas = {}
+        for i, w in enumerate(palavras):
+            for k in range(1, min(len(w), TAM_MAX_FRAGMENTO) + 1):
+                ids = listas.get(w[:k])
+                if ids is None:
+                    listas[w[:k]] = ids = []
+                ids.append(i)
+        return {p: np.array(ids, dtype=np.uint32) for p, ids in listas.items()}
+
+    def com_prefixo(self, ids, frag):
+        """Para cada id, se a grafia começa com o fragmento (mesma regra de str.startswith)."""
+        if not frag:
+            return np.ones(len(ids), dtype=bool)
+        inicio = self._prefixos.get(frag[:TAM_MAX_FRAGMENTO])
+        if inicio is None:
+            return np.zeros(len(ids), dtype=bool)
+        if len(ids):
+            # a lista de prefixo cobre todas as camadas; só a faixa dos ids consultados interessa
+            inicio = inicio[np.searchsorted(inicio, ids.min()):np.searchsorted(inicio, ids.max(), "right")]
+        if len(frag) > TAM_MAX_FRAGMENTO:
+            inicio = np.array([i for i in inicio.tolist() if self._palavras[i].startswith(frag)],
+                              dtype=np.uint32)
+        return np.isin(ids, inicio)
+
+    def _ids_com(self, frag):
+        """Ids (array, em ordem do dicionário) das palavras que contêm o fragmento."""
+        if not frag:
+            return np.arange(len(self._palavras), dtype=np.uint32)
+        if len(frag) <= TAM_MAX_FRAGMENTO:
+            ids = self._indice.get(frag)
+            return ids if ids is not None else np.empty(0, dtype=np.uint32)
+        if self.motor == MotorBusca.SUFIXOS.value and self._sufixos is not None:
+            # o índice segue respondendo até 3 letras (lista pronta); daí em diante, sufixos
+            return self._sufixos.ids_com(frag)
+        # Fragmento maior que o índice (OCR leu letras a mais): parte da lista do
+        # trigrama mais raro e confere o fragmento inteiro só nessas palavras
+        trigramas = [frag[j:j + TAM_MAX_FRAGMENTO] for j in range(len(frag) - TAM_MAX_FRAGMENTO + 1)]
+        listas = [self._indice.get(t) for t in trigramas]
+        if any(ids is None for ids in listas):
+            return np.empty(0, dtype=np.uint32)
+        menor = min(listas, key=len)
+        return np.array([i for i in menor.tolist() if frag in self._formas[i]], dtype=np.uint32)
+
+    def _por_camada(self, ids):
+        """Fatias de uma lista crescente de ids, da camada principal para as de reserva."""
+        if len(self._fim_camadas) == 1:
+            return [ids]
+        return np.split(ids, np.searchsorted(ids, self._fim_camadas[:-1]))
+
+    def tamanhos_camadas(self):
+        """Quantas palavras cada camada trouxe (sem as repetidas de camadas anteriores)."""
+        return np.diff(self._fim_camadas, prepend=0).tolist()
+
+    def camada_de(self, palavra):
+        """Camada (0 = principal) da palavra, ou None se não estiver no dicionário."""
+        i = self._id(palavra)
+        return int(self.camadas[i]) if i is not None else None
+
+    def ids_candidatos(self, frag, excluir=None, bloquear_usadas=False):
+        """Ids com o fragmento que não estão bloqueados, só da primeira camada que tiver algum.
+
+        Uma máscara vetorizada por camada: a reserva só é tocada se a principal se esgotou.
+        """
+        todos = self._ids_com(sem_acentos(frag.lower()))
+        mascara = self.BLOQ_BLACKLIST | self.BLOQ_REJEITADA
+        if bloquear_usadas:
+            mascara |= self.BLOQ_USADA
+        # recusadas neste turno: conjunto minúsculo, convertido só aqui
+        recusadas = self.ids_de(excluir) if excluir else None
+        for ids in self._por_camada(todos):
+            ids = ids[(self._bloqueio[ids] & mascara) == 0]
+            if recusadas is not None and len(ids):
+                ids = ids[~np.isin(ids, recusadas)]
+            if len(ids):
+                return ids
+        return todos[:0]
+
+    def contar(self, frag, excluir=None, bloquear_usadas=False, por_camada=False):
+        """Quantas candidatas ids_candidatos devolveria, sem montar a lista de ids.
+
+        Um count_nonzero por camada direto da lista do índice. por_camada=True devolve a
+        contagem de cada camada (a reserva inclusive), para avisar de sílaba fraca.
+        """
+        mascara = self.BLOQ_BLACKLIST | self.BLOQ_REJEITADA
+        if bloquear_usadas:
+            mascara |= self.BLOQ_USADA
+        recusadas = self.ids_de(excluir) if excluir else None
+        contagens = []
+        for ids in self._por_camada(self._ids_com(sem_acentos(frag.lower()))):
+            livres = (self._bloqueio[ids] & mascara) == 0
+            n = int(np.count_nonzero(livres))
+            if recusadas is not None and n:
+                # as recusadas do turno são poucas: busca binária na lista crescente
+                pos = np.searchsorted(ids, recusadas)
+                dentro = pos < len(ids)
+                pos = pos[dentro][ids[pos[dentro]] == recusadas[dentro]]
+                n -= int(np.count_nonzero(livres[pos]))
+            if n and not por_camada:
+                return n
+            contagens.append(n)
+        return contagens if por_camada else 0
+
+    def top_k(self, frag, k, mais_longas=False, excluir=None, bloquear_usadas=False):
+        """As k candidatas mais curtas (ou mais longas) sem ordenar todas: O(n + k log k).
+
+        Mesmas candidatas de ids_candidatos; empate fica com a que vem antes no dicionário.
+        """
+        ids = self.ids_candidatos(frag, excluir, bloquear_usadas)
+        if not len(ids) or k <= 0:
+            return []
+        comp = self.comprimentos[ids].astype(np.int32)
+        if mais_longas:
+            comp = -comp
+        if len(ids) > k:
+            dentro = comp <= np.partition(comp, k - 1)[k - 1]
+            ids, comp = ids[dentro], comp[dentro]
+        return self._palavras.varios(ids[np.lexsort((ids, comp))[:k]].tolist())
 
     def carregar_blacklist(self, path=BLACKLIST_FILE):
         self.blacklist = self._ler_lista(path)
+        self._carimbar(path)
 
     def carregar_rejeitadas(self, path=REJEITADAS_FILE):
         self.rejeitadas = self._ler_lista(path)
+        self._carimbar(path)
+
+    def _carimbar(self, path):
+        self._carimbos[path] = self._estado_arquivo(path)
+
+    @staticmethod
+    def _estado_arquivo(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def lista_mudou(self, path):
+        """True se o arquivo foi alterado por fora desde a última leitura/escrita nossa (um stat)."""
+        return self._estado_arquivo(path) != self._carimbos.get(path)
+
+    def rejeitadas_mudaram(self, path=REJEITADAS_FILE):
+        return self.lista_mudou(path)
+
+    def atualizar_lista(self, bit, path):
+        """Relê a blacklist (ou rejeitadas) e aplica só a diferença para o que já estava valendo.
+
+        Bits, rankings em cache e tabela de emergência mudam só para as palavras que entraram
+        ou saíram; uma troca grande (arquivo substituído) cai na recarga completa.
+        Devolve (entraram, saíram).
+        """
+        atual = self._blacklist if bit == self.BLOQ_BLACKLIST else self._rejeitadas
+        # o que ainda está na fila do gravador não foi removido pelo usuário: só não chegou ao disco
+        novo = self._ler_lista(path) | GravadorLista.pendentes_de(path)
+        self._carimbar(path)
+        entram, saem = novo - atual, atual - novo
+        if len(entram) + len(saem) > self.DELTA_MAX:
+            if bit == self.BLOQ_BLACKLIST:
+                self.blacklist = novo
+            else:
+                self.rejeitadas = novo
+            self.montar_emergencia()
+            return entram, saem
+
+        atual -= saem
+        atual |= entram
+        if saem:
+            self._bloqueio[self.ids_de(saem)] &= np.uint8(0xFF ^ bit)
+            # gêmeas de mesma forma que continuam na lista seguem bloqueadas
+            formas = {self.forma_digitada(w) for w in saem}
+            self._bloqueio[self.ids_de([w for w in atual if self.forma_digitada(w) in formas])] |= np.uint8(bit)
+        if entram:
+            self._bloqueio[self.ids_de(entram)] |= np.uint8(bit)
+        for w in saem:
+            self._avisar(w, bit, bloqueou=False)
+        for w in entram:
+            self._avisar(w, bit)
+        if entram or saem:
+            self.montar_emergencia(fragmentos=self._fragmentos_de(entram | saem))
+        return entram, saem
+
+    def _fragmentos_de(self, palavras):
+        """Chaves do índice (1 a 3 letras) que as palavras contêm."""
+        frags = set()
+        for w in palavras:
+            f = self.forma_digitada(w)
+            frags.update(f[j:j + k] for k in range(1, TAM_MAX_FRAGMENTO + 1) for j in range(len(f) - k + 1))
+        return frags
 
     @staticmethod
     def _ler_lista(path):
@@ -319,43 +1477,304 @@ class Dicionario:
                         itens.add(w)
         return itens
 
-    def registrar_rejeitada(self, palavra, path=REJEITADAS_FILE):
-        """Marca uma palavra como desconhecida pelo jogo e persiste em disco."""
+    @staticmethod
+    def gravar_atlas(linhas, path=ATLAS_FILE):
+        """Grava o atlas (ver atlas()) em TSV: fragmento, candidatas, mais curta, mais longa."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# fragmento\tcandidatas\tmais_curta\tmais_longa\n")
+            for frag, n, curta, longa in linhas:
+                f.write(f"{frag}\t{n}\t{curta or ''}\t{longa or ''}\n")
+
+    @staticmethod
+    def ler_atlas(path=ATLAS_FILE):
+        """Linhas do atlas gravado, na ordem do arquivo; lista vazia se não existir."""
+        linhas = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    campos = line.rstrip("\n").split("\t")
+                    if len(campos) == 4 and not campos[0].startswith("#"):
+                        frag, n, curta, longa = campos
+                        linhas.append((frag, int(n), curta or None, longa or None))
+        return linhas
+
+    def registrar_rejeitada(self, palavra, path=REJEITADAS_FILE, compactar_cada=0):
+        """Marca uma palavra como desconhecida pelo jogo na hora; o disco fica com o GravadorLista.
+
+        compactar_cada > 0: a cada tantas linhas novas no arquivo, compacta de novo (ver
+        compactar_rejeitadas); 0 para quando o dicionário ainda não está inteiro.
+        """
         palavra = palavra.lower().strip()
-        if not palavra or palavra in self.rejeitadas:
-            return False
-        self.rejeitadas.add(palavra)
-        try:
-            with open(path, "a", encoding="utf-8") as f:
-                f.write(palavra + "\n")
-        except Exception:
+        if not palavra or palavra in self._rejeitadas:
             return False
+        self._rejeitadas.add(palavra)
+        self._bloqueio[self.ids_de((palavra,))] |= np.uint8(self.BLOQ_REJEITADA)
+        self._avisar(palavra, self.BLOQ_REJEITADA)
+        gravador = self._gravador(path)
+        gravador.adicionar(palavra)
+        if compactar_cada and gravador.desde_compactar >= compactar_cada:
+            self.compactar_rejeitadas(path)
         return True
 
-    def filtrar(self, frag, excluir=None):
-        """Palavras que contêm a sílaba, sem blacklist/rejeitadas/já usadas."""
-        frag = frag.lower()
-        excluir = excluir or frozenset()
-        return [w for w in self.palavras
-                if frag in w
-                and w not in self.blacklist
-                and w not in self.rejeitadas
-                and w not in excluir]
+    def _gravador(self, path):
+        gravador = GravadorLista.de(path)
+        if self._carimbar not in gravador.ao_gravar:
+            # escrita nossa não conta como edição externa (lista_mudou)
+            gravador.ao_gravar.append(self._carimbar)
+        return gravador
+
+    def compactar_rejeitadas(self, path=REJEITADAS_FILE):
+        """Tira do arquivo as repetidas e as que não estão mais no dicionário (em segundo plano).
+
+        Chame só com o dicionário inteiro carregado, senão some o que ainda não foi indexado.
+        """
+        if len(self._palavras):
+            self._gravador(path).compactar(w for w in self._rejeitadas if self._id(w) is not None)
+
+    # ---------- Tabela de emergência ----------
+    def montar_emergencia(self, por_fragmento=EMERGENCIA_POR_FRAGMENTO, fragmentos=None):
+        """Para cada fragmento do índice, as palavras mais curtas fora da blacklist/rejeitadas.
+
+        As já aceitas pelo jogo (self.aceitas) vêm primeiro; as só não recusadas completam
+        a lista. Em cada grupo a principal vem antes da reserva. Montada ao carregar e
+        refeita só nos 'fragmentos' afetados quando blacklist/rejeitadas mudam; consultada
+        quando não sobra tempo.
+        """
+        livres = (self._bloqueio & (self.BLOQ_BLACKLIST | self.BLOQ_REJEITADA)) == 0
+        confirmadas = np.zeros(len(livres), dtype=bool)
+        confirmadas[self.ids_de(self.aceitas)] = True
+        if fragmentos is None:
+            tabela, itens = {}, self._indice.items()
+        else:
+            tabela = self._emergencia
+            itens = [(k, self._indice[k]) for k in fragmentos if k in self._indice]
+        for frag, todos in itens:
+            ids = todos[livres[todos]]
+            ok = confirmadas[ids]
+            if not ok.any():
+                tabela[frag] = self._mais_curtas(ids, por_fragmento)
+                continue
+            escolhidas = self._mais_curtas(ids[ok], por_fragmento)
+            if len(escolhidas) < por_fragmento:
+                resto = self._mais_curtas(ids[~ok], por_fragmento - len(escolhidas))
+                escolhidas = np.concatenate([escolhidas, resto])
+            tabela[frag] = escolhidas
+        self._emergencia = tabela
+
+    def _mais_curtas(self, ids, k):
+        """Até k ids, as palavras mais curtas primeiro; a reserva só completa a principal."""
+        escolhidas, falta = [], k
+        for camada in self._por_camada(ids):
+            comp = self.comprimentos[camada]
+            if len(camada) > falta:
+                # só as de comprimento até o k-ésimo menor entram na ordenação
+                curtas = comp <= np.partition(comp, falta - 1)[falta - 1]
+                camada, comp = camada[curtas], comp[curtas]
+            escolhidas.append(camada[np.argsort(comp, kind="stable")[:falta]])
+            falta -= len(escolhidas[-1])
+            if not falta:
+                break
+        return escolhidas[0] if len(escolhidas) == 1 else np.concatenate(escolhidas)
+
+    def resposta_emergencia(self, frag, excluir=None, bloquear_usadas=False):
+        """Palavra curta para o fragmento em O(1), pulando as bloqueadas; None se acabarem."""
+        ids = self._emergencia.get(sem_acentos(frag.lower()))
+        if ids is None:
+            return None
+        mascara = self.BLOQ_BLACKLIST | self.BLOQ_REJEITADA
+        if bloquear_usadas:
+            mascara |= self.BLOQ_USADA
+        recusadas = {self.forma_digitada(w) for w in excluir} if excluir else ()
+        for i in ids.tolist():
+            if not self._bloqueio[i] & mascara and self._formas[i] not in recusadas:
+                return self._palavras[i]
+        return None
+
+    def filtrar(self, frag, excluir=None, bloquear_usadas=False):
+        """Palavras que contêm a sílaba, sem blacklist/rejeitadas/já usadas.
+
+        A comparação é sem acentos: 'cao' encontra 'ação'. Devolve a grafia do dicionário;
+        para enviar, use forma_digitada(). 'bloquear_usadas' aplica as marcadas com
+        marcar_usada(); 'excluir' é para o punhado de recusadas do turno atual.
+        """
+        return self._palavras.varios(self.ids_candidatos(frag, excluir, bloquear_usadas).tolist())
+
+
+class CargaDicionario:
+    """Carrega o dicionário numa thread, em lotes, sem nunca mexer no Dicionario em uso.
+
+    A thread monta num Dicionario próprio e publica um retrato (Dicionario.estado) a cada
+    lote; quem joga adota o mais recente entre um turno e outro com pegar(). No fim grava
+    o .bin, e a próxima abertura já vem do cache em milissegundos.
+
+    Com 'base' (retrato de um dicionário pronto) não relê nada: só monta o motor pedido
+    sobre as mesmas palavras e publica um retrato final, para Dicionario.adotar_motor.
+    Com 'so_final' (recarga com um dicionário já em uso) publica só o retrato completo;
+    se o .bin já estiver em dia, ele é aberto em vez de montar de novo.
+    """
+
+    def __init__(self, caminho, motor=MotorBusca.INDICE.value, reservas=(), prioridade=frozenset(),
+                 base=None, so_final=False):
+        self.caminho = caminho
+        self.motor = motor
+        self.reservas = Dicionario._reservas_validas(caminho, reservas)
+        self.prioridade = prioridade
+        self.base = base
+        self.so_final = so_final
+        self.progresso = 0.0        # fração das palavras já buscáveis
+        self.terminou = False
+        self.erro = None
+        self._cancelada = False
+        self._pendente = None       # (retrato, final) ainda não adotado
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._rodar, daemon=True)
+        self._thread.start()
+        return self
+
+    def cancelar(self):
+        self._cancelada = True
+
+    def esperar(self, timeout=None):
+        """Bloqueia até a carga terminar (ou o timeout); True se terminou."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.terminou
+
+    def _publicar(self, estado, final):
+        if self.so_final and not final:
+            return
+        with self._lock:
+            self._pendente = (estado, final)
+
+    def pegar(self):
+        """(retrato, final) mais recente ainda não adotado, ou None."""
+        with self._lock:
+            pendente, self._pendente = self._pendente, None
+        return pendente
+
+    def _rodar(self):
+        try:
+            obra = Dicionario()
+            if self.base is not None:
+                obra.adotar(self.base)
+            elif Dicionario.em_cache(self.caminho, self.motor, self.reservas):
+                obra.carregar(self.caminho, motor=self.motor, reservas=self.reservas)
+                if not self._cancelada:
+                    self._publicar(obra.estado(), final=True)
+                return
+            else:
+                obra.fontes = [self.caminho, *self.reservas]
+                listas = map(Dicionario._ler_txt, obra.fontes)
+                for fracao in obra.montar_em_lotes(listas, self.prioridade, len(obra.fontes)):
+                    if self._cancelada:
+                        return
+                    self.progresso = fracao
+                    self._publicar(obra.estado(), final=False)
+            obra.definir_motor(self.motor)      # array de sufixos só depois do último lote
+            if self._cancelada:
+                return
+            self._publicar(obra.estado(), final=True)
+            try:
+                DicionarioCompilado(self.caminho, reservas=self.reservas).gravar(obra._secoes_compiladas())
+            except OSError:
+                pass  # sem permissão de escrita: a próxima abertura monta de novo
+        except Exception as e:
+            self.erro = e
+        finally:
+            self.progresso = 1.0
+            self.terminou = True
+
+
+@dataclass
+class RankingFragmento:
+    """Candidatas de um (fragmento, modo) já filtradas, com a parte fixa da pontuação."""
+    ids: np.ndarray             # ids no dicionário, em ordem crescente
+    fixa: np.ndarray            # pontuação que não muda na partida (modo e prefixo), por id
+
+
+class PlanejadorAlfabeto:
+    """Quanto vale marcar cada letra que falta no grid de 23, pela raridade no dicionário.
+
+    Se uma letra aparece em uma fração c das sílabas jogáveis, esperar por ela custa
+    ~1/c turnos. O valor de uma palavra é a soma desse custo para as letras novas que
+    ela marca: escolher pelo maior valor encurta a estimativa de turnos até a vida extra.
+    """
+    BITS_BAIXOS = 12            # máscara de 23 bits = tabela de 12 bits + tabela de 11 bits
+
+    def __init__(self, cobertura):
+        self.cobertura = cobertura
+        self.pesos = 1.0 / np.maximum(np.asarray(cobertura, dtype=np.float64), 1e-3)
+        self._mascara_usadas = None
+        self._baixa = self._alta = None
+
+    @staticmethod
+    def _somas(pesos):
+        """Tabela: para cada combinação de bits, a soma dos pesos ligados."""
+        tabela = np.zeros(1 << len(pesos))
+        for b, peso in enumerate(pesos.tolist()):
+            tabela[1 << b:2 << b] = tabela[:1 << b] + peso   # mesmas combinações + este bit
+        return tabela
+
+    def _tabelas(self, mascara_usadas):
+        # Refeitas só quando o grid muda (uma vez por palavra aceita, não por candidata)
+        if mascara_usadas != self._mascara_usadas:
+            faltam = (MASCARA_ALFABETO ^ mascara_usadas) >> np.arange(len(self.pesos)) & 1
+            pesos = np.where(faltam, self.pesos, 0.0)
+            self._baixa = self._somas(pesos[:self.BITS_BAIXOS])
+            self._alta = self._somas(pesos[self.BITS_BAIXOS:])
+            self._mascara_usadas = mascara_usadas
+        return self._baixa, self._alta
+
+    def valor(self, mascaras, mascara_usadas):
+        """Valor das letras novas de cada máscara (array ou inteiro)."""
+        baixa, alta = self._tabelas(mascara_usadas)
+        mascaras = np.asarray(mascaras, dtype=np.uint32)
+        return baixa[mascaras & ((1 << self.BITS_BAIXOS) - 1)] + alta[mascaras >> self.BITS_BAIXOS]
+
+    def turnos_restantes(self, mascara_usadas):
+        """Estimativa de turnos até completar o grid a partir das letras já marcadas."""
+        baixa, alta = self._tabelas(mascara_usadas)
+        return float(baixa[-1] + alta[-1])
 
 
 class Selecionador:
-    def __init__(self, cfg: AppConfig):
+    CACHE_MAX = 256             # (fragmento, modo) guardados; o menos usado sai primeiro
+    PESO_ESTOURO = 0.01         # quem não cabe digitado com calma vale x0.01 x (sobra / tempo)
+
+    def __init__(self, cfg: AppConfig, dicionario=None):
         self.cfg = cfg
+        self.dicionario = dicionario  # recebe as marcações de uso (bits de exclusão)
         self.recentes = deque(maxlen=max(1, cfg.cooldown_repeticao))
         self.frequencia = {}        # contagem de uso por palavra (sessão)
-        self.letras_usadas = set()  # progresso rumo à vida extra
+        self.mascara_usadas = 0     # progresso rumo à vida extra (bits de LETRAS_ALFABETO)
         self.alfabeto_completado = 0
         self.usadas_partida = set() # o JKLM recusa repetição na mesma partida
 
+        self._planejador = None     # PlanejadorAlfabeto da cobertura atual do dicionário
+        self._cache = OrderedDict() # (fragmento, modo) -> RankingFragmento
+        self._cache_geracao = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.ultimo_top = []        # top N da última escolha_para (prévia no log, sem repontuar)
+        if dicionario is not None:
+            dicionario.observar_bloqueios(self._ao_mudar_bloqueio)
+
+    @property
+    def letras_usadas(self):
+        return {c for c, bit in BIT_LETRA.items() if self.mascara_usadas & bit}
+
+    @letras_usadas.setter
+    def letras_usadas(self, letras):
+        self.mascara_usadas = mascara_letras(sem_acentos("".join(letras)))
+
     # ---------- Pontuação ----------
     def _letras_novas(self, palavra):
-        letras = set(c for c in palavra if c.isalpha()) - IGNORADAS_ALFABETO
-        return len(letras - self.letras_usadas)
+        # Conta sobre o que é digitado: 'ação' vai como 'acao' e marca a, c, o
+        m = mascara_letras(sem_acentos(palavra.lower())) & ~self.mascara_usadas
+        return bin(m).count("1")
 
     def _score_base(self, palavra, criterio, frag, folga=1.0):
         if criterio == Modo.CURTA.value:
@@ -385,8 +1804,26 @@ class Selecionador:
         return base
 
     def _score_alfabeto(self, palavra):
+        planejador = self.planejador()
+        if planejador is not None:
+            mascara = mascara_letras(sem_acentos(palavra.lower()))
+            return float(planejador.valor(mascara, self.mascara_usadas)) + (len(palavra) * 0.05)
         return self._letras_novas(palavra) + (len(palavra) * 0.05)
 
+    def planejador(self):
+        """PlanejadorAlfabeto do dicionário atual, ou None (desligado ou sem dicionário)."""
+        if not self.cfg.planejar_alfabeto or self.dicionario is None:
+            return None
+        cobertura = self.dicionario.cobertura_letras
+        if not cobertura.any():
+            return None
+        if self._planejador is None or self._planejador.cobertura is not cobertura:
+            self._planejador = PlanejadorAlfabeto(cobertura)
+        return self._planejador
+
+    def _top_n(self, total):
+        return max(1, min(self.cfg.mostrar_top_n if self.cfg.mostrar_top_n > 0 else 1, total))
+
     def escolher(self, candidatos, modo: str, frag: str, folga: float = 1.0):
         """Escolhe uma palavra entre as candidatas.
 
@@ -402,24 +1839,220 @@ class Selecionador:
         else:
             scored = [(w, self._score_base(w, modo, frag, folga)) for w in candidatos]
 
-        scored.sort(key=lambda x: x[1], reverse=True)
-        top_n = max(1, min(self.cfg.mostrar_top_n if self.cfg.mostrar_top_n > 0 else 1, len(scored)))
-        top = scored[:top_n]
-        pesos = np.array([max(1e-3, s) for _, s in top], dtype=float)
-        pesos = pesos / pesos.sum()
-        return random.choices([w for w, _ in top], weights=pesos, k=1)[0]
+        # nlargest == sorted(reverse=True)[:n], empates na ordem de entrada, em O(n log k)
+        top = heapq.nlargest(self._top_n(len(scored)), scored, key=lambda x: x[1])
+        return self._sortear([w for w, _ in top], [s for _, s in top])
+
+    @staticmethod
+    def _sortear(palavras, pontuacoes):
+        """Sorteio ponderado pela pontuação entre as já selecionadas (top N)."""
+        pesos = np.maximum(np.asarray(pontuacoes, dtype=float), 1e-3)
+        acumulado = np.cumsum(pesos / pesos.sum())
+        return random.choices(palavras, cum_weights=acumulado.tolist(), k=1)[0]
+
+    @staticmethod
+    def _posicoes_top(ids, sc, k):
+        """Posições dos k melhores (pontuação desc., id asc.) sem ordenar tudo: O(n + k log k).
+
+        Pede 'ids' em ordem crescente: entre empatados no limiar, ficam os primeiros.
+        """
+        n = len(sc)
+        if k < n:
+            limiar = np.partition(sc, n - k)[n - k]     # k-ésima maior pontuação
+            acima = np.flatnonzero(sc > limiar)
+            empatados = np.flatnonzero(sc == limiar)[:k - len(acima)]
+            pos = np.concatenate((acima, empatados))
+        else:
+            pos = np.arange(n)
+        return pos[np.lexsort((ids[pos], -sc[pos]))]
+
+    # ---------- Pontuação vetorizada (todas as candidatas de uma vez) ----------
+    def _pontuacao_fixa(self, ids, modo, frag):
+        """A parte da pontuação que não muda durante a partida (modo e prefixo)."""
+        dic = self.dicionario
+        comp = dic.comprimentos[ids].astype(np.float64)
+        if modo == Modo.ALFABETO.value:
+            return comp * 0.05
+        if modo == Modo.CURTA.value:
+            base = 1.0 / (comp + 1e-3)
+        elif modo == Modo.LONGA.value:
+            base = comp
+        else:
+            base = np.ones(len(ids))
+        if self.cfg.preferir_prefixo:
+            base = np.where(dic.com_prefixo(ids, frag), base * max(1.0, self.cfg.peso_prefixo), base)
+        return base
+
+    def _letras_novas_vetor(self, ids):
+        """Mesmo que _letras_novas para todos os ids: popcount de máscara & ~usadas."""
+        faltam = np.uint32(MASCARA_ALFABETO ^ self.mascara_usadas)
+        return popcount(self.dicionario.mascaras[ids] & faltam).astype(np.int64)
+
+    def pontuar(self, ids, fixa, modo, folga=1.0):
+        """Pontuação final de cada id, idêntica a _score_base/_score_alfabeto palavra a palavra."""
+        if modo == Modo.ALFABETO.value:
+            planejador = self.planejador()
+            if planejador is not None:
+                return planejador.valor(self.dicionario.mascaras[ids], self.mascara_usadas) + fixa
+            return self._letras_novas_vetor(ids) + fixa
+
+        sc = fixa.copy()
+        if self.cfg.alfabeto_hibrido and folga > 0:
+            # novas == 0 multiplica por 1.0 exato: mesmo resultado do 'if novas' escalar
+            sc *= 1.0 + (self.cfg.peso_letras_novas * folga * self._letras_novas_vetor(ids) / 5.0)
+
+        if self.cfg.penaliza_repetidas and (self.frequencia or self.recentes):
+            # Só as palavras já usadas na sessão são penalizadas: poucas, tratadas uma a uma
+            alvo = {w for w, f in self.frequencia.items() if f > 0} | set(self.recentes)
+            palavras = self.dicionario.palavras
+            for p in np.flatnonzero(np.isin(ids, self.dicionario.ids_iguais(alvo))).tolist():
+                w = palavras[ids[p]]
+                freq = self.frequencia.get(w, 0)
+                if freq > 0:
+                    sc[p] *= (self.cfg.penalizacao_repetida ** freq)
+                if w in self.recentes:
+                    sc[p] *= 0.5
+        return sc
+
+    # ---------- Cache de rankings por fragmento ----------
+    def ranking(self, frag, modo, contar=True):
+        """Candidatas (LRU) do fragmento; refeitas só em falta ou recarga do dicionário.
+
+        contar=False não mexe nos contadores de acerto/falta (consultas só para log).
+        """
+        dic = self.dicionario
+        if self._cache_geracao != dic.geracao:
+            self.limpar_cache()
+            self._cache_geracao = dic.geracao
+        frag = sem_acentos(frag.lower())
+        chave = (frag, modo)
+        rk = self._cache.get(chave)
+        if rk is not None:
+            self.cache_hits += contar
+            self._cache.move_to_end(chave)
+            return rk
+
+        self.cache_misses += contar
+        ids = dic.ids_candidatos(frag, bloquear_usadas=self.cfg.bloquear_usadas_na_partida)
+        rk = RankingFragmento(ids, self._pontuacao_fixa(ids, modo, frag))
+        self._cache[chave] = rk
+        if len(self._cache) > self.CACHE_MAX:
+            self._cache.popitem(last=False)
+        return rk
+
+    def limpar_cache(self):
+        self._cache.clear()
+
+    def _ao_mudar_bloqueio(self, palavra, bit, bloqueou=True):
+        """Tira a palavra (e gêmeas de mesma forma) só dos rankings que a contêm.
+
+        Liberada (saiu da blacklist/rejeitadas): esses rankings são refeitos na próxima consulta.
+        """
+        if bit == Dicionario.BLOQ_USADA and not self.cfg.bloquear_usadas_na_partida:
+            return
+        forma = self.dicionario.forma_digitada(palavra)
+        if not bloqueou:
+            for chave in [c for c in self._cache if c[0] in forma]:
+                del self._cache[chave]
+            return
+        ids = None
+        esgotados = []
+        for chave, rk in self._cache.items():
+            if chave[0] in forma:
+                if ids is None:
+                    ids = self.dicionario.ids_de((palavra,))
+                manter = ~np.isin(rk.ids, ids)
+                rk.ids, rk.fixa = rk.ids[manter], rk.fixa[manter]
+                if not len(rk.ids):
+                    esgotados.append(chave)
+        # Camada esgotada: a próxima consulta refaz o ranking já com a camada de reserva
+        for chave in esgotados:
+            del self._cache[chave]
+
+    def _top(self, frag, modo, folga, excluir, contar, orcamento=None, tempo_fn=None, piso_fn=None):
+        """Palavras e pontuações (array) do top N, da melhor para a pior."""
+        rk = self.ranking(frag, modo, contar=contar)
+        ids, fixa = rk.ids, rk.fixa
+        if excluir and len(ids):
+            manter = ~np.isin(ids, self.dicionario.ids_de(excluir))
+            ids, fixa = ids[manter], fixa[manter]
+            if not len(ids):
+                # o turno recusou a camada inteira: desce para a reserva sem mexer no cache
+                ids = self.dicionario.ids_candidatos(frag, excluir, self.cfg.bloquear_usadas_na_partida)
+                fixa = self._pontuacao_fixa(ids, modo, sem_acentos(frag.lower()))
+        if orcamento is not None and piso_fn is not None and len(ids):
+            ids, fixa = self._cabem_no_tempo(ids, fixa, orcamento, piso_fn)
+        if not len(ids):
+            return [], np.empty(0)
+        sc = self.pontuar(ids, fixa, modo, clamp(folga, 0.0, 1.0))
+        if orcamento is not None and tempo_fn is not None:
+            sc = self._pesar_tempo(ids, sc, orcamento, tempo_fn)
+        pos = self._posicoes_top(ids, sc, self._top_n(len(ids)))
+        palavras = self.dicionario.palavras
+        return [palavras[i] for i in ids[pos].tolist()], sc[pos]
+
+    def _tempos(self, ids, tempo_fn):
+        """tempo_fn (comprimentos -> s) de cada id: avaliado uma vez por comprimento, lido por tabela."""
+        comp = self.dicionario.comprimentos[ids]
+        return np.asarray(tempo_fn(np.arange(int(comp.max()) + 1)), dtype=np.float64)[comp]
+
+    def _cabem_no_tempo(self, ids, fixa, orcamento, piso_fn):
+        """Só as candidatas que dá para mandar no orçamento nem que seja pelo FAST PATH.
+
+        piso_fn é o tempo mínimo (HumanTyper.tempo_minimo). Se nenhuma cabe, ficam as
+        mais rápidas: perder o turno é pior que estourar por pouco.
+        """
+        comp = self.dicionario.comprimentos[ids]
+        cabe = self._tempos(ids, piso_fn) <= orcamento
+        if cabe.all():
+            return ids, fixa
+        if not cabe.any():
+            cabe = comp == comp.min()
+        return ids[cabe], fixa[cabe]
+
+    def _pesar_tempo(self, ids, sc, orcamento, tempo_fn):
+        """Desconta na pontuação quem não dá para digitar com calma (tempo_fn) no orçamento.
+
+        As que cabem ficam como estão; as que estouram valem PESO_ESTOURO x sobra/tempo,
+        bem abaixo das que cabem e menos quanto mais estouram. Se nenhuma cabe, a ordem
+        entre elas continua valendo: o envio cai no FAST PATH de qualquer jeito.
+        """
+        tempos = self._tempos(ids, tempo_fn)
+        estoura = tempos > orcamento
+        if not estoura.any():
+            return sc
+        return np.where(estoura, sc * (self.PESO_ESTOURO * orcamento / np.maximum(tempos, 1e-6)), sc)
+
+    def melhores(self, frag: str, modo: str, folga: float = 1.0, excluir=None, contar=True):
+        """Top N (palavra, pontuação) do fragmento, da melhor para a pior; empate: ordem do dicionário."""
+        palavras, sc = self._top(frag, modo, folga, excluir, contar)
+        return list(zip(palavras, sc.tolist()))
+
+    def escolher_para(self, frag: str, modo: str, folga: float = 1.0, excluir=None,
+                      orcamento=None, tempo_fn=None, piso_fn=None):
+        """Igual a escolher(dicionario.filtrar(frag, excluir)), numa passada NumPy sobre o cache.
+
+        Com orcamento (s): piso_fn (comprimentos -> s, o mínimo) tira quem não sai a tempo
+        nem pelo FAST PATH; tempo_fn (o tempo humanizado) entra na pontuação, preferindo
+        quem cabe digitado com calma. Devolve None se não houver candidatas.
+        """
+        palavras, sc = self._top(frag, modo, folga, excluir, contar=True,
+                                 orcamento=orcamento, tempo_fn=tempo_fn, piso_fn=piso_fn)
+        self.ultimo_top = palavras
+        return self._sortear(palavras, sc) if palavras else None
 
     # ---------- Estado ----------
     def registrar_uso(self, palavra, modo: str):
         self.frequencia[palavra] = self.frequencia.get(palavra, 0) + 1
         self.recentes.append(palavra)
         self.usadas_partida.add(palavra)
+        if self.dicionario is not None:
+            self.dicionario.marcar_usada(palavra)
 
-        letras = set(c for c in palavra if c.isalpha()) - IGNORADAS_ALFABETO
-        self.letras_usadas.update(letras)
-        if len(self.letras_usadas) >= len(LETRAS_ALFABETO):
+        self.mascara_usadas |= mascara_letras(sem_acentos(palavra.lower()))
+        if self.mascara_usadas == MASCARA_ALFABETO:
             self.alfabeto_completado += 1
-            self.letras_usadas.clear()
+            self.mascara_usadas = 0
 
     def bloqueadas(self):
         """Palavras que o jogo recusaria agora por já terem sido usadas."""
@@ -428,7 +2061,11 @@ class Selecionador:
     def nova_partida(self):
         """Zera o que vale por partida (mantém estatísticas da sessão)."""
         self.usadas_partida.clear()
-        self.letras_usadas.clear()
+        if self.dicionario is not None:
+            self.dicionario.limpar_usadas()
+        if self.cfg.bloquear_usadas_na_partida:
+            self.limpar_cache()  # as usadas voltam a valer
+        self.mascara_usadas = 0
         self.recentes.clear()
 
 
@@ -448,6 +2085,169 @@ class Capturador:
         self._warned_turn_rect = False
         self._ocr = None            # None = ainda não testado; False = indisponível
         self._warned_ocr = False
+        # Quadro do ciclo: uma captura cobrindo todas as regiões, lida por vistas NumPy
+        self._quadro = None
+        self._quadro_origem = (0, 0)
+        self._quadro_em = 0.0
+        self._quadro_inteiro = False  # o quadro atual é a tela inteira (não só as regiões)
+        self.capturas = 0           # grabs de tela feitos (diagnóstico)
+        self._tela = None           # (largura, altura), vista na última captura da tela inteira
+        # Template da chatbox: lido do disco só quando o arquivo muda
+        self._template = None
+        self._template_chave = None # (caminho, mtime_ns, tamanho) do template em memória
+        self._piramide = []         # (escala, template redimensionado), na ordem de ESCALAS_CHATBOX
+        self.escala_chatbox = None  # escala do último acerto: depois dele, a única tentada
+        self._chatbox_rect = None   # (x, y, w, h) do último acerto
+        self._chatbox_faltas = 0    # faltas seguidas dentro da janela
+        self._varreduras_faltas = 0 # varreduras completas seguidas sem acerto
+        self.trava = threading.RLock()  # o bot e a VigiaTurno leem a tela de threads diferentes
+
+    # ---------- Quadro compartilhado ----------
+    def novo_quadro(self):
+        """Começo de um ciclo: a próxima leitura da tela faz uma captura nova."""
+        self._quadro = None
+
+    @staticmethod
+    def _rect_valido(rect):
+        return bool(rect) and len(rect) == 4 and rect[2] > 0 and rect[3] > 0
+
+    def _area_chatbox(self):
+        """Onde procurar o template da chatbox; None = tela inteira.
+
+        Janela em volta do último acerto (ou de pos_chatbox, antes do primeiro); a cada
+        CHATBOX_VARREDURA_CADA faltas seguidas, uma varredura completa acha a chatbox se
+        ela mudou de lugar.
+        """
+        if self._template is None or self._chatbox_faltas % CHATBOX_VARREDURA_CADA == CHATBOX_VARREDURA_CADA - 1:
+            return None
+        return self._janela_chatbox()
+
+    def _janela_chatbox(self):
+        """Janela em volta do último acerto (ou de pos_chatbox); None se não há onde centrar."""
+        template = self._template_na_escala()
+        if self._chatbox_rect is not None:
+            x, y, w, h = self._chatbox_rect
+        elif self.pos.pos_chatbox and len(self.pos.pos_chatbox) == 2:
+            h, w = template.shape[:2]
+            x, y = self.pos.pos_chatbox[0] - w // 2, self.pos.pos_chatbox[1] - h // 2
+        else:
+            return None
+        x0, y0 = max(0, x - CHATBOX_MARGEM_PX), max(0, y - CHATBOX_MARGEM_PX)
+        x1, y1 = x + w + CHATBOX_MARGEM_PX, y + h + CHATBOX_MARGEM_PX
+        if self._tela is not None:
+            x1, y1 = min(x1, self._tela[0]), min(y1, self._tela[1])
+        if x1 - x0 < template.shape[1] or y1 - y0 < template.shape[0]:
+            return None
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def _carregar_template(self):
+        """Template da chatbox em cinza; relido só quando caminho, mtime ou tamanho mudam."""
+        caminho = self.cfg.template_chatbox
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            self._template = self._template_chave = None
+            return None
+        chave = (caminho, st.st_mtime_ns, st.st_size)
+        if chave != self._template_chave:
+            self._template = cv2.imread(caminho, 0)
+            self._piramide = self._montar_piramide(self._template)
+            self._template_chave = chave
+            self._chatbox_rect = None       # template novo: o acerto antigo não vale mais
+            self._chatbox_faltas = self._varreduras_faltas = 0
+            self.escala_chatbox = None
+        return self._template
+
+    @staticmethod
+    def _montar_piramide(template):
+        """O template em cada escala de ESCALAS_CHATBOX (as pequenas demais ficam de fora)."""
+        if template is None:
+            return []
+        h, w = template.shape[:2]
+        piramide = []
+        for escala in ESCALAS_CHATBOX:
+            tam = (max(1, round(w * escala)), max(1, round(h * escala)))
+            if min(tam) < 8 and escala != 1.0:
+                continue
+            interp = cv2.INTER_AREA if escala < 1.0 else cv2.INTER_LINEAR
+            piramide.append((escala, template if escala == 1.0 else cv2.resize(template, tam, interpolation=interp)))
+        return piramide
+
+    def _template_na_escala(self):
+        for escala, tpl in self._piramide:
+            if escala == self.escala_chatbox:
+                return tpl
+        return self._template
+
+    def _escalas_a_tentar(self, varredura=False):
+        """Só a escala do último acerto; a pirâmide inteira antes do primeiro (ou após recalibrar_escala).
+
+        Fora do meu turno a chatbox some e toda busca erra: com a pirâmide inteira, cada
+        varredura completa custaria várias vezes a busca numa escala só. Por isso só uma
+        a cada CHATBOX_PIRAMIDE_CADA varreduras erradas seguidas tenta, depois da lembrada,
+        as outras escalas (a escala do Windows mudou no meio da sessão).
+        """
+        conhecida = [(e, t) for e, t in self._piramide if e == self.escala_chatbox]
+        if not conhecida:
+            return self._piramide
+        if varredura and self._varreduras_faltas % CHATBOX_PIRAMIDE_CADA == CHATBOX_PIRAMIDE_CADA - 1:
+            return conhecida + [(e, t) for e, t in self._piramide if e != self.escala_chatbox]
+        return conhecida
+
+    def recalibrar_escala(self):
+        """Esquece a escala e o lugar da chatbox: a próxima detecção tenta todas as escalas."""
+        with self.trava:
+            conhecida = self.escala_chatbox
+            self.escala_chatbox = None
+            self._chatbox_rect = None
+            self._chatbox_faltas = self._varreduras_faltas = 0
+        return conhecida
+
+    def _regioes_do_quadro(self):
+        """Retângulos (x, y, w, h) que o ciclo vai ler; None na lista = tela inteira."""
+        regioes = [self._area_chatbox()]
+        if self._rect_valido(self.pos.turn_bar_rect):
+            regioes.append(tuple(self.pos.turn_bar_rect))
+        if self.cfg.metodo_captura == MetodoCaptura.OCR.value and self._rect_valido(self.pos.letras_rect):
+            regioes.append(tuple(self.pos.letras_rect))
+        return regioes
+
+    @staticmethod
+    def _uniao(regioes):
+        """bbox (x0, y0, x1, y1) que cobre todas as regiões, ou None se alguma é a tela inteira."""
+        if not regioes or any(r is None for r in regioes):
+            return None
+        return (min(x for x, _, _, _ in regioes), min(y for _, y, _, _ in regioes),
+                max(x + w for x, _, w, _ in regioes), max(y + h for _, y, _, h in regioes))
+
+    def _quadro_atual(self):
+        agora = time.time()
+        if self._quadro is None or agora - self._quadro_em > QUADRO_MAX_IDADE_S:
+            bbox = self._uniao(self._regioes_do_quadro())
+            shot = ImageGrab.grab(bbox=bbox) if bbox else ImageGrab.grab()
+            self._quadro = np.asarray(shot.convert("RGB"))
+            self._quadro_origem = bbox[:2] if bbox else (0, 0)
+            self._quadro_inteiro = bbox is None
+            if bbox is None:
+                self._tela = (self._quadro.shape[1], self._quadro.shape[0])
+            self._quadro_em = agora
+            self.capturas += 1
+        return self._quadro, self._quadro_origem
+
+    def recorte(self, rect=None):
+        """Vista (sem cópia) do quadro do ciclo, em RGB; rect None = o quadro inteiro.
+
+        Região fora do quadro (posições mudaram no meio do ciclo): captura só ela.
+        """
+        quadro, (ox, oy) = self._quadro_atual()
+        if rect is None:
+            return quadro
+        x, y, w, h = rect
+        x0, y0 = x - ox, y - oy
+        if x0 < 0 or y0 < 0 or x0 + w > quadro.shape[1] or y0 + h > quadro.shape[0]:
+            self.capturas += 1
+            return np.asarray(ImageGrab.grab(bbox=(x, y, x + w, y + h)).convert("RGB"))
+        return quadro[y0:y0 + h, x0:x0 + w]
 
     # ---------- Diagnóstico de tela ----------
     @staticmethod
@@ -466,48 +2266,85 @@ class Capturador:
         return {"logica": logica, "fisica": fisica, "fator": fator, "ok": abs(fator - 1.0) < 0.01}
 
     def detectar_chatbox(self, refresh_reference=False):
-        # Se não existir template, assume turno
-        if not os.path.exists(self.cfg.template_chatbox):
-            if refresh_reference:
-                self._update_turn_reference()
-            return True
-        screen = np.array(ImageGrab.grab())
-        gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
-        template = cv2.imread(self.cfg.template_chatbox, 0)
+        with self.trava:
+            return self._detectar_chatbox(refresh_reference)
+
+    def _detectar_chatbox(self, refresh_reference):
+        # Se não existir template (ou não abrir), assume turno
+        template = self._carregar_template()
         if template is None:
             if refresh_reference:
                 self._update_turn_reference()
             return True
-        res = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
-        loc = np.where(res >= float(self.cfg.template_threshold))
-        ativa = len(loc[0]) > 0
+        area = self._area_chatbox()
+        if area is None and not self._quadro_inteiro:
+            self.novo_quadro()      # varredura completa: um quadro só das regiões não serve
+        screen = self.recorte(area)
+        ox, oy = (area[0], area[1]) if area else self._quadro_origem
+        acerto = self._casar(cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY), self._escalas_a_tentar(area is None))
+        ativa = acerto is not None
         if ativa:
+            escala, tpl, mx, my = acerto
+            if escala != self.escala_chatbox and escala != 1.0:
+                self.log(f"Chatbox encontrada na escala {escala:.0%} do template (escala do Windows diferente "
+                         f"da captura do chatbox.png).")
+            self.escala_chatbox = escala
+            self._chatbox_rect = (ox + mx, oy + my, tpl.shape[1], tpl.shape[0])
+            self._chatbox_faltas = self._varreduras_faltas = 0
             if refresh_reference:
                 self._update_turn_reference()
         else:
+            self._chatbox_faltas += 1
+            self._varreduras_faltas += area is None
             self.turn_bar_reference = None
             self._warned_turn_rect = False
         return ativa
 
+    def _casar(self, gray, escalas):
+        """(escala, template, x, y) do primeiro template acima do threshold, ou None."""
+        for escala, tpl in escalas:
+            if gray.shape[0] < tpl.shape[0] or gray.shape[1] < tpl.shape[1]:
+                continue
+            res = cv2.matchTemplate(gray, tpl, cv2.TM_CCOEFF_NORMED)
+            _, melhor, _, (mx, my) = cv2.minMaxLoc(res)
+            if melhor >= float(self.cfg.template_threshold):
+                return escala, tpl, mx, my
+        return None
+
+    def chatbox_visivel(self):
+        """A chatbox está na janela do último acerto? Para a VigiaTurno, sem efeitos colaterais.
+
+        Captura só a janela, por conta própria: não troca o quadro do ciclo, não conta faltas
+        (que disparam a varredura completa) nem mexe na referência da barra. A trava fica
+        presa só para ler o estado, nunca durante a captura e a busca.
+        """
+        with self.trava:
+            if self._carregar_template() is None:
+                return True
+            area = self._janela_chatbox()
+            escalas = self._escalas_a_tentar()
+        bbox = (area[0], area[1], area[0] + area[2], area[1] + area[3]) if area else None
+        shot = ImageGrab.grab(bbox=bbox) if bbox else ImageGrab.grab()
+        self.capturas += 1
+        gray = cv2.cvtColor(np.asarray(shot.convert("RGB")), cv2.COLOR_BGR2GRAY)
+        return self._casar(gray, escalas) is not None
+
     def capturar_barra_turno(self):
-        if not self.pos.turn_bar_rect or len(self.pos.turn_bar_rect) != 4:
-            return None
-        x, y, w, h = self.pos.turn_bar_rect
-        if w <= 0 or h <= 0:
+        """Barra de turno (vista do quadro do ciclo); copie antes de guardar."""
+        if not self._rect_valido(self.pos.turn_bar_rect):
             return None
         try:
-            shot = ImageGrab.grab(bbox=(x, y, x + w, y + h))
+            # Mantido em cores: o método 'pixel' converte para cinza na comparação
+            # (mesma conta de antes) e o método 'cor' usa os canais.
+            return self.recorte(tuple(self.pos.turn_bar_rect))
         except Exception as exc:
             self.log(f"Falha ao capturar barra de turno: {exc}")
             return None
-        # Mantido em cores: o método 'pixel' converte para cinza na comparação
-        # (mesma conta de antes) e o método 'cor' usa os canais.
-        return np.array(shot.convert("RGB"))
 
     def _update_turn_reference(self):
         img = self.capturar_barra_turno()
         if img is not None:
-            self.turn_bar_reference = img
+            self.turn_bar_reference = img.copy()  # a vista prenderia o quadro inteiro
             self._last_turn_capture = time.time()
             self._warned_turn_rect = False
 
@@ -550,12 +2387,14 @@ class Capturador:
         Usada para descobrir se a palavra enviada foi aceita: se o turno continua
         sendo seu alguns instantes após o ENTER, o jogo recusou a palavra.
         """
-        if not self.detectar_chatbox():
-            return False
-        atual = self.capturar_barra_turno()
-        if atual is None or self.turn_bar_reference is None:
-            return False
-        return self._similaridade_turno(atual) >= self.cfg.turn_bar_threshold
+        with self.trava:
+            self.novo_quadro()
+            if not self.detectar_chatbox():
+                return False
+            atual = self.capturar_barra_turno()
+            if atual is None or self.turn_bar_reference is None:
+                return False
+            return self._similaridade_turno(atual) >= self.cfg.turn_bar_threshold
 
     def confirmar_turno_para_envio(self):
         original_pos = None
@@ -571,26 +2410,28 @@ class Capturador:
                 moved_mouse = False
 
         try:
-            if not self.detectar_chatbox():
-                self.log("Recheque falhou: barra de turno não ativa.")
+            with self.trava:
+                self.novo_quadro()      # depois de tirar o mouse de cima: a tela de agora
+                if not self.detectar_chatbox():
+                    self.log("Recheque falhou: barra de turno não ativa.")
+                    return False
+                atual = self.capturar_barra_turno()
+                if atual is None:
+                    if not self._warned_turn_rect:
+                        self.log("Retângulo da barra de turno não configurado; envio cancelado.")
+                        self._warned_turn_rect = True
+                    return False
+                if self.turn_bar_reference is None:
+                    self.turn_bar_reference = atual.copy()
+                    self._warned_turn_rect = False
+                    return True
+                score = self._similaridade_turno(atual)
+                if score >= self.cfg.turn_bar_threshold:
+                    self.turn_bar_reference = atual.copy()
+                    self._warned_turn_rect = False
+                    return True
+                self.log(f"Envio cancelado: similaridade da barra {score:.3f} abaixo do threshold {self.cfg.turn_bar_threshold:.3f}.")
                 return False
-            atual = self.capturar_barra_turno()
-            if atual is None:
-                if not self._warned_turn_rect:
-                    self.log("Retângulo da barra de turno não configurado; envio cancelado.")
-                    self._warned_turn_rect = True
-                return False
-            if self.turn_bar_reference is None:
-                self.turn_bar_reference = atual
-                self._warned_turn_rect = False
-                return True
-            score = self._similaridade_turno(atual)
-            if score >= self.cfg.turn_bar_threshold:
-                self.turn_bar_reference = atual
-                self._warned_turn_rect = False
-                return True
-            self.log(f"Envio cancelado: similaridade da barra {score:.3f} abaixo do threshold {self.cfg.turn_bar_threshold:.3f}.")
-            return False
         finally:
             if moved_mouse and original_pos is not None:
                 try:
@@ -711,7 +2552,7 @@ class Capturador:
                 return None
 
         rect = self.pos.letras_rect
-        if not rect or len(rect) != 4 or rect[2] <= 0 or rect[3] <= 0:
+        if not self._rect_valido(rect):
             if not self._warned_ocr:
                 self._warned_ocr = True
                 self.log("Região das letras não capturada (Setup > Região da sílaba); usando clipboard.")
@@ -719,8 +2560,8 @@ class Capturador:
 
         x, y, w, h = rect
         try:
-            img = np.array(ImageGrab.grab(bbox=(x, y, x + w, y + h)).convert("RGB"))
-            gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+            with self.trava:
+                gray = cv2.cvtColor(self.recorte((x, y, w, h)), cv2.COLOR_RGB2GRAY)
             gray = cv2.resize(gray, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
             _, bw = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             # A sílaba costuma ser clara sobre fundo escuro; o Tesseract espera o contrário
@@ -735,6 +2576,94 @@ class Capturador:
             return None
 
 
+class VigiaTurno:
+    """Thread que olha só a barra de turno e a região da sílaba, em alta frequência.
+
+    Cada amostra é uma captura pequena (a união das duas regiões) reduzida pela metade
+    e comparada em cinza com a anterior. Só quando algo mudou — ou a cada
+    VIGIA_CONFIRMAR_CADA_S, como rede de segurança — confirma com chatbox_visivel (só a
+    janela da chatbox, sem tocar no quadro nem nas faltas do ciclo do bot) e publica na
+    fila (EventoTurno, instante da amostra): INICIOU/ACABOU quando o turno muda, SILABA
+    quando a sílaba muda com o turno ainda meu.
+    """
+
+    def __init__(self, capt, intervalo=VIGIA_INTERVALO_S, confirmar_cada=VIGIA_CONFIRMAR_CADA_S):
+        self.capt = capt
+        self.intervalo = intervalo
+        self.confirmar_cada = confirmar_cada
+        self.eventos = queue.Queue()
+        self.ativo = False          # último estado confirmado do turno
+        self.amostras = 0
+        self._anteriores = {}       # região -> última amostra reduzida
+        self._confirmado_em = 0.0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._rodar, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, timeout=1.0):
+        self._parar.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _regioes(self):
+        pos = self.capt.pos
+        return {nome: tuple(rect) for nome, rect in (("barra", pos.turn_bar_rect), ("silaba", self._rect_silaba()))
+                if Capturador._rect_valido(rect)}
+
+    def _rect_silaba(self):
+        """letras_rect se calibrado; senão uma caixa VIGIA_CAIXA_SILABA centrada em pos_letras."""
+        pos = self.capt.pos
+        if Capturador._rect_valido(pos.letras_rect):
+            return pos.letras_rect
+        if not pos.pos_letras or len(pos.pos_letras) != 2:
+            return None
+        w, h = VIGIA_CAIXA_SILABA
+        return (max(0, pos.pos_letras[0] - w // 2), max(0, pos.pos_letras[1] - h // 2), w, h)
+
+    def amostrar(self):
+        """Uma rodada da vigia: captura, compara, publica; devolve as regiões que mudaram."""
+        agora = time.time()
+        mudaram = set()
+        regioes = self._regioes()
+        if regioes:
+            x0, y0, _, _ = bbox = Capturador._uniao(list(regioes.values()))
+            quadro = np.asarray(ImageGrab.grab(bbox=bbox).convert("L"))
+            for nome, (x, y, w, h) in regioes.items():
+                atual = quadro[y - y0:y - y0 + h:2, x - x0:x - x0 + w:2].astype(np.int16)
+                anterior = self._anteriores.get(nome)
+                if (anterior is None or anterior.shape != atual.shape
+                        or np.abs(atual - anterior).mean() > VIGIA_LIMIAR):
+                    mudaram.add(nome)
+                self._anteriores[nome] = atual
+            self.amostras += 1
+
+        if mudaram or agora - self._confirmado_em >= self.confirmar_cada:
+            self._confirmado_em = agora
+            ativo = self.capt.chatbox_visivel()
+            if ativo != self.ativo:
+                self.ativo = ativo
+                self.eventos.put((EventoTurno.INICIOU if ativo else EventoTurno.ACABOU, agora))
+            elif ativo and "silaba" in mudaram:
+                self.eventos.put((EventoTurno.SILABA, agora))
+        return mudaram
+
+    def _rodar(self):
+        while not self._parar.is_set():
+            inicio = time.perf_counter()
+            try:
+                self.amostrar()
+            except Exception as exc:
+                self.capt.log(f"Vigia de turno: {exc}")
+                self._parar.wait(1.0)
+            self._parar.wait(max(0.0, self.intervalo - (time.perf_counter() - inicio)))
+
+
 # ==============================
 # Digitação Humanizada + Estimador
 # ==============================
@@ -748,6 +2677,8 @@ class HumanTyper:
         self.FAST_ERASE_TIME = 0.08     # ~80ms para Ctrl+A + Backspace
         self.KEYPRESS_TIME = 0.0015     # ~1.5ms por tecla
         self.BACKSPACE_KEY_TIME = 0.02  # ~20ms para backspace
+        self.QUICK_FOCUS_TIME = 0.05    # FAST PATH: espera mínima para focar
+        self.QUICK_LETTER_GAP = 0.001   # FAST PATH: intervalo entre letras
 
     # Sem jitter: clique direto
     def _focus_chat(self, pos):
@@ -786,11 +2717,12 @@ class HumanTyper:
         base += self.cfg.humanizar.variacao_delay * 0.5
         return base
 
+    # O modelo aceita um comprimento ou um array deles (tempo_digitacao pontua todas as candidatas)
     def _pausas_periodicas_time(self, n_chars):
         h = self.cfg.humanizar
-        if h.pausa_cada <= 0 or n_chars <= 1:
+        if h.pausa_cada <= 0:
             return 0.0
-        pausas = (n_chars - 1) // h.pausa_cada
+        pausas = np.maximum(n_chars - 1, 0) // h.pausa_cada
         return pausas * ((h.pausa_min + h.pausa_max) / 2.0)
 
     def _expected_numbers_extra(self, n_chars, include_nums):
@@ -826,9 +2758,9 @@ class HumanTyper:
         t += self._expected_numbers_extra(n_chars, include_nums)
 
         # pensar após 3 letras
-        if include_pensar3 and n_chars >= 3:
+        if include_pensar3:
             val_ms = think_ms if think_ms is not None else self.cfg.humanizar.pensar_3letras_pausa_ms
-            t += max(0.0, val_ms / 1000.0)
+            t += max(0.0, val_ms / 1000.0) * (np.asarray(n_chars) >= 3)
 
         # hesitação enter
         if envia:
@@ -927,10 +2859,10 @@ class HumanTyper:
             self.log(f"[TESTE] enviaria (rápido) -> {palavra}")
             return True
         self._focus_chat(pos_chatbox)
-        time.sleep(0.05)  # mínimo para focar
+        time.sleep(self.QUICK_FOCUS_TIME)  # mínimo para focar
         for ch in palavra:
             pyautogui.typewrite(ch)
-            time.sleep(0.001)
+            time.sleep(self.QUICK_LETTER_GAP)
         return self._try_send_enter_only_if_turn()
 
     def frase_engracada_e_apaga(self, pos_chatbox):
@@ -978,6 +2910,22 @@ class HumanTyper:
         return bool(ok1 and ok2)
 
     # ---------- Estimativa de tempo ----------
+    def tempo_digitacao(self, comprimentos):
+        """Tempo (s) esperado de digitar e enviar, humanizado, palavras desses comprimentos.
+
+        É estimate_round_time sem frase/ensaio/falha, para um array de comprimentos de uma
+        vez. A escolha prefere as candidatas que cabem nele no que sobra do turno.
+        """
+        return self._typing_block_expected(np.asarray(comprimentos, dtype=np.float64), envia=True)
+
+    def tempo_minimo(self, comprimentos):
+        """Tempo (s) de digitar e enviar palavras desses comprimentos pelo FAST PATH (digitar_quick).
+
+        É o mínimo para a palavra sair: quem não cabe nem assim fica fora da escolha.
+        """
+        n = np.asarray(comprimentos, dtype=np.float64)
+        return self.QUICK_FOCUS_TIME + n * (self.KEYPRESS_TIME + self.QUICK_LETTER_GAP) + self.KEYPRESS_TIME
+
     def estimate_round_time(self, palavra, use_frase, use_ensaio, use_falha, use_erro_enter, use_pensar3, include_nums):
         total = 0.0
         bd = {"frase": 0.0, "ensaio": 0.0, "falha": 0.0, "erro_enter": 0.0, "typing": 0.0}
@@ -1036,14 +2984,23 @@ class BotCore:
         self.ui_log = ui_logger
 
         self.dict = Dicionario()
-        self.selector = Selecionador(cfg)
+        self._carga = None           # CargaDicionario em andamento (carga em lotes)
+        self._aceitas = set()        # já aceitas pelo jogo: prioridade na carga em lotes
+        self.arquivo_aceitas = ACEITAS_FILE
+        self.arquivo_atlas = ATLAS_FILE
+        self._dificeis = []          # sílabas jogáveis mais difíceis do atlas (pré-aquecidas no cache)
+        self.selector = Selecionador(cfg, self.dict)
         self.capt = Capturador(pos, cfg, self._log)
         self.typer = HumanTyper(cfg, self._log, self.capt.confirmar_turno_para_envio)
 
         self.executando = False
         self.modo_atual = cfg.modo
         self.historico = []
+        self.fragmentos_vistos = {}  # fragmento -> vezes que caiu para mim (sessão)
         self.lock = threading.Lock()
+        self.trava_turno = threading.RLock()  # o laço a segura em cada ciclo; de fora, use entre_turnos
+        self._pedidos = queue.Queue()         # mudanças pedidas pela UI, aplicadas entre um turno e outro
+        self._aplicador = None                # thread que aplica os pedidos com o bot parado
 
         # estatísticas humanas
         self.acertos_consecutivos = 0
@@ -1056,12 +3013,15 @@ class BotCore:
         self.aceitas = 0
         self.recusadas = 0
         self.strikes = {}            # palavra -> nº de recusas (2 = vai para rejeitadas.txt)
+        self.respostas_aceite = deque(maxlen=50)  # segundos entre o ENTER e a barra mudar
         self.partidas = 0
 
         # ===== Controle de turno =====
         self._turno_ativo = False
         self._turno_inicio = 0.0
         self._ultimo_turno_em = time.time()
+        self.vigia = None              # VigiaTurno, enquanto o bot roda com cfg.vigia_turno
+        self._turno_visto_em = None    # instante em que a vigia viu o turno começar
 
     # ---------- Tempo da rodada ----------
     def _tempo_no_turno(self):
@@ -1076,16 +3036,45 @@ class BotCore:
         limite = max(0.1, self.cfg.limite_tempo_round_s)
         return clamp(self._orcamento_restante() / limite, 0.0, 1.0)
 
-    def _marcar_turno(self, ativo: bool):
-        """Detecta a virada 'não é minha vez' -> 'é minha vez' para cronometrar."""
+    def _marcar_turno(self, ativo: bool, visto_em=None):
+        """Detecta a virada 'não é minha vez' -> 'é minha vez' para cronometrar.
+
+        visto_em: quando a vigia viu a barra mudar (mais cedo que este ciclo); vale se recente.
+        """
         if ativo and not self._turno_ativo:
-            self._turno_inicio = time.time()
-            self._ultimo_turno_em = time.time()
+            agora = time.time()
+            recente = visto_em is not None and 0.0 <= agora - visto_em < 1.0
+            self._turno_inicio = visto_em if recente else agora
+            self._ultimo_turno_em = agora
         self._turno_ativo = ativo
 
+    def _esperar_evento(self, timeout):
+        """Dorme até o próximo ciclo, ou menos se a vigia avisar; devolve o último evento.
+
+        Os eventos acumulados são drenados de uma vez: o ciclo relê a tela de qualquer jeito.
+        """
+        vigia = self.vigia
+        if vigia is None:
+            time.sleep(timeout)
+            return None
+        try:
+            evento = vigia.eventos.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        while True:
+            if evento[0] == EventoTurno.INICIOU:
+                self._turno_visto_em = evento[1]
+            elif evento[0] == EventoTurno.ACABOU:
+                self._turno_visto_em = None
+            try:
+                evento = vigia.eventos.get_nowait()
+            except queue.Empty:
+                return evento
+
     # ---------- Partida ----------
     def nova_partida(self, motivo="manual"):
         self.selector.nova_partida()
+        self._pre_aquecer()          # se a troca de partida esvaziou o cache
         self.strikes.clear()
         self.partidas += 1
         self._log(f"Nova partida ({motivo}): palavras usadas e alfabeto zerados.")
@@ -1098,6 +3087,17 @@ class BotCore:
             self.nova_partida(f"{int(parado_ha)}s sem turnos")
             self._ultimo_turno_em = time.time()
 
+    def _checar_listas(self):
+        """blacklist.txt/rejeitadas.txt editados por fora: aplica só o que entrou e saiu."""
+        if not self.dict.palavras:
+            return
+        for bit, path in ((Dicionario.BLOQ_BLACKLIST, BLACKLIST_FILE),
+                          (Dicionario.BLOQ_REJEITADA, REJEITADAS_FILE)):
+            if self.dict.lista_mudou(path):
+                entram, saem = self.dict.atualizar_lista(bit, path)
+                if entram or saem:
+                    self._log(f"{path} mudou: +{len(entram)} / -{len(saem)} palavras.")
+
     @property
     def taxa_aceitacao(self):
         total = self.aceitas + self.recusadas
@@ -1109,17 +3109,132 @@ class BotCore:
             with open(LOG_FILE, "a", encoding="utf-8") as f:
                 f.write(f"{now()} - {msg}\n")
 
-    def carregar_dict_e_blacklist(self):
-        ok = self.dict.carregar(self.cfg.caminho_dicionario)
-        if not ok:
-            self._log(f"Arquivo de dicionário não encontrado: {self.cfg.caminho_dicionario}")
+    def carregar_dict_e_blacklist(self, segundo_plano=False, recarga=False):
+        """Lê dicionário, blacklist e rejeitadas.
+
+        segundo_plano=True e sem .bin pronto: monta em lotes numa CargaDicionario e retorna
+        na hora; as palavras entram à medida que são indexadas (ver aplicar_carga).
+        recarga=True: sempre numa CargaDicionario, e o dicionário atual segue valendo até a
+        nova versão inteira ficar pronta (nada de trocar para um lote parcial no meio do jogo).
+        """
+        if self._carga is not None:
+            self._carga.cancelar()
+            self._carga = None
+        cfg = self.cfg
+        if not os.path.exists(cfg.caminho_dicionario):
+            self.dict.palavras = []
+            self._log(f"Arquivo de dicionário não encontrado: {cfg.caminho_dicionario}")
             return False
         self.dict.carregar_blacklist(BLACKLIST_FILE)
         self.dict.carregar_rejeitadas(REJEITADAS_FILE)
-        self._log(f"Dicionário carregado ({len(self.dict.palavras)} palavras). "
-                  f"Blacklist: {len(self.dict.blacklist)} | Recusadas pelo jogo: {len(self.dict.rejeitadas)}")
+        self._aceitas = Dicionario._ler_lista(self.arquivo_aceitas)
+        self.dict.aceitas = self._aceitas
+
+        if recarga:
+            self._carga = CargaDicionario(cfg.caminho_dicionario, cfg.motor_busca, cfg.dicionarios_reserva,
+                                          self._aceitas, so_final=bool(len(self.dict.palavras))).iniciar()
+            self._log("Recarregando o dicionário em segundo plano; o atual segue valendo até terminar…")
+            return True
+        if segundo_plano and not Dicionario.em_cache(cfg.caminho_dicionario, cfg.motor_busca,
+                                                      cfg.dicionarios_reserva):
+            self._carga = CargaDicionario(cfg.caminho_dicionario, cfg.motor_busca,
+                                          cfg.dicionarios_reserva, self._aceitas).iniciar()
+            self._log("Dicionário sem cache: carregando em lotes (já aceitas e curtas primeiro)…")
+            return True
+
+        self.dict.carregar(cfg.caminho_dicionario, motor=cfg.motor_busca, reservas=cfg.dicionarios_reserva)
+        self._dicionario_pronto()
+        return True
+
+    def aplicar_carga(self):
+        """Adota o lote mais recente da carga em segundo plano; True enquanto ela não acabou."""
+        carga = self._carga
+        if carga is None:
+            return False
+        terminou = carga.terminou       # lido antes de pegar(): o último retrato já foi publicado
+        pendente = carga.pegar()
+        if pendente is not None:
+            estado, final = pendente
+            if carga.base is None:
+                self.dict.adotar(estado)
+            else:
+                self.dict.adotar_motor(estado, carga.motor)
+            if final:
+                self._carga = None
+                if carga.base is None:
+                    self._dicionario_pronto()
+                self.trocar_motor(self.cfg.motor_busca)   # pode ter mudado durante a carga
+                return False
+        elif terminou:
+            self._carga = None
+            if carga.erro is not None:
+                self._log(f"Falha ao carregar dicionário: {carga.erro}")
+            return False
+        return True
+
+    def trocar_motor(self, motor):
+        """Troca o motor de busca sem travar quem chama; True se a troca ficou para depois.
+
+        O array de sufixos que faltar é montado numa CargaDicionario sobre o dicionário atual
+        e entra por aplicar_carga, como os lotes. Com carga em andamento, vale o motor da
+        config quando ela terminar.
+        """
+        if self._carga is not None:
+            return True
+        if motor == MotorBusca.SUFIXOS.value and self.dict._sufixos is None and len(self.dict.palavras):
+            cfg = self.cfg
+            self._carga = CargaDicionario(cfg.caminho_dicionario, motor, cfg.dicionarios_reserva,
+                                          base=self.dict.estado()).iniciar()
+            return True
+        self.dict.definir_motor(motor)
+        return False
+
+    @property
+    def progresso_carga(self):
+        """Fração já buscável da carga em lotes, ou None se não há carga em andamento."""
+        return None if self._carga is None else self._carga.progresso
+
+    def _dicionario_pronto(self):
+        """Dicionário inteiro indexado: respostas de emergência, log e limpeza de rejeitadas.txt."""
+        self.dict.montar_emergencia()
+        self._log_dicionario()
+        self.dict.compactar_rejeitadas(REJEITADAS_FILE)
+        self._dificeis = self._ler_dificeis()
+        if self._pre_aquecer():
+            self._log(f"Cache pré-aquecido com as {len(self._dificeis)} sílabas mais difíceis do atlas.")
+
+    def _ler_dificeis(self):
+        """Sílabas jogáveis com menos candidatas, do atlas gravado (se for mais novo que o dicionário)."""
+        try:
+            atlas_em = os.path.getmtime(self.arquivo_atlas)
+            if any(os.path.getmtime(f) > atlas_em for f in self.dict.fontes):
+                return []
+        except OSError:
+            return []
+        linhas = Dicionario.ler_atlas(self.arquivo_atlas)
+        return [frag for frag, n, _, _ in linhas if n >= SILABA_MIN_PALAVRAS][:PRE_AQUECER_N]
+
+    def _pre_aquecer(self):
+        """Monta de antemão os rankings das sílabas difíceis: ali uma falta de cache custa caro."""
+        if not self._dificeis or not self.dict.palavras:
+            return False
+        for frag in self._dificeis:
+            self.selector.ranking(frag, self.modo_atual, contar=False)
         return True
 
+    def atlas_da_sessao(self):
+        """Linhas do atlas (Dicionario.atlas) das sílabas que caíram nesta sessão."""
+        if not self.fragmentos_vistos or not self.dict.palavras:
+            return []
+        return self.dict.atlas(self.fragmentos_vistos)
+
+    def _log_dicionario(self):
+        origem = " do cache binário" if self.dict.do_cache else ""
+        principal, *reservas = self.dict.tamanhos_camadas()
+        reserva = f" + {sum(reservas)} de reserva" if len(self.dict.fontes) > 1 else ""
+        self._log(f"Dicionário carregado{origem} ({principal} palavras{reserva}). "
+                  f"Blacklist: {len(self.dict.blacklist)} | Recusadas pelo jogo: {len(self.dict.rejeitadas)}")
+
     def set_modo(self, modo: str):
         self.modo_atual = modo
         self._log(f"Modo selecionado: {modo}")
@@ -1129,11 +3244,64 @@ class BotCore:
             if self.executando:
                 return
             self.executando = True
+        if self.cfg.vigia_turno and self.vigia is None:
+            self.vigia = VigiaTurno(self.capt).iniciar()
         threading.Thread(target=self._main_loop, daemon=True).start()
 
     def parar(self):
         with self.lock:
             self.executando = False
+        if self.vigia is not None:
+            self.vigia.parar()
+            self.vigia = None
+
+    # ---------- Pedidos de fora do laço ----------
+    def entre_turnos(self, fn):
+        """Agenda fn para rodar fora de uma rodada, sem disputar o dicionário e o cache com o bot.
+
+        Rodando, o laço aplica no começo do próximo ciclo; parado, uma thread curta aplica
+        assim que o último ciclo soltar trava_turno.
+        """
+        self._pedidos.put(fn)
+        if not self.executando:     # lido depois do put: o laço que sai ainda drena a fila
+            self.aplicar_parado()
+
+    def _aplicar_pedidos(self):
+        """Roda os pedidos acumulados; quem chama segura trava_turno."""
+        while True:
+            try:
+                fn = self._pedidos.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                fn()
+            except Exception as e:
+                self._log(f"Falha ao aplicar mudança pedida: {e}")
+
+    def aplicar_parado(self):
+        """Com o bot parado: pedidos e lotes da carga entram numa thread curta, não na UI.
+
+        Ela espera trava_turno, então nunca adota um dicionário no meio da rodada que o
+        laço ainda termina depois de parar(); montar_emergencia também fica fora da UI.
+        """
+        if self._aplicador is not None and self._aplicador.is_alive():
+            return
+        self._aplicador = threading.Thread(target=self._aplicar_fora_do_laco, daemon=True)
+        self._aplicador.start()
+
+    def _aplicar_fora_do_laco(self):
+        with self.trava_turno:
+            self._aplicar_pedidos()
+            self.aplicar_carga()
+
+    def aplicar_motor(self, motor):
+        """trocar_motor com aviso no log (pedido pela UI ao salvar a config)."""
+        if self.dict.motor == motor:
+            return
+        if self.trocar_motor(motor):
+            self._log(f"Motor de busca: {motor} (montando em segundo plano).")
+        else:
+            self._log(f"Motor de busca: {motor}.")
 
     def _select_triggers(self):
         h = self.cfg.humanizar
@@ -1147,39 +3315,72 @@ class BotCore:
 
     def _main_loop(self):
         self._log(f"Iniciando no modo: {self.modo_atual}")
-        if not self.dict.palavras:
-            if not self.carregar_dict_e_blacklist():
-                self.parar()
-                return
+        with self.trava_turno:
+            carregou = (bool(self.dict.palavras) or self._carga is not None
+                        or self.carregar_dict_e_blacklist(segundo_plano=True))
+        if not carregou:
+            self.parar()
+            return
 
         while True:
-            with self.lock:
-                if not self.executando:
+            with self.trava_turno:
+                with self.lock:
+                    parado = not self.executando
+                # Pedidos da UI e lotes novos entram entre um turno e outro
+                self._aplicar_pedidos()
+                if parado:
                     self._log("Processo parado.")
                     return
 
-            meu_turno = self.capt.detectar_chatbox(refresh_reference=True)
-            self._marcar_turno(meu_turno)
-
-            if meu_turno:
-                frag = self.capt.capturar_letras()
-                if frag:
-                    self._log(f"Letras detectadas: {frag}")
-                    try:
-                        self._jogar_rodada(frag)
-                    except Exception as e:
-                        self._log(f"Falha ao jogar a rodada: {e}")
+                # Sem o primeiro lote da carga, ainda não há o que jogar
+                if self.aplicar_carga() and not self.dict.palavras:
+                    time.sleep(0.05)
+                    continue
+
+                self.capt.novo_quadro()     # chatbox, barra e sílaba saem da mesma captura
+                meu_turno = self.capt.detectar_chatbox(refresh_reference=True)
+                self._marcar_turno(meu_turno, self._turno_visto_em)
+                self._turno_visto_em = None
+
+                if meu_turno:
+                    frag = self.capt.capturar_letras()
+                    if frag:
+                        self._log(f"Letras detectadas: {frag}")
+                        try:
+                            self._jogar_rodada(frag)
+                        except Exception as e:
+                            self._log(f"Falha ao jogar a rodada: {e}")
+                    else:
+                        self._log("Captura vazia; tentando novamente.")
                 else:
-                    self._log("Captura vazia; tentando novamente.")
-            else:
-                self._checar_inatividade()
+                    self._checar_inatividade()
+                    self._checar_listas()
 
-            time.sleep(self.cfg.delay_ciclo_ms / 1000.0)
+            # Com a vigia ligada, uma mudança na barra ou na sílaba acorda o ciclo na hora
+            self._esperar_evento(self.cfg.delay_ciclo_ms / 1000.0)
 
     # ---------- Rodada ----------
+    def _logar_candidatas(self, frag):
+        """Prévia do top N e aviso de sílaba fraca, só com contagens do índice.
+
+        O top N é o que escolher_para já montou; nenhuma lista de candidatas é criada aqui.
+        """
+        bloquear = self.cfg.bloquear_usadas_na_partida
+        total = self.dict.contar(frag, bloquear_usadas=bloquear)   # para na primeira camada com alguma
+        if self.cfg.mostrar_top_n > 0:
+            self._log(f"Top opções ({total} candidatas): {', '.join(self.selector.ultimo_top)}")
+        if total >= ATLAS_FINO:
+            return
+        livres = sum(self.dict.contar(frag, bloquear_usadas=bloquear, por_camada=True))
+        if livres < ATLAS_FINO:
+            curtas = ", ".join(self.dict.top_k(frag, 3, bloquear_usadas=bloquear))
+            self._log(f"Sílaba '{frag}' fraca no dicionário: só {livres} candidata(s) livres ({curtas}).")
+
     def _jogar_rodada(self, frag):
         """Tenta palavras até uma ser aceita pelo jogo (ou acabarem as tentativas)."""
         excluidas = set()
+        chave = sem_acentos(frag.lower())
+        self.fragmentos_vistos[chave] = self.fragmentos_vistos.get(chave, 0) + 1
         tentativas = max(1, self.cfg.max_tentativas_rodada)
 
         for tentativa in range(1, tentativas + 1):
@@ -1187,8 +3388,21 @@ class BotCore:
                 if not self.executando:
                     return
 
-            candidatos = self.dict.filtrar(frag, excluir=set(self.selector.bloqueadas()) | excluidas)
-            if not candidatos:
+            folga = self._folga()
+            escolha = None
+            if folga <= self.cfg.folga_emergencia:
+                escolha = self.dict.resposta_emergencia(frag, excluidas,
+                                                        self.cfg.bloquear_usadas_na_partida)
+                if escolha:
+                    self._log(f"Sem tempo: resposta de emergência para '{frag}'.")
+            emergencia = bool(escolha)
+            if not emergencia:
+                escolha = self.selector.escolher_para(frag, self.modo_atual, folga=folga,
+                                                      excluir=excluidas,
+                                                      orcamento=self._orcamento_restante(),
+                                                      tempo_fn=self.typer.tempo_digitacao,
+                                                      piso_fn=self.typer.tempo_minimo)
+            if not escolha:
                 if tentativa == 1:
                     # Regra: quando não achar no dicionário, fala a frase definida
                     self._log("Nenhuma palavra encontrada – enviando frase padrão.")
@@ -1198,18 +3412,19 @@ class BotCore:
                     self._log(f"Sem mais candidatos para '{frag}' nesta rodada.")
                 return
 
-            escolha = self.selector.escolher(candidatos, self.modo_atual, frag, folga=self._folga())
-            if not escolha:
-                return
-
-            if self.cfg.mostrar_top_n > 0 and tentativa == 1:
-                top_preview = ", ".join(candidatos[:min(self.cfg.mostrar_top_n, len(candidatos))])
-                self._log(f"Top opções ({len(candidatos)} candidatas): {top_preview}")
+            if tentativa == 1 and not emergencia:
+                self._logar_candidatas(frag)
 
             sufixo = f"  (tentativa {tentativa}/{tentativas})" if tentativa > 1 else ""
+            digitada = self.dict.forma_digitada(escolha)
+            if digitada != escolha:
+                sufixo += f"  → digitando '{digitada}'"
+            camada = self.dict.camada_de(escolha)
+            if camada:
+                sufixo += f"  [reserva: {os.path.basename(self.dict.fontes[camada])}]"
             self._log(f"Escolhida: {escolha}{sufixo}")
 
-            resultado = self._enviar_palavra(escolha, frag, apressado=(tentativa > 1))
+            resultado = self._enviar_palavra(escolha, frag, apressado=(tentativa > 1), digitada=digitada)
 
             if resultado == "aceita":
                 return
@@ -1223,12 +3438,16 @@ class BotCore:
 
         self._log(f"{tentativas} tentativas sem sucesso para '{frag}'.")
 
-    def _enviar_palavra(self, escolha, frag, apressado=False):
+    def _enviar_palavra(self, escolha, frag, apressado=False, digitada=None):
         """Envia a palavra com (ou sem) encenação e confere se o jogo aceitou.
 
+        digitada: o que vai para o teclado (forma sem acento); 'escolha' segue sendo
+        a grafia do dicionário para estatísticas e aprendizado.
+
         Retorna: 'aceita' | 'recusada' | 'cancelado' | 'falha_proposital'.
         """
         h = self.cfg.humanizar
+        texto = digitada or escolha
 
         if apressado:
             trig_frase = trig_ensaio = trig_falha = trig_erro_enter = False
@@ -1239,10 +3458,10 @@ class BotCore:
         # "Pensar após 3 letras" agora só reage à palavra escolhida – não filtra mais
         # o conjunto de candidatas (isso empobrecia demais a seleção).
         use_pensar3 = (not apressado and h.pensar_3letras
-                       and len(frag) >= 3 and escolha.startswith(frag[:3]))
+                       and len(frag) >= 3 and texto.startswith(frag[:3]))
 
         est, breakdown = self.typer.estimate_round_time(
-            escolha,
+            texto,
             use_frase=trig_frase,
             use_ensaio=trig_ensaio,
             use_falha=trig_falha,
@@ -1272,7 +3491,7 @@ class BotCore:
 
         # ----- execução -----
         if trig_falha:
-            enviada = self.typer.falha_proposital(escolha, self.pos.pos_chatbox)
+            enviada = self.typer.falha_proposital(texto, self.pos.pos_chatbox)
             if enviada is None:
                 self._log("Falha proposital cancelada (não era a sua vez no ENTER).")
                 return "cancelado"
@@ -1283,7 +3502,7 @@ class BotCore:
 
         if trig_erro_enter:
             self._log("Enviando UMA letra errada + ENTER; depois corrigindo.")
-            if not self.typer.erro_enter_e_corrige(escolha, self.pos.pos_chatbox):
+            if not self.typer.erro_enter_e_corrige(texto, self.pos.pos_chatbox):
                 self._log("Fluxo errEnter cancelado (não era sua vez em algum ENTER).")
                 return "cancelado"
         else:
@@ -1292,17 +3511,17 @@ class BotCore:
                 self.typer.frase_engracada_e_apaga(self.pos.pos_chatbox)
             if trig_ensaio:
                 self._log("Ensaio/rascunho & apagar (simulação).")
-                self.typer.ensaiar_palavra_e_apagar(escolha, self.pos.pos_chatbox)
+                self.typer.ensaiar_palavra_e_apagar(texto, self.pos.pos_chatbox)
 
             if fast_path:
-                ok_send = self.typer.digitar_quick(escolha, self.pos.pos_chatbox)
-            elif use_pensar3 and len(escolha) >= 3:
+                ok_send = self.typer.digitar_quick(texto, self.pos.pos_chatbox)
+            elif use_pensar3 and len(texto) >= 3:
                 self._log(f"Pensar após 3 letras: pausa {h.pensar_3letras_pausa_ms} ms.")
                 ok_send = self.typer.digitar_pensando_3(
-                    escolha, self.pos.pos_chatbox,
+                    texto, self.pos.pos_chatbox,
                     think_ms=h.pensar_3letras_pausa_ms, override_nums=use_nums)
             else:
-                ok_send = self.typer.digitar(escolha, self.pos.pos_chatbox, override_nums=use_nums)
+                ok_send = self.typer.digitar(texto, self.pos.pos_chatbox, override_nums=use_nums)
 
             if not ok_send:
                 self._log("Envio cancelado no ENTER (não era mais a sua vez).")
@@ -1316,16 +3535,49 @@ class BotCore:
         return "aceita"
 
     def _verificar_aceite(self):
-        """Se o turno continua sendo meu logo após o ENTER, a palavra foi recusada."""
+        """Se o turno continua sendo meu até a espera máxima após o ENTER, a palavra foi recusada.
+
+        Olha a barra em intervalos curtos e volta assim que ela muda; o tempo até a mudança
+        entra na distribuição que define a espera das próximas conferências.
+        """
         if not self.cfg.verificar_envio or self.cfg.modo_teste:
             return True
-        time.sleep(max(0.05, self.cfg.delay_verificacao_ms / 1000.0))
-        return not self.capt.turno_ativo()
+        inicio = time.perf_counter()
+        limite = inicio + self._espera_aceite()
+        while True:
+            if not self.capt.turno_ativo():
+                self._registrar_resposta(time.perf_counter() - inicio)
+                return True
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                return False
+            time.sleep(min(ACEITE_INTERVALO_S, restante))
+
+    def _espera_aceite(self):
+        """Quanto esperar a barra mudar antes de dar a palavra como recusada (s).
+
+        Até juntar ACEITE_MIN_AMOSTRAS respostas vale o delay_verificacao_ms da config.
+        """
+        padrao = max(0.05, self.cfg.delay_verificacao_ms / 1000.0)
+        if len(self.respostas_aceite) < ACEITE_MIN_AMOSTRAS:
+            return padrao
+        tipica = float(np.quantile(self.respostas_aceite, ACEITE_PERCENTIL))
+        return clamp(tipica * ACEITE_FOLGA + ACEITE_INTERVALO_S, ACEITE_MIN_S, max(ACEITE_MAX_S, padrao))
+
+    def _registrar_resposta(self, segundos):
+        self.respostas_aceite.append(segundos)
+        if len(self.respostas_aceite) == ACEITE_MIN_AMOSTRAS:
+            self._log(f"Conferência de envio calibrada: o jogo responde em até "
+                      f"{max(self.respostas_aceite) * 1000:.0f} ms; espera máxima agora "
+                      f"{self._espera_aceite() * 1000:.0f} ms.")
 
     def _registrar_aceite(self, palavra, use_nums):
         self.aceitas += 1
         self.selector.registrar_uso(palavra, self.modo_atual)
         self.historico.append(palavra)
+        if palavra not in self._aceitas:
+            self._aceitas.add(palavra)
+            GravadorLista.de(self.arquivo_aceitas).adicionar(palavra)
         self.acertos_consecutivos += 1
         self._marcar_turno(False)  # o turno passou para o próximo jogador
 
@@ -1343,7 +3595,9 @@ class BotCore:
         self.strikes[palavra] = n
 
         if n >= 2 and self.cfg.aprender_rejeitadas:
-            if self.dict.registrar_rejeitada(palavra, REJEITADAS_FILE):
+            # carga em lotes: o dicionário pode estar pela metade, a compactação espera
+            cada = COMPACTAR_REJEITADAS_CADA if self._carga is None else 0
+            if self.dict.registrar_rejeitada(palavra, REJEITADAS_FILE, compactar_cada=cada):
                 self._log(f"'{palavra}' recusada {n}x → aprendida em {REJEITADAS_FILE}.")
             else:
                 self._log(f"'{palavra}' recusada {n}x (já estava na lista).")
@@ -1355,8 +3609,6 @@ class BotCore:
 # Interface Gráfica – Tema escuro moderno (Tkinter puro)
 # ==============================
 
-import queue
-
 
 class T:
     """Paleta, espaçamentos e tipografia da interface."""
@@ -1889,9 +4141,10 @@ class AppUI:
         self.root.mainloop()
 
     def _preload_dicionario(self):
-        """Carrega o dicionário logo na abertura para já mostrar o total e avisar de erros."""
+        """Carrega o dicionário logo na abertura (em lotes se não houver cache) e avisa de erros."""
         try:
-            self.bot.carregar_dict_e_blacklist()
+            with self.bot.trava_turno:  # F6 logo na abertura espera, em vez de carregar junto
+                self.bot.carregar_dict_e_blacklist(segundo_plano=True)
         except Exception as e:
             self.enqueue_log(f"Falha ao carregar dicionário: {e}")
 
@@ -2184,6 +4437,18 @@ class AppUI:
         self.ent_dict.pack(side="left", fill="x", expand=True, ipady=5, padx=(0, 8))
         Btn(r, "Abrir", command=self._browse_dict, variant="ghost", padx=14, pady=5).pack(side="left")
 
+        r = form_row(b, "Dicionários de reserva",
+                     "Só consultados quando o principal não tem palavra (separe por ;)")
+        self.ent_reserva = dark_entry(r, "; ".join(cfg.dicionarios_reserva))
+        self.ent_reserva.pack(side="left", fill="x", expand=True, ipady=5)
+
+        r = form_row(b, "Motor de busca",
+                     "Sufixos acha fragmentos de qualquer tamanho (OCR com letras a mais)")
+        self.seg_motor = Segmented(r, [("Índice de sílabas", MotorBusca.INDICE.value),
+                                       ("Array de sufixos", MotorBusca.SUFIXOS.value)],
+                                   value=cfg.motor_busca)
+        self.seg_motor.pack(side="left")
+
         r = form_row(b, "Template da chatbox", "Imagem .png usada para localizar o campo (opcional)")
         self.ent_tpl = dark_entry(r, cfg.template_chatbox)
         self.ent_tpl.pack(side="left", fill="x", expand=True, ipady=5, padx=(0, 8))
@@ -2248,7 +4513,8 @@ class AppUI:
         self.tgl_verificar = Toggle(r, "Ativar", cfg.verificar_envio)
         self.tgl_verificar.pack(side="left")
 
-        r = form_row(b, "Espera antes de conferir")
+        r = form_row(b, "Espera máxima para conferir",
+                     "Até aprender quanto o jogo demora para responder; depois se ajusta sozinha")
         self.sld_verif_ms = Slider(r, 120, 1200, cfg.delay_verificacao_ms, suffix="ms")
         self.sld_verif_ms.pack(fill="x")
 
@@ -2290,6 +4556,11 @@ class AppUI:
         self.sld_ciclo = Slider(r, 80, 1000, cfg.delay_ciclo_ms, suffix="ms")
         self.sld_ciclo.pack(fill="x")
 
+        r = form_row(b, "Vigia de turno",
+                     "Olha a barra e a sílaba a cada 25 ms e acorda o ciclo assim que o turno muda")
+        self.tgl_vigia = Toggle(r, "Ativar", cfg.vigia_turno)
+        self.tgl_vigia.pack(side="left")
+
         r = form_row(b, "Após copiar as letras")
         self.sld_copiar = Slider(r, 80, 800, cfg.delay_pos_copiar_ms, suffix="ms")
         self.sld_copiar.pack(fill="x")
@@ -2340,6 +4611,11 @@ class AppUI:
         self.tgl_alf_hibrido = Toggle(r, "Ativar", cfg.alfabeto_hibrido)
         self.tgl_alf_hibrido.pack(side="left")
 
+        r = form_row(b, "Planejar o alfabeto pelas letras raras",
+                     "No modo alfabeto, letras difíceis (x, j, z…) valem mais que as comuns")
+        self.tgl_planejar = Toggle(r, "Ativar", cfg.planejar_alfabeto)
+        self.tgl_planejar.pack(side="left")
+
         r = form_row(b, "Peso das letras novas")
         self.sld_peso_letras = Slider(r, 0.0, 2.0, cfg.peso_letras_novas, decimals=2)
         self.sld_peso_letras.pack(fill="x")
@@ -2499,7 +4775,9 @@ class AppUI:
         self.st_enviadas = StatCard(cards, "palavras enviadas", "0", T.ACCENT)
         self.st_alfabeto = StatCard(cards, "alfabetos completos", "0", T.SUCCESS)
         self.st_erros = StatCard(cards, "erros propositais", "0", T.WARN)
-        for i, c in enumerate((self.st_dict, self.st_enviadas, self.st_alfabeto, self.st_erros)):
+        self.st_cache = StatCard(cards, "cache: acertos / faltas", "0 / 0", T.TEXT_DIM)
+        for i, c in enumerate((self.st_dict, self.st_enviadas, self.st_alfabeto, self.st_erros,
+                               self.st_cache)):
             c.grid(row=0, column=i, sticky="nsew", padx=(0 if i == 0 else 12, 0))
             cards.columnconfigure(i, weight=1)
 
@@ -2533,6 +4811,21 @@ class AppUI:
         self.txt_hist.configure(yscrollcommand=sb.set)
         self.txt_hist.pack(side="left", fill="both", expand=True)
         sb.pack(side="right", fill="y")
+
+        card, b = make_card(page, "Sílabas da sessão",
+                            f"Atlas de cada sílaba que caiu: candidatas livres, a mais curta e a mais longa "
+                            f"(menos de {ATLAS_FINO} = dicionário fraco). Atualize junto com o histórico.")
+        card.pack(fill="both", expand=True, pady=(18, 0))
+        wrap = tk.Frame(b, bg=T.SURFACE_2, highlightthickness=1, highlightbackground=T.BORDER)
+        wrap.pack(fill="both", expand=True)
+        self.txt_silabas = tk.Text(wrap, bg=T.SURFACE_2, fg=T.TEXT_DIM, font=T.FONT_MONO, relief="flat",
+                                   padx=14, pady=10, state=tk.DISABLED, wrap="none", height=8)
+        self.txt_silabas.tag_configure("fino", foreground=T.WARN)
+        sb = ttk.Scrollbar(wrap, orient="vertical", command=self.txt_silabas.yview,
+                           style="Dark.Vertical.TScrollbar")
+        self.txt_silabas.configure(yscrollcommand=sb.set)
+        self.txt_silabas.pack(side="left", fill="both", expand=True)
+        sb.pack(side="right", fill="y")
         return page
 
     # ---------- Console / logs ----------
@@ -2608,6 +4901,8 @@ class AppUI:
     # ---------- Estatísticas ----------
     def _refresh_stats(self):
         bot = self.bot
+        if not bot.executando and bot.progresso_carga is not None:
+            bot.aplicar_parado()    # rodando, quem adota os lotes é o laço do bot
         total_dict = len(bot.dict.palavras)
         enviadas = len(bot.historico)
         usadas = bot.selector.letras_usadas
@@ -2621,6 +4916,7 @@ class AppUI:
         self.st_recusadas.set(bot.recusadas)
         self.st_aprendidas.set(len(bot.dict.rejeitadas))
         self.st_taxa.set(f"{bot.taxa_aceitacao:.0f}%" if (bot.aceitas + bot.recusadas) else "—")
+        self.st_cache.set(f"{bot.selector.cache_hits} / {bot.selector.cache_misses}")
 
         self.card_palavras.set(enviadas)
         self.card_sequencia.set(bot.acertos_consecutivos)
@@ -2629,7 +4925,9 @@ class AppUI:
         self.grid_alfabeto.atualizar(usadas)
         self.lbl_alfabeto.configure(text=f"{len(usadas)} / {len(LETRAS_ALFABETO)}")
 
-        resumo = f"modo: {bot.modo_atual}   ·   dicionário: {total_dict}   ·   enviadas: {enviadas}"
+        carga = bot.progresso_carga
+        dicionario = f"{total_dict}" if carga is None else f"{total_dict} (carregando {carga:.0%})"
+        resumo = f"modo: {bot.modo_atual}   ·   dicionário: {dicionario}   ·   enviadas: {enviadas}"
         if bot.aceitas + bot.recusadas:
             resumo += f"   ·   aceitação: {bot.taxa_aceitacao:.0f}%"
         self.lbl_status_right.configure(text=resumo)
@@ -2658,6 +4956,8 @@ class AppUI:
         self.bot.nova_partida("botão")
 
     def _rodar_diagnostico(self):
+        if self.bot.capt.recalibrar_escala() not in (None, 1.0):
+            self.enqueue_log("Escala da chatbox esquecida: a próxima detecção procura em todas as escalas.")
         diag = Capturador.diagnostico_escala()
         if not diag:
             self.lbl_diag.configure(text="Não foi possível ler a resolução da tela.", fg=T.WARN)
@@ -2689,6 +4989,20 @@ class AppUI:
                 c = self.bot.selector.frequencia.get(w, 0)
                 self.txt_hist.insert(tk.END, f"{i:>4}.  {w:<28} usada {c}x\n")
         self.txt_hist.configure(state=tk.DISABLED)
+        self._refresh_silabas()
+
+    def _refresh_silabas(self):
+        self.txt_silabas.configure(state=tk.NORMAL)
+        self.txt_silabas.delete("1.0", tk.END)
+        linhas = self.bot.atlas_da_sessao()
+        if not linhas:
+            self.txt_silabas.insert(tk.END, "Nenhuma sílaba jogada nesta sessão ainda.")
+        for frag, n, curta, longa in linhas:     # as mais difíceis primeiro
+            vezes = self.bot.fragmentos_vistos.get(frag, 0)
+            texto = (f"{frag.upper():<6} {vezes:>3}x  {n:>7} candidatas   "
+                     f"curta: {curta or '—':<16} longa: {longa or '—'}\n")
+            self.txt_silabas.insert(tk.END, texto, "fino" if n < ATLAS_FINO else ())
+        self.txt_silabas.configure(state=tk.DISABLED)
 
     def _exportar_historico(self):
         if not self.bot.historico:
@@ -2769,6 +5083,7 @@ class AppUI:
     def _on_close(self):
         try:
             self.bot.parar()
+            GravadorLista.fechar_todos()  # grava o que ainda estiver na fila antes de sair
         finally:
             self.root.destroy()
 
@@ -2899,11 +5214,14 @@ class AppUI:
     def _capturar_config_da_ui(self):
         cfg = self.cfg_mgr.config
         cfg.caminho_dicionario = self.ent_dict.get().strip()
+        cfg.dicionarios_reserva = [c.strip() for c in self.ent_reserva.get().split(";") if c.strip()]
+        cfg.motor_busca = self.seg_motor.get()
         cfg.template_chatbox = self.ent_tpl.get().strip()
         cfg.template_threshold = round(self.sld_thr.get(), 2)
         cfg.turn_bar_threshold = round(self.sld_turn_thr.get(), 2)
 
         cfg.delay_ciclo_ms = int(self.sld_ciclo.get())
+        cfg.vigia_turno = self.tgl_vigia.get()
         cfg.delay_pos_copiar_ms = int(self.sld_copiar.get())
         cfg.delay_antes_digitar_ms = int(self.sld_antes.get())
         cfg.limite_tempo_round_s = round(self.sld_limite.get(), 2)
@@ -2936,6 +5254,7 @@ class AppUI:
         cfg.peso_prefixo = round(self.sld_peso_prefixo.get(), 2)
         cfg.alfabeto_hibrido = self.tgl_alf_hibrido.get()
         cfg.peso_letras_novas = round(self.sld_peso_letras.get(), 2)
+        cfg.planejar_alfabeto = self.tgl_planejar.get()
 
         # sistema
         cfg.dpi_aware = self.tgl_dpi.get()
@@ -2972,6 +5291,11 @@ class AppUI:
         self.bot.capt.cfg = self.cfg_mgr.config
         self.bot.typer.cfg = self.cfg_mgr.config
         self.bot.selector.cfg = self.cfg_mgr.config
+        # o cache e o dicionário são do laço do bot: as trocas entram entre um turno e outro
+        self.bot.entre_turnos(self.bot.selector.limpar_cache)  # pesos de prefixo/bloqueio podem ter mudado
+        motor = self.cfg_mgr.config.motor_busca
+        if self.bot.dict.motor != motor:
+            self.bot.entre_turnos(lambda: self.bot.aplicar_motor(motor))
         self.enqueue_log("Configurações salvas.")
 
     def _salvar_posicoes(self):
@@ -2980,10 +5304,13 @@ class AppUI:
 
     def _recarregar_dicionario(self):
         self._capturar_config_da_ui()
-        if not self.bot.carregar_dict_e_blacklist():
-            messagebox.showerror("Erro", f"Falha ao carregar dicionário:\n{self.cfg_mgr.config.caminho_dicionario}")
+        caminho = self.cfg_mgr.config.caminho_dicionario
+        if not os.path.exists(caminho):
+            messagebox.showerror("Erro", f"Falha ao carregar dicionário:\n{caminho}")
             return
-        self.enqueue_log("Dicionário recarregado.")
+        # blacklist e rejeitadas são relidas entre turnos; a montagem (segundos, sem cache)
+        # fica numa CargaDicionario, adotada pelo laço do bot ou por aplicar_parado
+        self.bot.entre_turnos(lambda: self.bot.carregar_dict_e_blacklist(recarga=True))
 
 
 # ==============================
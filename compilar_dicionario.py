@@ -0,0 +1,77 @@
+"""Monta o cache binário (.bin) do dicionário sem abrir a janela, com vários processos.
+
+Rode com:  python compilar_dicionario.py [acento.txt] [--reserva Zignore.txt ...] [--processos N]
+           python compilar_dicionario.py --conferir      (compara com a montagem num processo só)
+
+Sem argumentos usa o dicionário, as reservas e o motor de busca do config.json.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from codigov4 import ConfigManager, Dicionario, DicionarioCompilado, MotorBusca
+
+
+def montar(caminho, reservas, motor, processos):
+    """Dicionário montado do zero a partir dos .txt, e o tempo gasto."""
+    d = Dicionario()
+    d.motor = motor
+    d.fontes = [caminho, *reservas]
+    inicio = time.perf_counter()
+    d.definir_camadas([Dicionario._ler_txt(c) for c in d.fontes], processos)
+    return d, time.perf_counter() - inicio
+
+
+def diferencas(a, b):
+    """Nomes das seções do .bin que não batem byte a byte entre duas montagens."""
+    sa, sb = a._secoes_compiladas(), b._secoes_compiladas()
+    return [nome for nome in sorted(sa.keys() | sb.keys())
+            if nome not in sa or nome not in sb
+            or sa[nome].dtype != sb[nome].dtype or sa[nome].tobytes() != sb[nome].tobytes()]
+
+
+def main():
+    cfg = ConfigManager()
+    cfg.load()
+    cfg = cfg.config
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dicionario", nargs="?", default=cfg.caminho_dicionario)
+    parser.add_argument("--reserva", action="append", default=None,
+                        help="dicionário de reserva (repita para vários; padrão: os do config.json)")
+    parser.add_argument("--sem-reserva", action="store_true", help="monta só o dicionário principal")
+    parser.add_argument("--motor", choices=[m.value for m in MotorBusca], default=cfg.motor_busca)
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--conferir", action="store_true",
+                        help="monta também num processo só e confere se o resultado é idêntico")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.dicionario):
+        sys.exit(f"Dicionário não encontrado: {args.dicionario}")
+    reservas = [] if args.sem_reserva else (args.reserva if args.reserva is not None else cfg.dicionarios_reserva)
+    reservas = Dicionario._reservas_validas(args.dicionario, reservas)
+
+    d, gasto = montar(args.dicionario, reservas, args.motor, args.processos)
+    tamanhos = d.tamanhos_camadas()
+    print(f"{sum(tamanhos)} palavras ({' + '.join(map(str, tamanhos))}) montadas em {gasto:.2f}s "
+          f"com {args.processos} processo(s)")
+
+    if args.conferir:
+        unico, gasto_unico = montar(args.dicionario, reservas, args.motor, 1)
+        print(f"Num processo só: {gasto_unico:.2f}s")
+        erradas = diferencas(d, unico)
+        if erradas:
+            sys.exit(f"Seções diferentes: {', '.join(erradas)}")
+        print("Resultado idêntico byte a byte.")
+
+    compilado = DicionarioCompilado(args.dicionario, reservas=reservas)
+    compilado.gravar(d._secoes_compiladas())
+    print(f"Gravado: {compilado.caminho}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,14 @@ import random
 import tempfile
 import unittest
 
+import numpy as np
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from codigov4 import (AppConfig, Dicionario, Selecionador, Modo,
-                      LETRAS_ALFABETO, IGNORADAS_ALFABETO, clamp)
+from codigov4 import (AppConfig, CargaDicionario, Dicionario, GravadorLista, ListaCompacta,
+                      Selecionador, Modo,
+                      MotorBusca, PlanejadorAlfabeto,
+                      LETRAS_ALFABETO, IGNORADAS_ALFABETO, clamp, mascara_letras)
 
 
 class TestDicionario(unittest.TestCase):
@@ -33,16 +37,465 @@ class TestDicionario(unittest.TestCase):
     def test_exclui_palavras_ja_usadas(self):
         self.assertEqual(self.d.filtrar("bra", excluir={"brasa", "abraco"}), ["bracelete"])
 
+    def test_usadas_na_partida_so_saem_quando_pedido(self):
+        self.d.marcar_usada("brasa")
+        self.assertIn("brasa", self.d.filtrar("bra"))
+        self.assertNotIn("brasa", self.d.filtrar("bra", bloquear_usadas=True))
+        self.d.limpar_usadas()
+        self.assertIn("brasa", self.d.filtrar("bra", bloquear_usadas=True))
+
+    def test_exclusao_vale_para_a_mesma_forma_digitada(self):
+        # 'ação' e 'acao' são a mesma tecla-a-tecla: recusar uma recusa a outra
+        self.d.palavras = ["ação", "acao", "coração"]
+        self.d.rejeitadas = {"ação"}
+        self.assertEqual(self.d.filtrar("cao"), ["coração"])
+
+    def test_indice_devolve_o_mesmo_que_a_varredura(self):
+        # mesma lista e mesma ordem da varredura linear, inclusive fora do índice (4+ letras)
+        for frag in ("a", "s", "ca", "bra", "aco", "casa", "brac", "xyz", ""):
+            esperado = [w for w in self.d.palavras if frag in w]
+            self.assertEqual(self.d.filtrar(frag), esperado, frag)
+
+    def test_silaba_sem_acento_encontra_palavra_acentuada(self):
+        self.d.palavras = ["ação", "acaso", "coração", "pão"]
+        self.assertEqual(self.d.filtrar("cao"), ["ação", "coração"])
+        self.assertEqual(self.d.filtrar("ção"), ["ação", "coração"])
+        self.assertEqual(self.d.forma_digitada("coração"), "coracao")
+        self.assertEqual(self.d.forma_digitada("acaso"), "acaso")
+
+    def test_trocar_palavras_reconstroi_o_indice(self):
+        self.d.palavras = ["sol", "solar"]
+        self.assertEqual(self.d.filtrar("sol"), ["sol", "solar"])
+        self.assertEqual(self.d.filtrar("bra"), [])
+
     def test_registrar_rejeitada_persiste(self):
         with tempfile.TemporaryDirectory() as tmp:
             path = os.path.join(tmp, "rej.txt")
             self.assertTrue(self.d.registrar_rejeitada("casa", path))
             self.assertFalse(self.d.registrar_rejeitada("casa", path))  # não duplica
+            self.assertTrue(GravadorLista.de(path).descarregar(timeout=10))
 
             outro = Dicionario()
             outro.carregar_rejeitadas(path)
             self.assertEqual(outro.rejeitadas, {"casa"})
 
+    def test_atlas_conta_so_livres_e_vai_da_mais_dificil(self):
+        self.d.blacklist = {"bracelete"}
+        linhas = self.d.atlas()
+        por_frag = {l[0]: l for l in linhas}
+        self.assertEqual(por_frag["as"], ("as", 3, "casa", "casaco"))  # casa, casaco, brasa
+        self.assertEqual(por_frag["bra"], ("bra", 2, "brasa", "abraco"))
+        self.assertEqual(self.d.atlas(["Cel"]), [("cel", 0, None, None)])
+        self.assertEqual([l[1] for l in linhas], sorted(l[1] for l in linhas))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "atlas.tsv")
+            Dicionario.gravar_atlas(linhas + [("cel", 0, None, None)], path)
+            self.assertEqual(Dicionario.ler_atlas(path), linhas + [("cel", 0, None, None)])
+
+    def test_gravador_junta_recusas_e_nao_perde_nada_ao_fechar(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rej.txt")
+            gravador = GravadorLista(path, intervalo=30.0)   # só grava no fechar()
+            for w in ("casa", "brasa"):
+                gravador.adicionar(w)
+            self.assertEqual(gravador.pendentes(), {"casa", "brasa"})
+            gravador.fechar()
+            self.assertEqual(gravador.gravacoes, 1)              # um lote, um fsync
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "casa\nbrasa\n")
+
+    def test_compactar_tira_repetidas_e_fora_do_dicionario(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rej.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# recusadas\nsol\nCasa\nxyzzy\ncasa\nabraco\n")
+            self.d.carregar_rejeitadas(path)
+            self.d.registrar_rejeitada("brasa", path)
+            self.d.compactar_rejeitadas(path)
+            GravadorLista.de(path).descarregar(timeout=10)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "# recusadas\nsol\ncasa\nabraco\nbrasa\n")
+            self.assertFalse(self.d.rejeitadas_mudaram(path))
+            self.assertIn("xyzzy", self.d.rejeitadas)             # a memória não muda
+
+    def test_compacta_de_novo_a_cada_n_recusas_novas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rej.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("xyzzy\nsol\nsol\n")
+            self.d.carregar_rejeitadas(path)
+            self.d.registrar_rejeitada("casa", path, compactar_cada=2)
+            GravadorLista.de(path).descarregar(timeout=10)
+            self.assertEqual(Dicionario._ler_lista(path), {"xyzzy", "sol", "casa"})  # só 1 nova
+            self.d.registrar_rejeitada("brasa", path, compactar_cada=2)
+            gravador = GravadorLista.de(path)
+            self.assertEqual(gravador.desde_compactar, 0)
+            gravador.descarregar(timeout=10)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "sol\ncasa\nbrasa\n")
+
+    def test_edicao_externa_nao_apaga_recusa_ainda_na_fila(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rej.txt")
+            self.d.carregar_rejeitadas(path)
+            gravador = GravadorLista.de(path)
+            gravador.intervalo = 30.0
+            self.d.registrar_rejeitada("brasa", path)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("sol\n")
+            self.d.atualizar_lista(Dicionario.BLOQ_REJEITADA, path)
+            self.assertEqual(self.d.rejeitadas, {"sol", "brasa"})
+            gravador.fechar()
+            self.assertEqual(Dicionario._ler_lista(path), {"sol", "brasa"})
+
+    def test_emergencia_da_a_mais_curta_e_pula_bloqueadas(self):
+        self.d.rejeitadas = {"abraco"}
+        self.d.montar_emergencia(por_fragmento=2)
+        self.assertEqual(self.d.resposta_emergencia("bra"), "brasa")   # abraco ficou de fora
+        self.d.marcar_usada("brasa")
+        self.assertEqual(self.d.resposta_emergencia("bra", bloquear_usadas=True), "bracelete")
+        self.assertIsNone(self.d.resposta_emergencia("bra", excluir={"bracelete"},
+                                                     bloquear_usadas=True))
+        self.assertIsNone(self.d.resposta_emergencia("xyz"))
+
+    def test_emergencia_prefere_as_ja_aceitas(self):
+        self.d.aceitas = {"bracelete"}
+        self.d.montar_emergencia(por_fragmento=2)
+        self.assertEqual(self.d.resposta_emergencia("bra"), "bracelete")
+        self.d.marcar_usada("bracelete")
+        self.assertEqual(self.d.resposta_emergencia("bra", bloquear_usadas=True), "brasa")
+        self.d.rejeitadas = {"bracelete"}                  # aceita e depois recusada: sai
+        self.d.montar_emergencia(por_fragmento=2)
+        self.assertEqual(self.d.resposta_emergencia("bra"), "brasa")
+
+    def test_armazenamento_compacto_se_comporta_como_lista(self):
+        palavras = ["casa", "ação", "", "sol", "casa"]
+        lista = ListaCompacta.de(palavras)
+        self.assertEqual(len(lista), 5)
+        self.assertEqual([lista[i] for i in range(5)], palavras)
+        self.assertEqual(lista[-4], "ação")
+        self.assertEqual(lista[1:3], ["ação", ""])
+        self.assertEqual(lista.varios([4, 1]), ["casa", "ação"])
+        self.assertEqual(lista, palavras)
+        self.assertEqual(ListaCompacta.de([]), [])
+        with self.assertRaises(IndexError):
+            lista[5]
+
+    def test_grafia_repetida_resolve_para_o_primeiro_id(self):
+        self.d.palavras = ["sol", "casa", "ação", "casa"]
+        self.assertEqual(self.d._id("casa"), 1)
+        self.assertIsNone(self.d._id("casinha"))
+        self.assertEqual(self.d.ids_iguais({"casa"}).tolist(), [1, 3])
+
+    def test_reserva_so_entra_quando_a_principal_se_esgota(self):
+        self.d.definir_camadas([["casa", "brasa"], ["brasa", "abrasar", "casebre"]])
+        self.assertEqual(self.d.palavras, ["casa", "brasa", "abrasar", "casebre"])
+        self.assertEqual(self.d.tamanhos_camadas(), [2, 2])
+        self.assertEqual((self.d.camada_de("brasa"), self.d.camada_de("casebre")), (0, 1))
+        self.assertEqual(self.d.filtrar("bra"), ["brasa"])
+        self.assertEqual(self.d.filtrar("bra", excluir={"brasa"}), ["abrasar"])
+        self.d.blacklist = {"casa"}
+        self.assertEqual(self.d.filtrar("cas"), ["casebre"])
+        self.assertEqual(self.d.filtrar("zzz"), [])
+
+    def test_contar_e_top_k_batem_com_a_lista_completa(self):
+        self.d.definir_camadas([["casa", "brasa", "bracelete", "abraco"], ["abrasar", "bravo"]])
+        self.d.marcar_usada("abraco")
+        for frag in ("bra", "a", "cas", "zzz", "BRÁ"):
+            for excluir in (None, {"brasa"}, {"brasa", "bracelete", "abraco"}):
+                for bloquear in (False, True):
+                    ids = self.d.ids_candidatos(frag, excluir, bloquear)
+                    self.assertEqual(self.d.contar(frag, excluir, bloquear), len(ids))
+                    for k in (1, 2, 10):
+                        for longas in (False, True):
+                            todas = self.d.filtrar(frag, excluir, bloquear)
+                            ref = sorted(todas, key=lambda w: -len(w) if longas else len(w))[:k]
+                            self.assertEqual(self.d.top_k(frag, k, longas, excluir, bloquear), ref)
+        self.assertEqual(self.d.contar("bra", por_camada=True), [3, 2])
+        self.assertEqual(self.d.contar("bra", {"brasa", "bracelete", "abraco"}, por_camada=True), [0, 2])
+
+    def test_carga_em_lotes_fica_buscavel_a_cada_lote(self):
+        principal = ["bracelete", "abraco", "sol", "brasa", "casa", "casaco"]
+        reserva = ["brasa", "abrasar", "bravo"]
+        d = Dicionario()
+        lotes = d.montar_em_lotes([principal, reserva], prioridade={"bracelete"}, lote=2)
+        self.assertEqual(next(lotes), 1 / 6)
+        self.assertEqual(d.palavras, ["bracelete", "sol"])     # já aceita, depois a mais curta
+        self.assertEqual(d.filtrar("bra"), ["bracelete"])
+        fracoes = list(lotes)
+        self.assertEqual(fracoes[-1], 1.0)
+
+        ref = Dicionario()
+        ref.definir_camadas([principal, reserva])
+        self.assertEqual(sorted(d.palavras), sorted(ref.palavras))
+        self.assertEqual(d.tamanhos_camadas(), ref.tamanhos_camadas())
+        self.assertEqual([d.palavras[i] for i in d._ordem.tolist()], sorted(d.palavras))
+        for frag in ("bra", "a", "cas", "brav", "zzz"):
+            self.assertEqual(sorted(d.filtrar(frag)), sorted(ref.filtrar(frag)), frag)
+        self.assertEqual(d.forma_digitada("casa"), "casa")
+
+    def test_rejeitadas_mudaram_so_com_edicao_externa(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rej.txt")
+            self.d.carregar_rejeitadas(path)
+            self.assertFalse(self.d.rejeitadas_mudaram(path))
+            self.d.registrar_rejeitada("casa", path)        # escrita nossa não conta
+            GravadorLista.de(path).descarregar(timeout=10)
+            self.assertFalse(self.d.rejeitadas_mudaram(path))
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("brasa\n")
+            self.assertTrue(self.d.rejeitadas_mudaram(path))
+
+    def test_blacklist_editada_aplica_so_a_diferenca(self):
+        self.d.palavras = ["casa", "brasa", "abraço", "abraco", "bracelete"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blacklist.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("brasa\nabraço\nabraco\n")
+            self.d.carregar_blacklist(path)
+            self.d.montar_emergencia()
+            geracao = self.d.geracao
+            self.assertEqual(self.d.resposta_emergencia("bra"), "bracelete")
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# comentário\nabraco\ncasa\n")
+            self.assertTrue(self.d.lista_mudou(path))
+            entram, saem = self.d.atualizar_lista(Dicionario.BLOQ_BLACKLIST, path)
+            self.assertEqual((entram, saem), ({"casa"}, {"brasa", "abraço"}))
+            self.assertFalse(self.d.lista_mudou(path))
+            self.assertEqual(self.d.blacklist, {"abraco", "casa"})
+            # abraço saiu, mas a gêmea 'abraco' continua na lista: mesma forma, segue bloqueada
+            self.assertEqual(self.d.filtrar("bra"), ["brasa", "bracelete"])
+            self.assertEqual(self.d.filtrar("cas"), [])
+            self.assertEqual(self.d.resposta_emergencia("bra"), "brasa")
+            self.assertEqual(self.d.geracao, geracao)       # sem recarga completa
+
+    def test_troca_grande_na_lista_recarrega_tudo(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rej.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(["brasa"] + [f"x{i}" for i in range(Dicionario.DELTA_MAX)]))
+            geracao = self.d.geracao
+            self.d.atualizar_lista(Dicionario.BLOQ_REJEITADA, path)
+            self.assertGreater(self.d.geracao, geracao)
+            self.assertNotIn("brasa", self.d.filtrar("bra"))
+
+
+class TestDicionarioCompilado(unittest.TestCase):
+    """O .bin tem que devolver exatamente o mesmo que o .txt e se refazer quando ele muda."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.txt = os.path.join(self.tmp.name, "dic.txt")
+        with open(self.txt, "w", encoding="utf-8") as f:
+            f.write("Casa\ncasaco\n\nbracelete\nabraco\nsol\nbrasa\nAção\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_segunda_carga_vem_do_cache_com_o_mesmo_conteudo(self):
+        primeiro = Dicionario()
+        self.assertTrue(primeiro.carregar(self.txt))
+        self.assertFalse(primeiro.do_cache)
+        self.assertTrue(os.path.exists(self.txt + ".bin"))
+
+        segundo = Dicionario()
+        self.assertTrue(segundo.carregar(self.txt))
+        self.assertTrue(segundo.do_cache)
+        self.assertEqual(segundo.palavras, primeiro.palavras)
+        for frag in ("bra", "a", "cas", "braco", "zzz", "cao"):
+            self.assertEqual(segundo.filtrar(frag), primeiro.filtrar(frag), frag)
+        self.assertEqual(segundo.forma_digitada("ação"), "acao")
+
+    def test_montagem_em_varios_processos_e_identica(self):
+        palavras = Dicionario._ler_txt(self.txt) + ["bracelete", "ação", "coração", "sol"]
+        um, varios = Dicionario(), Dicionario()
+        um.definir_camadas([palavras, ["brasão", "sol"]])
+        varios.definir_camadas([palavras, ["brasão", "sol"]], processos=3)
+        a, b = um._secoes_compiladas(), varios._secoes_compiladas()
+        self.assertEqual(a.keys(), b.keys())
+        for nome in a:
+            self.assertEqual(a[nome].dtype, b[nome].dtype, nome)
+            self.assertEqual(a[nome].tobytes(), b[nome].tobytes(), nome)
+
+    def test_cache_e_refeito_quando_o_txt_muda(self):
+        Dicionario().carregar(self.txt)
+        with open(self.txt, "a", encoding="utf-8") as f:
+            f.write("brava\n")
+        d = Dicionario()
+        d.carregar(self.txt)
+        self.assertFalse(d.do_cache)
+        self.assertIn("brava", d.filtrar("bra"))
+
+    def test_cache_corrompido_e_ignorado(self):
+        Dicionario().carregar(self.txt)
+        with open(self.txt + ".bin", "wb") as f:
+            f.write(b"lixo")
+        d = Dicionario()
+        self.assertTrue(d.carregar(self.txt))
+        self.assertEqual(d.filtrar("bra"), ["bracelete", "abraco", "brasa"])
+
+    def test_motor_de_sufixos_e_gravado_e_reaproveitado(self):
+        Dicionario().carregar(self.txt)                 # .bin sem o array de sufixos
+        d = Dicionario()
+        d.carregar(self.txt, motor=MotorBusca.SUFIXOS.value)
+        self.assertFalse(d.do_cache)                    # refeito para incluir o array
+        outro = Dicionario()
+        outro.carregar(self.txt, motor=MotorBusca.SUFIXOS.value)
+        self.assertTrue(outro.do_cache)
+        self.assertEqual(outro.filtrar("braco"), ["abraco"])
+
+    def test_carga_em_segundo_plano_grava_o_cache(self):
+        carga = CargaDicionario(self.txt, prioridade={"sol"}).iniciar()
+        self.assertTrue(carga.esperar(timeout=30))
+        self.assertIsNone(carga.erro)
+        estado, final = carga.pegar()
+        self.assertTrue(final)
+        self.assertIsNone(carga.pegar())
+
+        d = Dicionario()
+        d.blacklist = {"brasa"}
+        d.adotar(estado)
+        self.assertEqual(d.palavras[0], "sol")
+        self.assertEqual(sorted(d.filtrar("bra")), ["abraco", "bracelete"])
+        outro = Dicionario()
+        outro.carregar(self.txt)
+        self.assertTrue(outro.do_cache)
+        self.assertEqual(outro.palavras, d.palavras)
+
+    def test_bot_adota_os_lotes_e_fecha_a_carga(self):
+        import codigov4
+        original = codigov4.REJEITADAS_FILE
+        codigov4.REJEITADAS_FILE = os.path.join(self.tmp.name, "rej.txt")  # a carga compacta o arquivo
+        try:
+            self._bot_adota_os_lotes()
+        finally:
+            codigov4.REJEITADAS_FILE = original
+
+    def _bot_adota_os_lotes(self):
+        bot, logs = montar_bot([], [], caminho_dicionario=self.txt, dicionarios_reserva=[])
+        self.assertTrue(bot.carregar_dict_e_blacklist(segundo_plano=True))
+        self.assertIsNotNone(bot.progresso_carga)
+        bot._carga.esperar(timeout=30)
+        self.assertFalse(bot.aplicar_carga())
+        self.assertIsNone(bot.progresso_carga)
+        self.assertEqual(len(bot.dict.palavras), 7)
+        self.assertIsNotNone(bot.dict.resposta_emergencia("bra"))
+        self.assertTrue(any(m.startswith("Dicionário carregado (7 palavras)") for m in logs))
+        # com o .bin pronto, a próxima carga é direta, sem thread
+        self.assertTrue(bot.carregar_dict_e_blacklist(segundo_plano=True))
+        self.assertIsNone(bot.progresso_carga)
+        self.assertTrue(bot.dict.do_cache)
+
+        # recarga: numa thread, e o dicionário inteiro atual vale até o novo ficar pronto
+        with open(self.txt, "a", encoding="utf-8") as f:
+            f.write("brasileiro\n")
+        self.assertTrue(bot.carregar_dict_e_blacklist(recarga=True))
+        self.assertEqual(len(bot.dict.palavras), 7)
+        bot._carga.esperar(timeout=30)
+        self.assertFalse(bot.aplicar_carga())
+        self.assertEqual(len(bot.dict.palavras), 8)
+        self.assertIn("brasileiro", bot.dict.filtrar("bra"))
+        # sem mudança no .txt, a recarga só abre o .bin que a anterior gravou
+        self.assertTrue(bot.carregar_dict_e_blacklist(recarga=True))
+        bot._carga.esperar(timeout=30)
+        self.assertFalse(bot.aplicar_carga())
+        self.assertEqual(len(bot.dict.palavras), 8)
+
+        # motor novo: o array de sufixos é montado numa thread e entra como o último lote
+        bot.cfg.motor_busca = MotorBusca.SUFIXOS.value
+        self.assertTrue(bot.trocar_motor(MotorBusca.SUFIXOS.value))
+        self.assertEqual(bot.dict.motor, MotorBusca.INDICE.value)
+        geracao = bot.dict.geracao
+        bot._carga.esperar(timeout=30)
+        self.assertFalse(bot.aplicar_carga())
+        self.assertEqual(bot.dict.motor, MotorBusca.SUFIXOS.value)
+        self.assertEqual(bot.dict.geracao, geracao)        # mesmas palavras: o cache continua valendo
+        self.assertEqual(bot.dict.filtrar("braco"), ["abraco"])
+        self.assertFalse(bot.trocar_motor(MotorBusca.INDICE.value))   # voltar não monta nada
+
+        # parado: a recarga pedida pela UI e a adoção esperam o último ciclo soltar a trava
+        with open(self.txt, "a", encoding="utf-8") as f:
+            f.write("brasilia\n")
+        bot.executando = False
+        with bot.trava_turno:
+            bot.entre_turnos(lambda: bot.carregar_dict_e_blacklist(recarga=True))
+            bot._aplicador.join(0.1)
+            self.assertIsNone(bot.progresso_carga)
+        bot._aplicador.join(5)
+        if bot.progresso_carga is not None:
+            bot._carga.esperar(timeout=30)
+            bot.aplicar_parado()
+            bot._aplicador.join(30)
+        self.assertIsNone(bot.progresso_carga)
+        self.assertEqual(len(bot.dict.palavras), 9)
+
+    def test_reserva_fica_so_com_palavras_de_letras(self):
+        reserva = os.path.join(self.tmp.name, "reserva.txt")
+        with open(reserva, "w", encoding="utf-8") as f:
+            f.write("brasileiro\na.c.\naa.\nª\nbraª\nguarda-chuva\nAb'Sáber\nbra2\nÁrvore\n")
+        d = Dicionario()
+        d.carregar(self.txt, reservas=[reserva])
+        esperadas = ["brasileiro", "árvore"]
+        self.assertEqual(d.palavras[7:], esperadas)
+        carga = CargaDicionario(self.txt, reservas=[reserva]).iniciar()   # carga em lotes: mesmo filtro
+        self.assertTrue(carga.esperar(timeout=30))
+        estado, _ = carga.pegar()
+        lotes = Dicionario()
+        lotes.adotar(estado)
+        self.assertEqual(sorted(lotes.palavras[7:]), sorted(esperadas))
+        self.assertEqual(lotes.filtrar("bra", excluir={"bracelete", "abraco", "brasa"}), ["brasileiro"])
+
+    def test_reserva_tem_cache_proprio_e_confere_os_dois_arquivos(self):
+        reserva = os.path.join(self.tmp.name, "reserva.txt")
+        with open(reserva, "w", encoding="utf-8") as f:
+            f.write("brasa\nbrasileiro\n")
+        Dicionario().carregar(self.txt)
+        d = Dicionario()
+        d.carregar(self.txt, reservas=[reserva, os.path.join(self.tmp.name, "nao_existe.txt")])
+        self.assertFalse(d.do_cache)
+        self.assertEqual(d.fontes, [self.txt, reserva])
+        self.assertTrue(os.path.exists(self.txt + "+reserva.txt.bin"))
+
+        outro = Dicionario()
+        outro.carregar(self.txt, reservas=[reserva])
+        self.assertTrue(outro.do_cache)
+        self.assertEqual(outro.tamanhos_camadas(), [7, 1])
+        self.assertEqual(outro.filtrar("bra", excluir={"bracelete", "abraco", "brasa"}), ["brasileiro"])
+
+        with open(reserva, "a", encoding="utf-8") as f:
+            f.write("brasão\n")
+        d = Dicionario()
+        d.carregar(self.txt, reservas=[reserva])
+        self.assertFalse(d.do_cache)
+        self.assertEqual(d.tamanhos_camadas(), [7, 2])
+
+
+class TestArraySufixos(unittest.TestCase):
+    PALAVRAS = ["casa", "casaco", "bracelete", "abraco", "sol", "brasa", "ação", "coração",
+                "paralelepipedo", "a", "aa", "banana", "ananas"]
+
+    def test_igual_a_varredura_para_qualquer_tamanho(self):
+        d = Dicionario()
+        d.motor = MotorBusca.SUFIXOS.value
+        d.palavras = self.PALAVRAS
+        formas = [Dicionario().forma_digitada(w) for w in self.PALAVRAS]
+        for frag in ("a", "an", "ana", "anan", "banana", "bananas", "cao", "ção", "lepip",
+                     "paralelepipedo", "sola", "z", "s"):
+            esperado = [w for w, f in zip(self.PALAVRAS, formas) if frag.replace("ç", "c")
+                        .replace("ã", "a") in f]
+            self.assertEqual(d.filtrar(frag), esperado, frag)
+            # o array sozinho também, mesmo onde o índice é quem responde (até 3 letras)
+            ids = d._sufixos.ids_com(d.forma_digitada(frag)).tolist()
+            self.assertEqual([d.palavras[i] for i in ids], esperado, frag)
+
+    def test_trocar_de_motor_monta_o_array(self):
+        d = Dicionario()
+        d.palavras = self.PALAVRAS
+        self.assertIsNone(d._sufixos)
+        d.definir_motor(MotorBusca.SUFIXOS.value)
+        self.assertEqual(d.filtrar("elepi"), ["paralelepipedo"])
+
 
 class TestSelecionador(unittest.TestCase):
     def setUp(self):
@@ -104,18 +557,177 @@ class TestSelecionador(unittest.TestCase):
         self.sel.registrar_uso("kiwi", Modo.ALFABETO.value)
         self.assertFalse(self.sel.letras_usadas & IGNORADAS_ALFABETO)
 
+    def test_letras_contam_pela_forma_digitada(self):
+        self.sel.registrar_uso("ação", Modo.ALFABETO.value)
+        self.assertEqual(self.sel.letras_usadas, set("aco"))
+        self.assertEqual(self.sel._letras_novas("açúcar"), 2)   # u, r
+
+    def test_planejador_prefere_letra_rara(self):
+        d = Dicionario()
+        d.palavras = ["xaxa", "bode", "casa"]
+        cobertura = np.ones(len(LETRAS_ALFABETO))
+        cobertura[LETRAS_ALFABETO.index("x")] = 0.2       # 'x' quase nunca aparece
+        d.cobertura_letras = cobertura
+        sel = Selecionador(self.cfg, d)
+        self.assertEqual(sel.escolher_para("", Modo.ALFABETO.value), "xaxa")
+        self.cfg.planejar_alfabeto = False
+        self.assertEqual(sel.escolher_para("", Modo.ALFABETO.value), "bode")  # 4 letras novas
+
+    def test_planejador_soma_so_letras_que_faltam(self):
+        plan = PlanejadorAlfabeto(np.full(len(LETRAS_ALFABETO), 0.5))
+        self.assertAlmostEqual(plan.turnos_restantes(0), 2.0 * len(LETRAS_ALFABETO))
+        usadas = mascara_letras("ab")
+        self.assertAlmostEqual(float(plan.valor(mascara_letras("abcz"), usadas)), 4.0)
+        self.assertAlmostEqual(plan.turnos_restantes(usadas), 2.0 * (len(LETRAS_ALFABETO) - 2))
+
+    def test_uso_marca_e_nova_partida_libera_no_dicionario(self):
+        d = Dicionario()
+        d.palavras = ["casa", "casaco"]
+        sel = Selecionador(self.cfg, d)
+        sel.registrar_uso("casa", Modo.QUALQUER.value)
+        self.assertEqual(d.filtrar("cas", bloquear_usadas=True), ["casaco"])
+        sel.nova_partida()
+        self.assertEqual(d.filtrar("cas", bloquear_usadas=True), ["casa", "casaco"])
+
     def test_lista_vazia_devolve_none(self):
         self.assertIsNone(self.sel.escolher([], Modo.CURTA.value, "abc"))
 
 
+class TestCacheDeRanking(unittest.TestCase):
+    PALAVRAS = ["casa", "casaco", "acaso", "casamento", "descasar", "casulo", "caserna",
+                "muxoxo", "xicara", "casca", "ocaso", "vasos", "quasar", "casal"]
+
+    def setUp(self):
+        self.cfg = AppConfig()
+        self.cfg.mostrar_top_n = 3
+        self.d = Dicionario()
+        self.d.palavras = self.PALAVRAS
+        self.sel = Selecionador(self.cfg, self.d)
+
+    def test_mesma_escolha_que_filtrar_e_escolher(self):
+        ref = Selecionador(self.cfg)
+        for modo in [m.value for m in Modo]:
+            for frag in ("cas", "as", "a", "x"):
+                for folga in (1.0, 0.4, 0.0):
+                    self.sel.letras_usadas = set("cas")
+                    ref.letras_usadas = set("cas")
+                    ref.frequencia = self.sel.frequencia = {"casa": 2}
+                    random.seed(7)
+                    esperado = ref.escolher(self.d.filtrar(frag), modo, frag, folga)
+                    random.seed(7)
+                    self.assertEqual(self.sel.escolher_para(frag, modo, folga), esperado,
+                                     (modo, frag, folga))
+
+    def test_pontuacao_vetorizada_identica_a_escalar(self):
+        d = Dicionario()
+        d.palavras = self.PALAVRAS + ["ação", "açaí", "casa", "Casinha", "kiwi"]
+        sel = Selecionador(self.cfg, d)
+        sel.letras_usadas = set("casé")
+        sel.frequencia = {"casa": 2, "ação": 1}
+        sel.recentes.append("casal")
+        for modo in [m.value for m in Modo]:
+            for prefixo in (True, False):
+                self.cfg.preferir_prefixo = prefixo
+                sel.limpar_cache()
+                for frag in ("ca", "a", "asa", ""):
+                    rk = sel.ranking(frag, modo)
+                    sc = sel.pontuar(rk.ids, rk.fixa, modo, folga=0.7)
+                    for i, v in zip(rk.ids.tolist(), sc.tolist()):
+                        w = d.palavras[i]
+                        esperado = (sel._score_alfabeto(w) if modo == Modo.ALFABETO.value
+                                    else sel._score_base(w, modo, frag, 0.7))
+                        self.assertEqual(v, esperado, (modo, prefixo, frag, w))
+
+    def test_top_parcial_igual_a_ordenacao_completa(self):
+        rng = np.random.default_rng(3)
+        for _ in range(50):
+            n = int(rng.integers(1, 60))
+            ids = np.sort(rng.choice(1000, n, replace=False))
+            sc = rng.integers(0, 4, n).astype(float)     # muitos empates de propósito
+            for k in (1, 3, n):
+                esperado = np.lexsort((ids, -sc))[:k]
+                self.assertEqual(Selecionador._posicoes_top(ids, sc, k).tolist(), esperado.tolist())
+
+    def test_conta_acertos_e_faltas(self):
+        self.sel.escolher_para("cas", Modo.CURTA.value)
+        self.sel.escolher_para("cas", Modo.CURTA.value)
+        self.sel.escolher_para("cas", Modo.LONGA.value)
+        self.assertEqual((self.sel.cache_hits, self.sel.cache_misses), (1, 2))
+
+    def test_uso_e_recusa_tiram_a_palavra_do_ranking(self):
+        self.cfg.mostrar_top_n = 1
+        primeira = self.sel.escolher_para("cas", Modo.CURTA.value)
+        self.sel.registrar_uso(primeira, Modo.CURTA.value)
+        segunda = self.sel.escolher_para("cas", Modo.CURTA.value)
+        self.d.registrar_rejeitada(segunda, os.devnull)
+        terceira = self.sel.escolher_para("cas", Modo.CURTA.value)
+        self.assertEqual(len({primeira, segunda, terceira}), 3)
+        self.assertEqual(self.sel.cache_misses, 1)      # tudo incremental, sem refazer
+
+    def test_ranking_desce_para_a_reserva_quando_a_camada_esgota(self):
+        self.d.definir_camadas([["casa", "casal"], ["casaco", "casamento"]])
+
+        def usar():
+            w = self.sel.escolher_para("cas", Modo.CURTA.value)
+            self.sel.registrar_uso(w, Modo.CURTA.value)
+            return w
+
+        self.assertEqual({usar(), usar()}, {"casa", "casal"})
+        self.assertEqual({usar(), usar()}, {"casaco", "casamento"})
+        self.assertIsNone(self.sel.escolher_para("cas", Modo.CURTA.value))
+
+    def test_recusas_do_turno_tambem_descem_para_a_reserva(self):
+        self.cfg.mostrar_top_n = 1
+        self.d.definir_camadas([["casa"], ["casaco"]])
+        self.assertEqual(self.sel.escolher_para("cas", Modo.CURTA.value), "casa")
+        self.assertEqual(self.sel.escolher_para("cas", Modo.CURTA.value, excluir={"casa"}), "casaco")
+
+    def test_palavra_liberada_volta_so_aos_rankings_dela(self):
+        self.cfg.mostrar_top_n = 1
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blacklist.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("casa\n")
+            self.d.carregar_blacklist(path)
+            self.assertNotEqual(self.sel.escolher_para("cas", Modo.CURTA.value), "casa")
+            self.sel.escolher_para("x", Modo.CURTA.value)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("")
+            self.d.atualizar_lista(Dicionario.BLOQ_BLACKLIST, path)
+            self.assertEqual(self.sel.escolher_para("cas", Modo.CURTA.value), "casa")
+            self.sel.escolher_para("x", Modo.CURTA.value)
+            self.assertEqual((self.sel.cache_hits, self.sel.cache_misses), (1, 3))
+
+    def test_blacklist_nova_refaz_o_ranking(self):
+        self.cfg.mostrar_top_n = 1
+        primeira = self.sel.escolher_para("cas", Modo.CURTA.value)
+        self.d.blacklist = {primeira}
+        self.assertNotEqual(self.sel.escolher_para("cas", Modo.CURTA.value), primeira)
+
+    def test_lru_descarta_o_mais_antigo(self):
+        self.sel.CACHE_MAX = 2
+        for frag in ("a", "c", "s"):
+            self.sel.ranking(frag, Modo.CURTA.value)
+        self.sel.ranking("a", Modo.CURTA.value)
+        self.assertEqual(self.sel.cache_misses, 4)
+
+
 class TyperFalso:
-    """Digitador de mentira: registra o que seria enviado, sem tocar no teclado."""
+    """Digitador de mentira: registra o que seria enviado, sem tocar no teclado.
+
+    Os tempos (estimativa, humanizado e FAST PATH) são os do HumanTyper de verdade.
+    """
 
-    def __init__(self):
+    def __init__(self, cfg):
+        from codigov4 import HumanTyper
         self.enviadas = []
+        self.ao_enviar = None       # o "jogo" reage a cada ENTER
+        self._real = HumanTyper(cfg, lambda m: None, lambda: True)
 
     def _envia(self, palavra):
         self.enviadas.append(palavra)
+        if self.ao_enviar:
+            self.ao_enviar()
         return True
 
     def digitar(self, palavra, pos, override_nums=False):
@@ -128,19 +740,29 @@ class TyperFalso:
         return self._envia(palavra)
 
     def estimate_round_time(self, palavra, **kwargs):
-        return 0.3, {"typing": 0.3}
+        return self._real.estimate_round_time(palavra, **kwargs)
+
+    def tempo_digitacao(self, comprimentos):
+        return self._real.tempo_digitacao(comprimentos)
+
+    def tempo_minimo(self, comprimentos):
+        return self._real.tempo_minimo(comprimentos)
 
 
 class CapturadorFalso:
-    """Devolve uma sequência pré-programada de 'ainda é a minha vez?'."""
+    """'Ainda é a minha vez?' pré-programado: uma resposta por ENTER, repetida a cada consulta."""
 
     def __init__(self, respostas):
         self.respostas = list(respostas)
+        self.atual = False
         self.consultas = 0
 
+    def proxima(self):
+        self.atual = self.respostas.pop(0) if self.respostas else False
+
     def turno_ativo(self):
         self.consultas += 1
-        return self.respostas.pop(0) if self.respostas else False
+        return self.atual
 
 
 def montar_bot(palavras, respostas_turno, **cfg_kwargs):
@@ -159,8 +781,10 @@ def montar_bot(palavras, respostas_turno, **cfg_kwargs):
     logs = []
     bot = BotCore(cfg, PosicoesManager(), logs.append)
     bot.dict.palavras = list(palavras)
-    bot.typer = TyperFalso()
+    bot.arquivo_aceitas = os.devnull
+    bot.typer = TyperFalso(cfg)
     bot.capt = CapturadorFalso(respostas_turno)
+    bot.typer.ao_enviar = bot.capt.proxima
     bot.executando = True
     bot._marcar_turno(True)
     return bot, logs
@@ -169,6 +793,28 @@ def montar_bot(palavras, respostas_turno, **cfg_kwargs):
 class TestCicloDeFeedback(unittest.TestCase):
     """A parte nova mais crítica: descobrir se o JKLM aceitou a palavra."""
 
+    def test_atlas_pre_aquece_as_silabas_dificeis_e_lista_as_vistas(self):
+        bot, _ = montar_bot(["brasa", "abraco", "casa"], [False])
+        with tempfile.TemporaryDirectory() as tmp:
+            fonte = os.path.join(tmp, "dic.txt")
+            open(fonte, "w").close()
+            bot.dict.fontes = [fonte]
+            bot.arquivo_atlas = os.path.join(tmp, "atlas.tsv")
+            Dicionario.gravar_atlas([("zz", 3, "a", "b"), ("ca", 120, "casa", "casa"),
+                                     ("bra", 150, "brasa", "abraco")], bot.arquivo_atlas)
+            os.utime(fonte, (0, 0))
+            self.assertEqual(bot._ler_dificeis(), ["ca", "bra"])      # só as jogáveis
+            bot._dificeis = bot._ler_dificeis()
+            self.assertTrue(bot._pre_aquecer())
+            bot._jogar_rodada("BRA")
+            self.assertEqual(bot.selector.cache_hits, 1)
+            self.assertEqual(bot.selector.cache_misses, 0)
+            os.utime(fonte)                                         # dicionário mais novo que o atlas
+            os.utime(bot.arquivo_atlas, (0, 0))
+            self.assertEqual(bot._ler_dificeis(), [])
+        self.assertEqual(bot.fragmentos_vistos, {"bra": 1})
+        self.assertEqual(bot.atlas_da_sessao(), [("bra", 2, "brasa", "abraco")])
+
     def test_palavra_aceita_e_registrada(self):
         # turno_ativo False = a vez passou = o jogo aceitou
         bot, _ = montar_bot(["brasa", "abraco"], [False])
@@ -214,6 +860,7 @@ class TestCicloDeFeedback(unittest.TestCase):
 
                 self.assertEqual(bot.strikes.get("brasa"), 2)
                 self.assertIn("brasa", bot.dict.rejeitadas)
+                GravadorLista.de(codigov4.REJEITADAS_FILE).descarregar(timeout=10)
                 with open(codigov4.REJEITADAS_FILE, encoding="utf-8") as f:
                     self.assertIn("brasa", f.read())
                 # e a partir daí ela some das candidatas
@@ -221,6 +868,34 @@ class TestCicloDeFeedback(unittest.TestCase):
             finally:
                 codigov4.REJEITADAS_FILE = original
 
+    def test_conferencia_volta_na_mudanca_e_aprende_a_espera(self):
+        import time
+        from codigov4 import ACEITE_MAX_S, ACEITE_MIN_AMOSTRAS, ACEITE_MIN_S
+        bot, logs = montar_bot(["brasa"], [], delay_verificacao_ms=800)
+        mudanca = time.perf_counter() + 0.06
+        bot.capt.turno_ativo = lambda: time.perf_counter() < mudanca   # a barra muda em 60 ms
+        inicio = time.perf_counter()
+        self.assertTrue(bot._verificar_aceite())
+        self.assertLess(time.perf_counter() - inicio, 0.5)             # não esperou os 800 ms
+        self.assertEqual(len(bot.respostas_aceite), 1)
+        self.assertEqual(bot._espera_aceite(), 0.8)                    # ainda sem amostras
+
+        bot.respostas_aceite.extend([0.05] * ACEITE_MIN_AMOSTRAS)
+        espera = bot._espera_aceite()
+        self.assertTrue(ACEITE_MIN_S <= espera < 0.8)
+        bot.capt.turno_ativo = lambda: True                              # recusa: sai na espera aprendida
+        inicio = time.perf_counter()
+        self.assertFalse(bot._verificar_aceite())
+        self.assertLess(time.perf_counter() - inicio, 0.5)
+        bot.respostas_aceite.extend([5.0] * 50)
+        self.assertEqual(bot._espera_aceite(), ACEITE_MAX_S)
+
+    def test_digita_a_forma_sem_acento(self):
+        bot, _ = montar_bot(["coração"], [False])
+        bot._jogar_rodada("cao")
+        self.assertEqual(bot.typer.enviadas, ["coracao"])
+        self.assertEqual(bot.historico, ["coração"])
+
     def test_verificacao_desligada_aceita_tudo(self):
         bot, _ = montar_bot(["brasa"], [True], verificar_envio=False)
         bot._jogar_rodada("bra")
@@ -241,8 +916,90 @@ class TestCicloDeFeedback(unittest.TestCase):
         self.assertEqual(bot.typer.enviadas, [FRASE_QUANDO_NAO_TEM])
         self.assertEqual(bot.aceitas, 0)  # frase de desistência não conta como acerto
 
+    def test_mudanca_da_ui_so_entra_entre_um_turno_e_outro(self):
+        bot, _ = montar_bot(["brasa"], [False])
+        aplicados = []
+        bot.entre_turnos(lambda: aplicados.append("rodando"))
+        self.assertEqual(aplicados, [])          # rodando: fica para o começo do próximo ciclo
+        bot._aplicar_pedidos()
+        self.assertEqual(aplicados, ["rodando"])
+
+        bot.executando = False
+        with bot.trava_turno:                    # o último ciclo ainda não terminou
+            bot.entre_turnos(lambda: aplicados.append("parado"))
+            bot._aplicador.join(0.1)
+            self.assertEqual(aplicados, ["rodando"])
+        bot._aplicador.join(1.0)
+        self.assertEqual(aplicados, ["rodando", "parado"])
+
 
 class TestOrcamentoDeTempo(unittest.TestCase):
+    def test_tempo_vetorizado_bate_com_a_estimativa_palavra_a_palavra(self):
+        from codigov4 import HumanTyper
+        cfg = AppConfig()
+        cfg.humanizar.pausa_cada = 4
+        typer = HumanTyper(cfg, lambda m: None, lambda: True)
+        comprimentos = np.arange(0, 20)
+        tempos = typer._typing_block_expected(comprimentos, envia=True)
+        for n in comprimentos.tolist():
+            est, _ = typer.estimate_round_time("x" * n, use_frase=False, use_ensaio=False, use_falha=False,
+                                               use_erro_enter=False, use_pensar3=False, include_nums=False)
+            self.assertAlmostEqual(tempos[n], est)
+        self.assertTrue(np.all(np.diff(tempos) >= 0))
+
+    def test_orcamento_usa_o_custo_do_fast_path(self):
+        from codigov4 import HumanTyper
+        cfg = AppConfig()
+        cfg.mostrar_top_n = 1
+        typer = HumanTyper(cfg, lambda m: None, lambda: True)
+        tempos = typer.tempo_minimo(np.arange(0, 21))
+        # digitar_quick: foco + (tecla + intervalo) por letra + ENTER
+        self.assertAlmostEqual(tempos[20], typer.QUICK_FOCUS_TIME + 20 * (typer.KEYPRESS_TIME + typer.QUICK_LETTER_GAP)
+                               + typer.KEYPRESS_TIME)
+        self.assertTrue(np.all(tempos < typer.tempo_digitacao(np.arange(0, 21))))
+
+        d = Dicionario()
+        d.palavras = ["brasa", "sobrancelhas"]
+        sel = Selecionador(cfg, d)
+        # 0.15s não dá para a versão humanizada de nenhuma, mas o FAST PATH digita a longa com folga
+        self.assertGreater(typer.tempo_digitacao(5), 0.15)
+        self.assertEqual(sel.escolher_para("bra", Modo.LONGA.value, orcamento=0.15, tempo_fn=typer.tempo_digitacao,
+                                           piso_fn=typer.tempo_minimo), "sobrancelhas")
+
+    def test_escolhe_so_palavras_que_cabem_no_que_sobra(self):
+        cfg = AppConfig()
+        cfg.modo = Modo.LONGA.value
+        cfg.mostrar_top_n = 1
+        d = Dicionario()
+        d.palavras = ["brasa", "abraco", "bracelete", "sobrancelhas"]
+        sel = Selecionador(cfg, d)
+        tempo = lambda comp: 0.1 * np.asarray(comp, dtype=np.float64)
+        self.assertEqual(sel.escolher_para("bra", Modo.LONGA.value), "sobrancelhas")
+        self.assertEqual(sel.escolher_para("bra", Modo.LONGA.value, orcamento=0.95, piso_fn=tempo), "bracelete")
+        self.assertEqual(sel.escolher_para("bra", Modo.LONGA.value, orcamento=0.65, piso_fn=tempo), "abraco")
+        # nada cabe: vai a mais rápida em vez de ficar sem palavra
+        self.assertEqual(sel.escolher_para("bra", Modo.LONGA.value, orcamento=0.1, piso_fn=tempo), "brasa")
+        # como pontuação, o estouro só rebaixa: ninguém sai, e a que cabe passa na frente
+        cfg.mostrar_top_n = 4
+        self.assertEqual([w for w, _ in sel.melhores("bra", Modo.LONGA.value)][0], "sobrancelhas")
+        palavras, sc = sel._top("bra", Modo.LONGA.value, 1.0, None, False, orcamento=0.65, tempo_fn=tempo)
+        self.assertEqual(palavras, ["abraco", "brasa", "bracelete", "sobrancelhas"])
+        self.assertLess(sc[2:].max(), 0.1 * sc[1])
+
+    def test_bot_prefere_palavra_que_cabe_digitada_com_calma(self):
+        bot, logs = montar_bot(["brasa", "sobrancelhas"], [False], modo=Modo.LONGA.value)
+        bot.modo_atual = Modo.LONGA.value
+        limite = bot.cfg.limite_tempo_round_s
+        bot._turno_inicio -= limite * (1.0 - 1.2 * bot.cfg.folga_emergencia)   # folga acima da emergência
+        self.assertGreater(bot._folga(), bot.cfg.folga_emergencia)
+        orcamento = bot._orcamento_restante()
+        tempos = bot.typer.tempo_digitacao([5, 12])
+        self.assertLess(tempos[0], orcamento)
+        self.assertGreater(tempos[1], orcamento)        # a longa só sairia pelo FAST PATH
+        bot._jogar_rodada("bra")
+        self.assertEqual(bot.typer.enviadas, ["brasa"])
+        self.assertFalse(any("FAST PATH" in m for m in logs))
+
     def test_folga_cai_conforme_o_turno_passa(self):
         bot, _ = montar_bot(["casa"], [False], limite_tempo_round_s=4.0)
         self.assertGreater(bot._folga(), 0.95)          # turno recém-começado
@@ -265,6 +1022,41 @@ class TestOrcamentoDeTempo(unittest.TestCase):
         bot._marcar_turno(True)                         # nova virada
         self.assertGreater(bot._turno_inicio, inicio)
 
+    def test_sem_folga_usa_a_tabela_de_emergencia(self):
+        bot, logs = montar_bot(["abraco", "brasa", "bracelete"], [False], mostrar_top_n=5)
+        bot.dict.montar_emergencia()
+        bot._turno_inicio -= 60.0                       # orçamento estourado
+        bot._jogar_rodada("bra")
+        self.assertEqual(bot.typer.enviadas, ["brasa"])
+        self.assertTrue(any("emergência" in m for m in logs))
+        self.assertFalse(any("Top opções" in m for m in logs))
+
+    def test_previa_reaproveita_o_top_e_avisa_silaba_fraca(self):
+        bot, logs = montar_bot(["abraco", "brasa", "bracelete", "casa"], [False], mostrar_top_n=2)
+        bot._jogar_rodada("bra")
+        self.assertIn("Top opções (3 candidatas): " + ", ".join(bot.selector.ultimo_top), logs)
+        self.assertEqual(len(bot.selector.ultimo_top), 2)
+        self.assertIn("Sílaba 'bra' fraca no dicionário: só 3 candidata(s) livres (brasa, abraco, bracelete).",
+                      logs)
+
+    def test_evento_da_vigia_acorda_o_ciclo_e_data_o_turno(self):
+        import time
+        from codigov4 import EventoTurno, VigiaTurno
+        bot, _ = montar_bot(["brasa"], [False])
+        self.assertIsNone(bot._esperar_evento(0.01))                 # sem vigia: só dorme
+        bot.vigia = VigiaTurno(bot.capt)
+        visto = time.time() - 0.3
+        for evento in ((EventoTurno.ACABOU, visto - 1), (EventoTurno.INICIOU, visto), (EventoTurno.SILABA, visto)):
+            bot.vigia.eventos.put(evento)
+        inicio = time.perf_counter()
+        self.assertEqual(bot._esperar_evento(5.0), (EventoTurno.SILABA, visto))
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        self.assertIsNone(bot._esperar_evento(0.01))
+        bot._marcar_turno(False)
+        bot._marcar_turno(True, bot._turno_visto_em)
+        self.assertEqual(bot._turno_inicio, visto)
+        self.assertGreaterEqual(bot._tempo_no_turno(), 0.3)
+
     def test_nova_partida_zera_estado(self):
         bot, _ = montar_bot(["brasa"], [False])
         bot._jogar_rodada("bra")
@@ -275,6 +1067,232 @@ class TestOrcamentoDeTempo(unittest.TestCase):
         self.assertEqual(bot.partidas, 1)
 
 
+class ImageGrabFalso:
+    """Tela de mentira: grab() devolve recortes de um array fixo e conta as capturas."""
+
+    def __init__(self, tela):
+        self.tela = tela
+        self.bboxes = []
+
+    def grab(self, bbox=None):
+        from PIL import Image
+        self.bboxes.append(bbox)
+        x0, y0, x1, y1 = bbox or (0, 0, self.tela.shape[1], self.tela.shape[0])
+        return Image.fromarray(self.tela[y0:y1, x0:x1])
+
+
+class TestQuadroDeTela(unittest.TestCase):
+    """Chatbox, barra de turno e sílaba saem de uma única captura por ciclo."""
+
+    def setUp(self):
+        import codigov4
+        import cv2
+        from codigov4 import Capturador, PosicoesManager
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tela = np.random.default_rng(7).integers(0, 256, (300, 400, 3), dtype=np.uint8)
+        template = os.path.join(self.tmp.name, "chatbox.png")
+        cinza = cv2.cvtColor(self.tela, cv2.COLOR_BGR2GRAY)
+        cv2.imwrite(template, cinza[100:120, 200:240])
+        self.original = codigov4.ImageGrab
+        codigov4.ImageGrab = self.grab = ImageGrabFalso(self.tela)
+        cfg = AppConfig()
+        cfg.template_chatbox = template
+        pos = PosicoesManager()
+        pos.turn_bar_rect = (50, 250, 100, 10)
+        pos.pos_chatbox = (225, 105)
+        self.template = template
+        self.c = Capturador(pos, cfg, lambda m: None)
+
+    def tearDown(self):
+        import codigov4
+        codigov4.ImageGrab = self.original
+        self.tmp.cleanup()
+
+    def test_um_grab_por_ciclo_e_vistas_sem_copia(self):
+        self.c.novo_quadro()
+        self.assertTrue(self.c.detectar_chatbox(refresh_reference=True))
+        barra = self.c.capturar_barra_turno()
+        self.assertEqual(self.c.capturas, 1)
+        self.assertTrue(np.shares_memory(barra, self.c._quadro))
+        np.testing.assert_array_equal(barra, self.tela[250:260, 50:150])
+        # a referência é cópia: não prende o quadro inteiro
+        self.assertFalse(np.shares_memory(self.c.turn_bar_reference, self.c._quadro))
+
+        self.assertTrue(self.c.turno_ativo())           # checagem nova: tela de agora
+        self.assertEqual(self.c.capturas, 2)
+
+    def test_busca_numa_janela_e_varre_a_tela_depois_de_faltas(self):
+        from codigov4 import CHATBOX_MARGEM_PX, CHATBOX_VARREDURA_CADA
+        self.c.novo_quadro()
+        self.assertTrue(self.c.detectar_chatbox())
+        self.assertEqual(self.c._chatbox_rect, (200, 100, 40, 20))
+        x0, y0, x1, y1 = self.grab.bboxes[-1]                # janela em volta de pos_chatbox + barra
+        self.assertEqual((x0, y1), (50, 260))
+        self.assertEqual(x1, 225 - 20 + 40 + CHATBOX_MARGEM_PX)
+        self.assertLess((x1 - x0) * (y1 - y0), self.tela.shape[0] * self.tela.shape[1])
+
+        # a chatbox muda de lugar: a janela erra, a varredura periódica acha de novo
+        patch = self.tela[100:120, 200:240].copy()
+        self.tela[100:120, 200:240] = 0
+        self.tela[10:30, 20:60] = patch
+        resultados = []
+        for _ in range(CHATBOX_VARREDURA_CADA):
+            self.c.novo_quadro()
+            resultados.append(self.c.detectar_chatbox())
+        self.assertEqual(resultados, [False] * (CHATBOX_VARREDURA_CADA - 1) + [True])
+        self.assertIsNone(self.grab.bboxes[-1])
+        self.assertEqual(self.c._chatbox_rect, (20, 10, 40, 20))
+
+    def test_varredura_completa_nao_reaproveita_quadro_recortado(self):
+        from codigov4 import CHATBOX_VARREDURA_CADA
+        self.c.novo_quadro()
+        self.assertTrue(self.c.detectar_chatbox())             # quadro do ciclo: só a janela
+        self.assertIsNotNone(self.grab.bboxes[-1])
+        patch = self.tela[100:120, 200:240].copy()
+        self.tela[100:120, 200:240] = 0
+        self.tela[10:30, 20:60] = patch
+        self.c._chatbox_faltas = CHATBOX_VARREDURA_CADA - 1    # a vez da varredura, no mesmo ciclo
+        self.assertTrue(self.c.detectar_chatbox())
+        self.assertIsNone(self.grab.bboxes[-1])
+        self.assertEqual(self.c._chatbox_rect, (20, 10, 40, 20))
+
+    def test_piramide_acha_a_chatbox_em_outra_escala_e_lembra_dela(self):
+        import cv2
+        from codigov4 import CHATBOX_VARREDURA_CADA
+        blocos = np.random.default_rng(3).integers(0, 256, (5, 10), dtype=np.uint8)
+        template = np.kron(blocos, np.ones((4, 4), dtype=np.uint8))            # 20x40
+        cv2.imwrite(self.template, template)
+        em_125 = cv2.resize(template, (50, 25), interpolation=cv2.INTER_LINEAR)
+        self.tela[100:125, 200:250] = em_125[:, :, None]
+        chamadas = []
+        original = cv2.matchTemplate
+
+        def contar(img, tpl, metodo):
+            chamadas.append(tpl.shape)
+            return original(img, tpl, metodo)
+
+        cv2.matchTemplate = contar
+        try:
+            self.c.novo_quadro()
+            self.assertTrue(self.c.detectar_chatbox())
+            self.assertEqual(self.c.escala_chatbox, 1.25)
+            self.assertEqual(self.c._chatbox_rect, (200, 100, 50, 25))
+            del chamadas[:]
+            self.c.novo_quadro()
+            self.assertTrue(self.c.detectar_chatbox())
+            self.assertEqual(chamadas, [(25, 50)])                          # só a escala lembrada
+            # fora do turno (chatbox some), nem a varredura completa tenta as outras escalas
+            self.tela[100:125, 200:250] = 0
+            del chamadas[:]
+            for _ in range(CHATBOX_VARREDURA_CADA):
+                self.c.novo_quadro()
+                self.assertFalse(self.c.detectar_chatbox())
+            self.assertIsNone(self.grab.bboxes[-1])
+            self.assertEqual(set(chamadas), {(25, 50)})
+            # recalibrar (botão de diagnóstico) volta a tentar a pirâmide inteira
+            self.assertEqual(self.c.recalibrar_escala(), 1.25)
+            del chamadas[:]
+            self.c.novo_quadro()
+            self.assertFalse(self.c.detectar_chatbox())
+            self.assertGreater(len(chamadas), 1)
+        finally:
+            cv2.matchTemplate = original
+
+    def test_escala_lembrada_que_para_de_casar_volta_a_piramide_nas_varreduras(self):
+        import cv2
+        from codigov4 import CHATBOX_PIRAMIDE_CADA, CHATBOX_VARREDURA_CADA
+        blocos = np.random.default_rng(3).integers(0, 256, (5, 10), dtype=np.uint8)
+        template = np.kron(blocos, np.ones((4, 4), dtype=np.uint8))            # 20x40
+        cv2.imwrite(self.template, template)
+        self.tela[100:125, 200:250] = cv2.resize(template, (50, 25), interpolation=cv2.INTER_LINEAR)[:, :, None]
+        self.c.novo_quadro()
+        self.assertTrue(self.c.detectar_chatbox())
+        self.assertEqual(self.c.escala_chatbox, 1.25)
+
+        # a escala do Windows volta a 100% e a chatbox muda de lugar: sem recalibrar_escala
+        self.tela[100:125, 200:250] = 0
+        self.tela[10:30, 20:60] = template[:, :, None]
+        ciclos = 0
+        while True:
+            ciclos += 1
+            self.c.novo_quadro()
+            if self.c.detectar_chatbox():
+                break
+            self.assertLess(ciclos, 100)
+        self.assertEqual(ciclos, CHATBOX_VARREDURA_CADA * CHATBOX_PIRAMIDE_CADA)
+        self.assertIsNone(self.grab.bboxes[-1])
+        self.assertEqual(self.c.escala_chatbox, 1.0)
+        self.assertEqual(self.c._chatbox_rect, (20, 10, 40, 20))
+        self.assertEqual(self.c._escalas_a_tentar()[0][0], 1.0)                # passa a ser a lembrada
+
+    def test_template_so_e_relido_quando_o_arquivo_muda(self):
+        self.c.novo_quadro()
+        self.c.detectar_chatbox()
+        primeiro = self.c._template
+        self.c.novo_quadro()
+        self.c.detectar_chatbox()
+        self.assertIs(self.c._template, primeiro)
+        os.utime(self.template, ns=(0, 10**9))
+        self.c.novo_quadro()
+        self.assertTrue(self.c.detectar_chatbox())
+        self.assertIsNot(self.c._template, primeiro)
+
+    def test_uniao_das_regioes(self):
+        from codigov4 import Capturador
+        self.assertEqual(Capturador._uniao([(0, 0, 10, 10), (20, 5, 5, 10)]), (0, 0, 25, 15))
+        self.assertIsNone(Capturador._uniao([None, (0, 0, 10, 10)]))
+
+    def test_vigia_avisa_inicio_silaba_e_fim_do_turno(self):
+        from codigov4 import EventoTurno, VigiaTurno
+        self.c.pos.letras_rect = (260, 200, 60, 20)
+        vigia = VigiaTurno(self.c, confirmar_cada=60.0)
+
+        def eventos():
+            saida = []
+            while not vigia.eventos.empty():
+                saida.append(vigia.eventos.get_nowait()[0])
+            return saida
+
+        self.assertEqual(vigia.amostrar(), {"barra", "silaba"})
+        self.assertEqual(eventos(), [EventoTurno.INICIOU])
+        self.assertEqual(self.grab.bboxes[0], (50, 200, 320, 260))    # só barra + sílaba
+
+        capturas = self.c.capturas
+        self.assertEqual(vigia.amostrar(), set())                    # tela parada: nem confirma
+        self.assertEqual((eventos(), self.c.capturas), ([], capturas))
+
+        self.tela[200:220, 260:320] = 255
+        self.assertEqual(vigia.amostrar(), {"silaba"})
+        self.assertEqual(eventos(), [EventoTurno.SILABA])
+
+        self.c.novo_quadro()
+        self.assertTrue(self.c.detectar_chatbox())                   # o ciclo do bot tem o seu quadro
+        quadro = self.c._quadro
+        self.tela[100:120, 200:240] = 0                              # a chatbox some
+        self.tela[250:260, 50:150] = 0
+        self.assertEqual(vigia.amostrar(), {"barra"})
+        self.assertEqual(eventos(), [EventoTurno.ACABOU])
+        self.assertIsNotNone(self.grab.bboxes[-1])                   # conferiu só a janela
+        # sem efeito no ciclo do bot: o quadro é o mesmo e a falta não conta para a varredura
+        self.assertIs(self.c._quadro, quadro)
+        self.assertEqual(self.c._chatbox_faltas, 0)
+
+    def test_vigia_sem_letras_rect_olha_em_volta_de_pos_letras(self):
+        from codigov4 import EventoTurno, VIGIA_CAIXA_SILABA, VigiaTurno
+        self.c.pos.letras_rect = None                                # captura por clipboard: sem OCR
+        self.c.pos.pos_letras = (300, 200)
+        w, h = VIGIA_CAIXA_SILABA
+        vigia = VigiaTurno(self.c, confirmar_cada=60.0)
+        self.assertEqual(vigia._regioes()["silaba"], (300 - w // 2, 200 - h // 2, w, h))
+        vigia.amostrar()
+        while not vigia.eventos.empty():
+            vigia.eventos.get_nowait()
+
+        self.tela[195:205, 290:310] = 255                            # outra sílaba no lugar do clique
+        self.assertEqual(vigia.amostrar(), {"silaba"})
+        self.assertEqual(vigia.eventos.get_nowait()[0], EventoTurno.SILABA)
+
+
 class TestCapturaDaSilaba(unittest.TestCase):
     """Falha do duplo-clique: tem que ser detectada e repetida, nunca ler lixo antigo."""
 